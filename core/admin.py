@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Answer, Exam, Option, Question, Student, StudentExam, Teacher, User
+from .models import (Answer, Exam, ExamStats, ImportJob, Option, Question, QueuedSubmission, SchoolClass, Section,
+                     Student, StudentExam, Teacher, User)
 
 
 from .models import Chat, Message
@@ -7,11 +8,16 @@ from .models import Chat, Message
 admin.site.register(User)
 admin.site.register(Teacher)
 admin.site.register(Student)
+admin.site.register(SchoolClass)
+admin.site.register(Section)
 
 admin.site.register(Exam)
 admin.site.register(Question)
 admin.site.register(Option)
 admin.site.register(StudentExam)
 admin.site.register(Answer)
+admin.site.register(QueuedSubmission)
+admin.site.register(ExamStats)
+admin.site.register(ImportJob)
 admin.site.register(Chat)
 admin.site.register(Message)
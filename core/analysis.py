@@ -0,0 +1,109 @@
+# core/analysis.py
+"""
+Classical item analysis of an exam's answers.
+
+Answers are read as two integer columns (attempt id, chosen option id) with
+one query and every metric is computed with whole-array NumPy operations:
+
+* difficulty     – share of attempts that answered the question correctly
+* discrimination – point-biserial correlation between getting the question
+                   right and the attempt's total number of correct answers
+* option share   – share of attempts that picked each option
+"""
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+
+from .caching import get_version
+from .grading import get_answer_key
+from .models import Answer, ExamStats
+
+ANALYSIS_TIMEOUT = 60 * 60
+
+
+def load_answer_columns(exam_id):
+    """Return (attempt_ids, option_ids) of every graded answer as int64 arrays."""
+    qs = Answer.objects.filter(attempt__exam_id=exam_id, attempt__finished_at__isnull=False) \
+                       .values_list("attempt_id", "chosen_id")
+    sql, params = qs.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 2)
+    return rows[:, 0], rows[:, 1]
+
+
+def analyse(key, attempt_ids, option_ids, attempt_count=0):
+    """
+    Compute item statistics from answer columns and an AnswerKey.
+
+    ``attempt_count`` lets attempts without any saved answer count as all
+    wrong; it is raised to the number of distinct attempts seen if lower.
+    """
+    if not key.option_question:
+        return {"attempt_count": attempt_count, "questions": []}
+
+    option_order = np.fromiter(key.option_question.keys(), dtype=np.int64, count=len(key.option_question))
+    option_question = np.fromiter(key.option_question.values(), dtype=np.int64, count=len(option_order))
+    sort = np.argsort(option_order)
+    option_order, option_question = option_order[sort], option_question[sort]
+    question_ids, option_qidx = np.unique(option_question, return_inverse=True)
+    option_correct = np.array([key.correct.get(int(q)) == int(o)
+                               for o, q in zip(option_order, option_question)], dtype=bool)
+
+    # keep answers whose option still belongs to the exam
+    pos = np.clip(np.searchsorted(option_order, option_ids), 0, len(option_order) - 1)
+    known = option_order[pos] == option_ids
+    pos, attempt_ids = pos[known], attempt_ids[known]
+
+    _, attempt_idx = np.unique(attempt_ids, return_inverse=True)
+    n_attempts = max(int(attempt_idx.max()) + 1 if len(attempt_idx) else 0, attempt_count)
+    n_questions = len(question_ids)
+
+    items = np.zeros((n_attempts, n_questions), dtype=np.float64)
+    items[attempt_idx, option_qidx[pos]] = option_correct[pos]
+    totals = items.sum(axis=1)
+
+    option_counts = np.bincount(pos, minlength=len(option_order))
+    if n_attempts:
+        difficulty = items.mean(axis=0)
+        item_dev = items - difficulty
+        total_dev = totals - totals.mean()
+        denom = np.sqrt((item_dev ** 2).sum(axis=0) * (total_dev ** 2).sum())
+        with np.errstate(invalid="ignore", divide="ignore"):
+            discrimination = np.where(denom > 0, (item_dev * total_dev[:, None]).sum(axis=0) / denom, np.nan)
+        share = option_counts / n_attempts
+    else:
+        difficulty = discrimination = np.full(n_questions, np.nan)
+        share = np.zeros(len(option_order))
+
+    questions = []
+    for qi, question_id in enumerate(question_ids):
+        opts = np.flatnonzero(option_qidx == qi)
+        questions.append({
+            "question_id": int(question_id),
+            "difficulty": _num(difficulty[qi]),
+            "discrimination": _num(discrimination[qi]),
+            "options": [
+                {"option_id": int(option_order[o]), "is_correct": bool(option_correct[o]),
+                 "share": float(share[o])}
+                for o in opts
+            ],
+        })
+    return {"attempt_count": n_attempts, "questions": questions}
+
+
+def _num(value):
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def exam_analysis(exam_id):
+    """Cached item analysis; a new submission changes the cache key."""
+    attempt_count = ExamStats.objects.filter(exam_id=exam_id) \
+                                     .values_list("attempt_count", flat=True).first() or 0
+    cache_key = f"item-analysis:{exam_id}:{get_version('exam', exam_id)}:{attempt_count}"
+    result = cache.get(cache_key)
+    if result is None:
+        attempt_ids, option_ids = load_answer_columns(exam_id)
+        result = analyse(get_answer_key(exam_id), attempt_ids, option_ids, attempt_count)
+        cache.set(cache_key, result, ANALYSIS_TIMEOUT)
+    return result
@@ -0,0 +1,160 @@
+# core/autosave.py
+"""
+Autosave of in-progress answers.
+
+``POST /exams/<id>/autosave/`` only records the answers in this process's
+AnswerBuffer: one ``{question_id: option_id}`` dict per attempt, so repeated
+clicks on a question collapse into the last one. A flusher thread writes
+everything buffered with a single Answer upsert every FLUSH_INTERVAL seconds,
+which bounds what a crash can lose to that interval. Submitting an exam takes
+the attempt's buffered answers out of the buffer and merges them with the
+saved and submitted ones (``collect_answers``), so nothing waits for a flush.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .grading import save_answers
+from .models import Answer, StudentExam
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "FLUSH_INTERVAL": 2.0,   # seconds between flushes; the most a crash can lose
+}
+
+
+def autosave_setting(name):
+    return getattr(settings, "AUTOSAVE", {}).get(name, DEFAULTS[name])
+
+
+class AnswerBuffer:
+    """Thread-safe, coalescing buffer of unsaved answers keyed by attempt id."""
+
+    def __init__(self):
+        self._pending = {}
+        self._inflight = {}       # drained by a flush that has not committed yet
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def put(self, attempt_id, answers):
+        """Record ``(question_id, option_id)`` pairs; the last write per question wins."""
+        with self._lock:
+            self._pending.setdefault(attempt_id, {}).update(answers)
+
+    def peek(self, attempt_id):
+        """Return a copy of one attempt's buffered answers, leaving them buffered."""
+        with self._lock:
+            return {**self._inflight.get(attempt_id, {}), **self._pending.get(attempt_id, {})}
+
+    def take(self, attempt_id):
+        """
+        Remove and return one attempt's buffered answers, including those a
+        running flush is still writing.
+        """
+        with self._lock:
+            return {**self._inflight.get(attempt_id, {}), **self._pending.pop(attempt_id, {})}
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def flush(self):
+        """
+        Upsert everything buffered in one statement; returns the number of
+        rows. Until the upsert commits the answers stay visible to ``peek`` and
+        ``take``; if it fails they go back into the buffer (under anything
+        put since) and the error is raised.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._inflight = pending
+            if not pending:
+                return 0
+            try:
+                # answers that arrived after the attempt was submitted or closed are dropped
+                open_ids = set(StudentExam.objects.filter(pk__in=list(pending), finished_at__isnull=True)
+                                                  .values_list("id", flat=True))
+                rows = [Answer(attempt_id=attempt_id, question_id=q, chosen_id=o)
+                        for attempt_id, answers in pending.items() if attempt_id in open_ids
+                        for q, o in answers.items()]
+                save_answers(rows)
+            except Exception:
+                with self._lock:
+                    for attempt_id, answers in pending.items():
+                        self._pending[attempt_id] = {**answers, **self._pending.get(attempt_id, {})}
+                raise
+            finally:
+                with self._lock:
+                    self._inflight = {}
+            return len(rows)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(answers) for answers in self._pending.values())
+
+
+answer_buffer = AnswerBuffer()
+
+
+def collect_answers(attempt_id, submitted, take=True):
+    """
+    Saved answers, overridden by buffered ones, overridden by ``submitted``.
+    With ``take=False`` the buffered answers stay buffered, for callers that
+    may still fail to use them.
+    """
+    # buffer first: a flush committing in between is then in both, never in neither
+    buffered = answer_buffer.take(attempt_id) if take else answer_buffer.peek(attempt_id)
+    merged = dict(Answer.objects.filter(attempt_id=attempt_id).values_list("question_id", "chosen_id"))
+    merged.update(buffered)
+    merged.update((a["question_id"], a["option_id"]) for a in submitted)
+    return [{"question_id": q, "option_id": o} for q, o in merged.items()]
+
+
+class AutosaveFlusher:
+    """Daemon thread flushing ``answer_buffer`` every FLUSH_INTERVAL seconds."""
+
+    def __init__(self, interval=None):
+        self.interval = interval or autosave_setting("FLUSH_INTERVAL")
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="autosave-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._thread.join(timeout)
+        self._flush()
+
+    def _flush(self):
+        try:
+            answer_buffer.flush()
+        except Exception:
+            logger.exception("Flushing autosaved answers failed")
+        finally:
+            close_old_connections()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._flush()
+
+
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def ensure_flusher():
+    """Start this process's flusher the first time an answer is buffered."""
+    global _flusher
+    if _flusher is not None:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = AutosaveFlusher()
+            _flusher.start()
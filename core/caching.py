@@ -0,0 +1,101 @@
+# core/caching.py
+"""
+Small caching helpers shared by the exam, export and chat code.
+
+Versions are opaque tokens kept in the shared Django cache. Cached values are
+keyed by the version they were built from, so bumping a version invalidates
+every tier (process-local LRU and shared cache) at once without having to find
+and delete the individual entries.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.utils import timezone
+
+
+def _version_key(namespace, obj_id):
+    return f"version:{namespace}:{obj_id}"
+
+
+def get_version(namespace, obj_id):
+    """Return the current version token, creating one if none is cached."""
+    key = _version_key(namespace, obj_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(namespace, obj_ids):
+    """``{obj_id: version}`` for many objects with one cache round trip."""
+    keys = {_version_key(namespace, obj_id): obj_id for obj_id in obj_ids}
+    found = cache.get_many(list(keys))
+    versions = {obj_id: found[key] for key, obj_id in keys.items() if key in found}
+    for key, obj_id in keys.items():
+        if obj_id not in versions:
+            versions[obj_id] = get_version(namespace, obj_id)
+    return versions
+
+
+def bump_version(namespace, obj_id):
+    """Invalidate everything cached under the current version; return the new one."""
+    version = uuid.uuid4().hex
+    cache.set(_version_key(namespace, obj_id), version, timeout=None)
+    return version
+
+
+def touch_models(*models):
+    """Record that rows of ``models`` changed (used for export ETags)."""
+    now = timezone.now()
+    for model in models:
+        label = model._meta.label_lower
+        bump_version("model", label)
+        cache.set(f"modified:model:{label}", now, timeout=None)
+
+
+def models_state(models):
+    """
+    Return ``(versions, last_modified)`` for a set of models without reading
+    their tables. ``last_modified`` is None unless known for every model.
+    """
+    versions, modified = [], []
+    for model in sorted(set(models), key=lambda m: m._meta.label_lower):
+        label = model._meta.label_lower
+        versions.append(f"{label}={get_version('model', label)}")
+        modified.append(cache.get(f"modified:model:{label}"))
+    last_modified = None if None in modified else max(modified, default=None)
+    return versions, last_modified
+
+
+class LRUCache:
+    """Thread-safe, size-bounded, process-local cache."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
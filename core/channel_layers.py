@@ -0,0 +1,255 @@
+# core/channel_layers.py
+"""
+A channel layer for running several ASGI worker processes on one host.
+
+InMemoryChannelLayer only reaches consumers in its own process, so chat
+messages sent through one daphne/uvicorn worker never reach sockets held by
+another. SQLiteChannelLayer keeps messages and group memberships in a shared
+SQLite file (WAL mode) instead; every worker points at the same path::
+
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "core.channel_layers.SQLiteChannelLayer",
+            "CONFIG": {"path": BASE_DIR / "channels.sqlite3"},
+        },
+    }
+
+``group_send`` is a single ``INSERT … SELECT`` over the group's members, so a
+fan-out costs one statement whatever the group size. Each process runs one
+poller task that drains the messages of all its local channels with one
+indexed ``DELETE … RETURNING`` per round: immediately when the process sent
+something itself, otherwise every ``poll_interval`` seconds, which bounds the
+cross-process delivery latency (see ``manage.py benchmark_channel_layer``).
+
+Messages are stored as JSON (with DRF's encoder, so datetimes, UUIDs and
+decimals become strings), which covers everything the consumers here send.
+Use channels_redis when workers span several hosts.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_message (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    body    TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS channel_message_channel ON channel_message (channel, id);
+CREATE INDEX IF NOT EXISTS channel_message_expires ON channel_message (expires);
+CREATE TABLE IF NOT EXISTS channel_group (
+    grp     TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    joined  REAL NOT NULL,
+    PRIMARY KEY (grp, channel)
+);
+CREATE INDEX IF NOT EXISTS channel_group_channel ON channel_group (channel);
+"""
+
+FETCH_LIMIT = 1000     # messages taken per poll round
+
+
+class SQLiteChannelLayer(BaseChannelLayer):
+    extensions = ["groups", "flush"]
+
+    def __init__(self, path=None, expiry=60, group_expiry=86400, capacity=100,
+                 channel_capacity=None, poll_interval=0.01, **kwargs):
+        super().__init__(expiry=expiry, capacity=capacity, **kwargs)
+        self.channel_capacity = self.compile_capacities(channel_capacity or {})
+        self.path = str(path or settings.BASE_DIR / "channels.sqlite3")
+        self.group_expiry = group_expiry
+        self.poll_interval = poll_interval
+        # specific channels of this process share a prefix, so one range scan finds them all
+        self.client_prefix = f"specific.{uuid.uuid4().hex[:12]}!"
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._queues = {}          # channel → asyncio.Queue of messages fetched for it
+        self._poller = None
+        self._loop = None
+        self._wakeup = None
+        self._next_cleanup = 0.0
+
+    # ----- connections -----
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.create_function("channel_capacity", 1, self.get_capacity, deterministic=True)
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def _run(self, fn, *args):
+        return asyncio.to_thread(fn, *args)
+
+    # ----- channel layer API -----
+    async def new_channel(self, prefix="specific."):
+        return f"{self.client_prefix}{uuid.uuid4().hex}"
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        if not await self._run(self._send, channel, self._encode(message)):
+            raise ChannelFull(channel)
+        self._wake()
+
+    def _send(self, channel, body):
+        now = time.time()
+        cursor = self._connection().execute(
+            """INSERT INTO channel_message (channel, body, expires)
+               SELECT ?1, ?2, ?3
+               WHERE (SELECT COUNT(*) FROM channel_message
+                      WHERE channel = ?1 AND expires > ?4) < channel_capacity(?1)""",
+            (channel, body, now + self.expiry, now),
+        )
+        return cursor.rowcount
+
+    async def receive(self, channel):
+        """Wait for the next message on ``channel``; messages come from the process poller."""
+        self.require_valid_channel_name(channel)
+        queue = self._queues.setdefault(channel, asyncio.Queue())
+        self._ensure_poller()
+        try:
+            while True:
+                expires, message = await queue.get()
+                if expires > time.time():
+                    break
+        finally:
+            # also when the receive is cancelled (socket closed): otherwise the queue leaks
+            # and keeps the poller running
+            if queue.empty() and self._queues.get(channel) is queue:
+                self._queues.pop(channel, None)
+        return message
+
+    async def flush(self):
+        await self._run(self._flush)
+        self._queues.clear()
+
+    def _flush(self):
+        self._connection().executescript("DELETE FROM channel_message; DELETE FROM channel_group;")
+
+    async def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+
+    # ----- groups -----
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await self._run(self._execute,
+                        "INSERT OR REPLACE INTO channel_group (grp, channel, joined) VALUES (?, ?, ?)",
+                        (group, channel, time.time()))
+
+    async def group_discard(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await self._run(self._execute, "DELETE FROM channel_group WHERE grp = ? AND channel = ?",
+                        (group, channel))
+
+    async def group_send(self, group, message):
+        """Queue ``message`` for every member of ``group``; full channels are skipped."""
+        assert isinstance(message, dict), "Message is not a dict"
+        self.require_valid_group_name(group)
+        await self._run(self._group_send, group, self._encode(message))
+        self._wake()
+
+    def _group_send(self, group, body):
+        now = time.time()
+        self._cleanup(now)
+        self._connection().execute(
+            """INSERT INTO channel_message (channel, body, expires)
+               SELECT g.channel, ?2, ?3 FROM channel_group g
+               WHERE g.grp = ?1 AND g.joined > ?4
+                 AND (SELECT COUNT(*) FROM channel_message m
+                      WHERE m.channel = g.channel AND m.expires > ?5) < channel_capacity(g.channel)""",
+            (group, body, now + self.expiry, now - self.group_expiry, now),
+        )
+
+    def _execute(self, sql, params=()):
+        self._connection().execute(sql, params)
+
+    def _cleanup(self, now):
+        """
+        Drop expired messages, and (like InMemoryChannelLayer) remove their
+        channels from all groups: nobody has been reading them.
+        """
+        if now < self._next_cleanup:
+            return
+        self._next_cleanup = now + min(self.expiry, 10)
+        conn = self._connection()
+        conn.execute("""DELETE FROM channel_group WHERE channel IN
+                        (SELECT channel FROM channel_message WHERE expires <= ?)""", (now,))
+        conn.execute("DELETE FROM channel_message WHERE expires <= ?", (now,))
+        conn.execute("DELETE FROM channel_group WHERE joined <= ?", (now - self.group_expiry,))
+
+    # ----- delivery to local receivers -----
+    def _encode(self, message):
+        assert "__asgi_channel__" not in message
+        return json.dumps(message, cls=JSONEncoder)
+
+    def _ensure_poller(self):
+        loop = asyncio.get_running_loop()
+        if self._poller is None or self._poller.done() or self._loop is not loop:
+            self._loop, self._wakeup = loop, asyncio.Event()
+            self._poller = loop.create_task(self._poll())
+
+    def _wake(self):
+        """Poll now rather than at the next interval; safe from any thread or loop."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wakeup.set()
+        else:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def _poll(self):
+        while self._queues:
+            self._wakeup.clear()
+            others = [c for c in self._queues if not c.startswith(self.client_prefix)]
+            rows = await self._run(self._fetch, others)
+            for channel, body, expires in rows:
+                self._queues.setdefault(channel, asyncio.Queue()).put_nowait((expires, json.loads(body)))
+            if len(rows) < FETCH_LIMIT:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _fetch(self, other_channels):
+        """Take the pending messages of this process's specific channels and ``other_channels``."""
+        conn = self._connection()
+        self._cleanup(time.time())
+        # "!" + 1 == '"': every name starting with the prefix sorts below prefix[:-1] + '"'
+        where, params = "(channel >= ? AND channel < ?)", [self.client_prefix, self.client_prefix[:-1] + '"']
+        if other_channels:
+            where += f" OR channel IN ({','.join('?' * len(other_channels))})"
+            params.extend(other_channels)
+        rows = conn.execute(
+            f"""DELETE FROM channel_message WHERE id IN
+                (SELECT id FROM channel_message WHERE {where} ORDER BY id LIMIT {FETCH_LIMIT})
+                RETURNING id, channel, body, expires""",
+            params,
+        ).fetchall()
+        rows.sort()
+        return [row[1:] for row in rows]
@@ -3,12 +3,18 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.contrib.auth import get_user_model
-from .models import Chat, Message
+from .inbox import send_message
+from .models import Chat, ImportJob
 from .serializers import MessageSerializer
 
 User = get_user_model()
 
 
+def user_group(user_id):
+    """Group of a user's all-chats sockets; every message of their chats is sent to it."""
+    return f"user_{user_id}"
+
+
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.chat_id = self.scope['url_route']['kwargs']['chat_id']  # "all" or chat_id
@@ -40,17 +46,16 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.room_group_name = f'chat_{self.chat_id}'
             await self.channel_layer.group_add(self.room_group_name, self.channel_name)
 
-        # Mode 2: Teacher (subscribe to all their chats)
+        # Mode 2: Teacher (every chat, through their own fan-out group)
         else:
             if self.user.role != "teacher":
                 await self.close(code=4005)  # Only teachers allowed
                 return
 
-            chats = await database_sync_to_async(self.get_user_chats)(self.user)
-            self.room_group_names = [f"chat_{c.id}" for c in chats]
-
-            for group in self.room_group_names:
-                await self.channel_layer.group_add(group, self.channel_name)
+            # messages are also published to user_<id> for each participant, so one
+            # group covers all chats, including ones created after connecting
+            self.room_group_name = user_group(self.user.pk)
+            await self.channel_layer.group_add(self.room_group_name, self.channel_name)
 
         await self.accept()
 
@@ -71,22 +76,23 @@ class ChatConsumer(AsyncWebsocketConsumer):
         except Chat.DoesNotExist:
             return False
 
-    def get_user_chats(self, user):
-        """Return all chats where user is a participant"""
-        return list(Chat.objects.filter(participants=user))
-
     def save_message(self, chat_id, user, content):
         chat = Chat.objects.get(pk=chat_id)
-        return Message.objects.create(chat=chat, sender=user, content=content)
+        return send_message(chat.pk, user, content)
+
+    def store_message(self, chat_id, user, content):
+        """Save a message from a chat participant; return it with the ids of all participants."""
+        participant_ids = list(Chat.participants.through.objects.filter(chat_id=chat_id)
+                                                        .values_list("user_id", flat=True))
+        if user.pk not in participant_ids:
+            return None, []
+        return self.save_message(chat_id, user, content), participant_ids
 
     # ------------------ LIFECYCLE ------------------
 
     async def disconnect(self, close_code):
-        if self.chat_id != "all":
-            await self.channel_layer.group_discard(f"chat_{self.chat_id}", self.channel_name)
-        else:
-            for group in getattr(self, "room_group_names", []):
-                await self.channel_layer.group_discard(group, self.channel_name)
+        if hasattr(self, "room_group_name"):
+            await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
     async def receive(self, text_data):
         data = json.loads(text_data)
@@ -106,14 +112,45 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
 
         # Save message safely
-        msg = await database_sync_to_async(self.save_message)(target_chat_id, self.user, content)
-        payload = MessageSerializer(msg).data
+        msg, participant_ids = await database_sync_to_async(self.store_message)(
+            target_chat_id, self.user, content)
+        if msg is None:
+            return  # not a participant of that chat
+        event = {"type": "chat_message", "payload": MessageSerializer(msg).data}
 
-        # Broadcast only to target chat group
-        await self.channel_layer.group_send(
-            f"chat_{target_chat_id}",
-            {"type": "chat_message", "payload": payload}
-        )
+        # Broadcast to the chat's sockets and to each participant's all-chats sockets
+        await self.channel_layer.group_send(f"chat_{target_chat_id}", event)
+        for user_id in participant_ids:
+            await self.channel_layer.group_send(user_group(user_id), event)
 
     async def chat_message(self, event):
         await self.send(text_data=json.dumps(event["payload"]))
+
+
+class ImportProgressConsumer(AsyncWebsocketConsumer):
+    """Pushes ImportJob progress to the admin who started the import."""
+
+    async def connect(self):
+        self.job_id = self.scope['url_route']['kwargs']['job_id']
+        user = self.scope.get("user")
+        if not user or not user.is_authenticated:
+            await self.close(code=4003)  # Invalid token
+            return
+
+        owns_job = await database_sync_to_async(
+            ImportJob.objects.filter(pk=self.job_id, created_by=user).exists
+        )()
+        if not owns_job:
+            await self.close(code=4004)  # Not your job
+            return
+
+        self.group_name = f"import_{self.job_id}"
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def import_progress(self, event):
+        await self.send(text_data=json.dumps(event["payload"]))
@@ -0,0 +1,113 @@
+# core/dashboard.py
+"""
+Cached student exam dashboard.
+
+Students poll their exam list during exam windows, so everything the list
+and ``unattempted`` need is cached under version tokens (core/caching.py):
+
+    student-of:{user_id}                  → student id (0 = no profile)
+    student-state:{student_id}:{version}  → {"school_class": id, "section": id,
+                                             "attempted": [exam ids]}
+    class-exam-rows:{class_id}:{version}  → (id, created_at, start_time, end_time, section id)
+                                            of the grade's exams, newest first
+    exam-summary:{exam_id}:{exam version} → ExamSummarySerializer data
+
+core/signals.py bumps the versions when exams change, attempts are saved or a
+student's class or teacher changes, so a steady-state poll reads only the cache
+- as long as the cache holds about four entries per student without culling
+(see CACHES in settings.py).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .caching import get_version, get_versions
+from .models import Exam, Student, StudentExam, exam_window
+
+DASHBOARD_TIMEOUT = getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 60 * 60)
+
+
+def student_key(user_id):
+    return f"student-of:{user_id}"
+
+
+def student_id_for(user):
+    key = student_key(user.pk)
+    student_id = cache.get(key)
+    if student_id is None:
+        student_id = Student.objects.filter(user=user).values_list("id", flat=True).first() or 0
+        cache.set(key, student_id, DASHBOARD_TIMEOUT)
+    return student_id or None
+
+
+def student_state(student_id):
+    key = f"student-state:{student_id}:{get_version('student-exams', student_id)}"
+    state = cache.get(key)
+    if state is None:
+        row = Student.objects.filter(pk=student_id).values_list("school_class_id", "section_id").first()
+        school_class, section = row or (None, None)
+        state = {
+            "school_class": school_class,
+            "section": section,
+            "attempted": list(StudentExam.objects.filter(student_id=student_id)
+                                                 .values_list("exam_id", flat=True)),
+        }
+        cache.set(key, state, DASHBOARD_TIMEOUT)
+    return state
+
+
+def class_exams(class_id):
+    key = f"class-exam-rows:{class_id}:{get_version('class-exams', class_id)}"
+    exams = cache.get(key)
+    if exams is None:
+        exams = list(Exam.objects.filter(school_class_id=class_id).order_by("-created_at", "-id")
+                                 .values_list("id", "created_at", "start_time", "end_time", "section_id"))
+        cache.set(key, exams, DASHBOARD_TIMEOUT)
+    return exams
+
+
+def exam_summaries(exam_ids):
+    """Summary data per exam, shared by every student."""
+    versions = get_versions("exam", exam_ids)
+    keys = {pk: f"exam-summary:{pk}:{versions[pk]}" for pk in exam_ids}
+    found = cache.get_many(list(keys.values()))
+    missing = [pk for pk in exam_ids if keys[pk] not in found]
+    if missing:
+        from .serializers import ExamSummarySerializer   # serializers → signals → dashboard
+        exams = Exam.objects.filter(pk__in=missing).select_related("teacher__user")
+        fresh = {keys[e.pk]: dict(ExamSummarySerializer(e).data) for e in exams}
+        cache.set_many(fresh, DASHBOARD_TIMEOUT)
+        found.update(fresh)
+    return [found[keys[pk]] for pk in exam_ids if keys[pk] in found]
+
+
+def visible_exam_ids(user):
+    """Ids of the exams a student user may open, from the cache."""
+    student_id = student_id_for(user)
+    if student_id is None:
+        return set()
+    return {row[0] for row in student_exam_rows(user)}
+
+
+def student_exam_rows(user, when=None, unattempted=False, now=None):
+    """
+    The class_exams rows of a student user's visible exams, newest first,
+    optionally only those in one of EXAM_WINDOWS and/or not attempted yet.
+    """
+    student_id = student_id_for(user)
+    if student_id is None:
+        return []
+    state = student_state(student_id)
+    exams = class_exams(state["school_class"]) if state["school_class"] else []
+    now = now or timezone.now()
+    attempted = set(state["attempted"]) if unattempted else ()
+    return [
+        row for row in exams
+        if row[4] in (None, state["section"]) and row[0] not in attempted
+        and (when is None or exam_window(row[2], row[3], now) == when)
+    ]
+
+
+def student_exams(user, when=None, unattempted=False, now=None):
+    """Summaries of the exams ``student_exam_rows`` selects."""
+    return exam_summaries([row[0] for row in student_exam_rows(user, when, unattempted, now)])
@@ -0,0 +1,116 @@
+# core/delivery.py
+"""
+Pre-encoded exam delivery payloads.
+
+When an exam starts every student fetches it at once. Instead of running
+ExamReadSerializer per request, the payload is serialized once per exam
+version and kept as JSON byte fragments (exam head, each question's head and
+each option), in a process-local LRU and in the shared cache. A response is
+the unshuffled bytes as they are, or, when EXAM_DELIVERY shuffling is on, the
+same fragments joined in a per-student permutation; nothing is re-serialized.
+The ETag is derived from the payload digest and the permutation seed, so
+unchanged exams are answered with 304.
+"""
+import hashlib
+import json
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from rest_framework.utils.encoders import JSONEncoder
+
+from .caching import LRUCache, get_version
+from .models import Exam, Question
+
+DEFAULTS = {
+    "SHUFFLE_QUESTIONS": False,   # per-student question order for students
+    "SHUFFLE_OPTIONS": False,     # per-student option order for students
+    "LRU_SIZE": 128,
+    "CACHE_TIMEOUT": 60 * 60,
+}
+
+
+def delivery_setting(name):
+    return getattr(settings, "EXAM_DELIVERY", {}).get(name, DEFAULTS[name])
+
+
+_local_payloads = LRUCache(delivery_setting("LRU_SIZE"))
+
+
+def _dumps(value):
+    # same output as DRF's JSONRenderer
+    return json.dumps(value, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class ExamPayload:
+    """ExamReadSerializer output of one exam version as reusable JSON fragments."""
+    __slots__ = ("exam_id", "version", "head", "questions", "body", "digest")
+
+    def __init__(self, exam_id, version, head, questions):
+        self.exam_id = exam_id
+        self.version = version
+        self.head = head                # b'{..., "questions":['
+        self.questions = questions      # ((b'{..., "options":[', (option bytes, ...)), ...)
+        self.body = self.render()
+        self.digest = hashlib.sha1(self.body).hexdigest()
+
+    @classmethod
+    def build(cls, exam_id, version):
+        from .serializers import ExamReadSerializer   # serializers → signals → dashboard → here
+
+        exam = Exam.objects.select_related("teacher__user").prefetch_related(
+            Prefetch("questions", queryset=Question.objects.order_by("id").prefetch_related("options"))
+        ).filter(pk=exam_id).first()
+        if exam is None:
+            return None
+        data = dict(ExamReadSerializer(exam).data)
+        questions = []
+        for question in data.pop("questions"):
+            question = dict(question)
+            options = tuple(_dumps(option) for option in question.pop("options"))
+            questions.append((_dumps(question)[:-1] + b',"options":[', options))
+        return cls(exam_id, version, _dumps(data)[:-1] + b',"questions":[', tuple(questions))
+
+    def render(self, seed=None, shuffle_questions=False, shuffle_options=False):
+        """The payload bytes, with questions/options permuted by ``seed`` if asked."""
+        rng = random.Random(seed)
+        order = list(range(len(self.questions)))
+        if shuffle_questions:
+            rng.shuffle(order)
+        parts = [self.head]
+        for n, index in enumerate(order):
+            prefix, options = self.questions[index]
+            if shuffle_options:
+                options = [options[i] for i in rng.sample(range(len(options)), len(options))]
+            parts += [b"," if n else b"", prefix, b",".join(options), b"]}"]
+        parts.append(b"]}")
+        return b"".join(parts)
+
+    def for_student(self, student_id):
+        """``(body, etag)`` as delivered to one student."""
+        shuffle_questions = delivery_setting("SHUFFLE_QUESTIONS")
+        shuffle_options = delivery_setting("SHUFFLE_OPTIONS")
+        if student_id is None or not (shuffle_questions or shuffle_options):
+            return self.body, f'"{self.digest}"'
+        seed = f"{self.exam_id}:{student_id}"
+        body = self.render(seed, shuffle_questions, shuffle_options)
+        return body, f'"{self.digest}-{hashlib.sha1(seed.encode()).hexdigest()[:12]}"'
+
+
+def get_payload(exam_id):
+    """The current version's payload: process LRU, then shared cache, then the database."""
+    version = get_version("exam", exam_id)
+    payload = _local_payloads.get((exam_id, version))
+    if payload is not None:
+        return payload
+
+    cache_key = f"exam-payload:{exam_id}:{version}"
+    payload = cache.get(cache_key)
+    if payload is None:
+        payload = ExamPayload.build(exam_id, version)
+        if payload is None:
+            return None
+        cache.set(cache_key, payload, delivery_setting("CACHE_TIMEOUT"))
+    _local_payloads.set((exam_id, version), payload)
+    return payload
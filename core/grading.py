@@ -0,0 +1,200 @@
+# core/grading.py
+"""
+Set-based grading of exam submissions.
+
+The exam's question → option layout is loaded once, every submitted
+(question_id, option_id) pair is checked in memory and all Answer rows are
+written with a single upsert, so the cost of a submission does not depend on
+the number of questions in the exam.
+"""
+from array import array
+from collections import defaultdict
+from types import MappingProxyType
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .caching import LRUCache, get_version
+from .models import Answer, Option, StudentExam
+from .signals import models_changed, students_changed
+from .stats import record_results
+
+ANSWER_KEY_TIMEOUT = getattr(settings, "ANSWER_KEY_CACHE_TIMEOUT", 60 * 60)
+_local_keys = LRUCache(getattr(settings, "ANSWER_KEY_LRU_SIZE", 256))
+
+
+class AnswerKey:
+    """
+    Immutable question/option layout of one exam.
+
+    Pickles as parallel int arrays so it stays compact in the shared cache.
+    """
+    __slots__ = ("exam_id", "version", "option_question", "correct")
+
+    def __init__(self, exam_id, rows, version=None):
+        option_question = {}   # option_id   → question_id
+        correct = {}           # question_id → correct option_id
+        for option_id, question_id, is_correct in rows:
+            option_question[option_id] = question_id
+            if is_correct:
+                correct[question_id] = option_id
+        object.__setattr__(self, "exam_id", exam_id)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "option_question", MappingProxyType(option_question))
+        object.__setattr__(self, "correct", MappingProxyType(correct))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("AnswerKey is immutable")
+
+    def __reduce__(self):
+        options = array("q", self.option_question)
+        questions = array("q", self.option_question.values())
+        flags = array("b", (self.correct.get(q) == o for o, q in self.option_question.items()))
+        return (_unpickle_answer_key,
+                (self.exam_id, self.version, options.tobytes(), questions.tobytes(), flags.tobytes()))
+
+    @classmethod
+    def load(cls, exam_id, version=None):
+        rows = Option.objects.filter(question__exam_id=exam_id) \
+                             .values_list("id", "question_id", "is_correct")
+        return cls(exam_id, rows, version)
+
+    @property
+    def question_ids(self):
+        return frozenset(self.option_question.values())
+
+    def check(self, answers):
+        """
+        Match submitted answers against the key.
+
+        Returns ``(chosen, correct, total)`` where ``chosen`` maps
+        question_id → option_id for every valid pair. Pairs whose option does
+        not belong to the question still count towards ``total``.
+        """
+        chosen, total = {}, 0
+        for ans in answers:
+            total += 1
+            question_id = ans["question_id"]
+            option_id = ans["option_id"]
+            if self.option_question.get(option_id) != question_id:
+                continue
+            chosen[question_id] = option_id
+        correct = len(self.correct_questions(chosen))
+        return chosen, correct, total
+
+    def correct_questions(self, chosen):
+        """Ids of the questions answered correctly in ``chosen``."""
+        return [q for q, o in chosen.items() if self.correct.get(q) == o]
+
+
+def _unpickle_answer_key(exam_id, version, options, questions, flags):
+    arrays = [array("q"), array("q"), array("b")]
+    for arr, raw in zip(arrays, (options, questions, flags)):
+        arr.frombytes(raw)
+    return AnswerKey(exam_id, zip(*arrays), version)
+
+
+def get_answer_key(exam_id):
+    """
+    Return the answer key of an exam, built lazily on first use.
+
+    Looked up in the process-local LRU first, then in the shared cache, and
+    only loaded from the Option table when neither holds the current version.
+    """
+    version = get_version("exam", exam_id)
+    key = _local_keys.get((exam_id, version))
+    if key is not None:
+        return key
+
+    cache_key = f"answer-key:{exam_id}:{version}"
+    key = cache.get(cache_key)
+    if key is None:
+        key = AnswerKey.load(exam_id, version)
+        cache.set(cache_key, key, ANSWER_KEY_TIMEOUT)
+    _local_keys.set((exam_id, version), key)
+    return key
+
+
+def save_answers(rows):
+    """Upsert Answer rows (one per attempt/question) with one statement."""
+    if not rows:
+        return
+    Answer.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["attempt", "question"],
+        update_fields=["chosen"],
+    )
+
+
+def claim_attempts(attempt_ids, finished_at):
+    """
+    Mark the still-open attempts among ``attempt_ids`` finished with one
+    guarded UPDATE and return the ids this call claimed. An attempt already
+    finished (by another request, the scheduler or a queue worker) is not
+    returned, so nothing is ever graded or counted twice. Must run inside the
+    grading transaction.
+    """
+    if not attempt_ids:
+        return set()
+    qn = connection.ops.quote_name
+    placeholders = ", ".join(["%s"] * len(attempt_ids))
+    with connection.cursor() as cursor:
+        # the ORM's update() cannot report which rows matched; RETURNING can
+        cursor.execute(
+            f"UPDATE {qn(StudentExam._meta.db_table)} SET {qn('finished_at')} = %s"
+            f" WHERE {qn('id')} IN ({placeholders}) AND {qn('finished_at')} IS NULL"
+            f" RETURNING {qn('id')}",
+            [connection.ops.adapt_datetimefield_value(finished_at), *attempt_ids],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def grade_attempts(submissions, finished_at=None, score_all_questions=False):
+    """
+    Grade a batch of ``(attempt, answers)`` pairs and persist the results.
+
+    The open attempts are claimed first (``claim_attempts``); attempts that
+    are already finished are skipped and left untouched. All answers are
+    upserted with one statement and all attempts updated with one more,
+    inside a single transaction that also folds the scores into each exam's
+    ExamStats row. Answer keys come from the cache, so the query count
+    depends on the number of exams in the batch, not on its size.
+    ``finished_at`` defaults to now. Scores are out of the answers given
+    unless ``score_all_questions``, when unanswered questions count as wrong.
+    Returns the attempts that were graded.
+    """
+    now = finished_at or timezone.now()
+    rows, attempts, results = [], [], defaultdict(list)
+    with transaction.atomic():
+        claimed = claim_attempts([attempt.pk for attempt, _ in submissions], now)
+        for attempt, answers in submissions:
+            if attempt.pk not in claimed:
+                continue
+            claimed.discard(attempt.pk)    # the same attempt twice in one batch counts once
+            key = get_answer_key(attempt.exam_id)
+            chosen, correct, total = key.check(answers)
+            if score_all_questions:
+                total = len(key.question_ids)
+            rows.extend(Answer(attempt=attempt, question_id=q, chosen_id=o) for q, o in chosen.items())
+            attempt.finished_at = now
+            attempt.score = round((correct / total) * 100, 2) if total else 0
+            attempt.status = "attempted"
+            attempts.append(attempt)
+            results[attempt.exam_id].append((attempt.score, key.correct_questions(chosen)))
+
+        if attempts:
+            save_answers(rows)
+            StudentExam.objects.bulk_update(attempts, ["finished_at", "score", "status"])
+            record_results(results)
+            models_changed(StudentExam)
+            students_changed(a.student_id for a in attempts)
+    return attempts
+
+
+def grade_attempt(attempt, answers):
+    """Grade and persist a single submission; None if it was already finished."""
+    graded = grade_attempts([(attempt, answers)])
+    return graded[0] if graded else None
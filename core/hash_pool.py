@@ -0,0 +1,21 @@
+# core/hash_pool.py
+"""
+Process pools for password hashing (see core/importing.py).
+
+Workers are started with forkserver rather than fork: the web process is
+multi-threaded, and forking it could copy held locks and open database
+connections into them. Fresh workers import only this module to run the
+initializer, so it must not import models before ``django.setup()``.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def hash_pool(workers):
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("forkserver"),
+                               initializer=_init_worker)
@@ -0,0 +1,149 @@
+# core/import_jobs.py
+"""
+Background student imports.
+
+The upload is spooled to ``IMPORT_SPOOL_DIR`` and an ImportJob row is created;
+a thread pool then streams the file through csv.DictReader and the bulk
+StudentImporter. Progress is saved in the same transaction as each chunk, so
+a job that dies half-way resumes from its last committed row
+(``manage.py resume_import_jobs``, once the row has not been saved for
+CLAIM_TIMEOUT seconds). Progress is also pushed to the
+``import_<job_id>`` channel group.
+"""
+import csv
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .importing import StudentImporter, import_setting, job_hash_pool
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+MAX_STORED_ERRORS = 1000
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def spool_dir():
+    path = Path(getattr(settings, "IMPORT_SPOOL_DIR", Path(settings.BASE_DIR) / "import_spool"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def create_job(upload, user):
+    """Copy the uploaded file to disk in chunks and register a job for it."""
+    job = ImportJob(created_by=user)
+    path = spool_dir() / f"{job.pk}.csv"
+    with open(path, "wb") as out:
+        for chunk in upload.chunks():
+            out.write(chunk)
+    job.file_path = str(path)
+    job.save()
+    return job
+
+
+def start_job(job):
+    """Run ``job`` on the worker pool, or inline when JOB_WORKERS is 0."""
+    workers = import_setting("JOB_WORKERS")
+    if not workers:
+        run_job(job.pk)
+        return
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(workers, thread_name_prefix="student-import")
+    transaction.on_commit(lambda: _executor.submit(_run_in_thread, job.pk))
+
+
+def _run_in_thread(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def publish(job):
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    try:
+        async_to_sync(layer.group_send)(f"import_{job.pk}",
+                                        {"type": "import.progress", "payload": job.progress()})
+    except Exception:
+        logger.warning("Could not publish progress of import %s", job.pk, exc_info=True)
+
+
+def claim_job(job):
+    """
+    Mark ``job`` running, unless another process changed it since it was
+    read; True if this process now owns it.
+    """
+    return ImportJob.objects.filter(pk=job.pk, status=job.status, updated_at=job.updated_at) \
+                            .update(status="running", updated_at=timezone.now()) == 1
+
+
+def run_job(job_id):
+    """Run a queued job; a job another process already claimed is left to it."""
+    job = ImportJob.objects.get(pk=job_id)
+    if job.status != "queued" or not claim_job(job):
+        return ImportJob.objects.get(pk=job_id)
+    return _run(job_id)
+
+
+def _run(job_id):
+    """Import the claimed job's file, starting after its last committed row."""
+    job = ImportJob.objects.get(pk=job_id)
+    job.started_at = job.started_at or timezone.now()
+    job.save(update_fields=["started_at", "updated_at"])
+
+    def on_chunk(importer):
+        job.rows_processed = resume_from + importer.rows
+        job.rows_created = created_before + importer.created_count
+        job.rows_failed = failed_before + len(importer.errors)
+        job.errors = (errors_before + importer.errors)[:MAX_STORED_ERRORS]
+        job.save(update_fields=["rows_processed", "rows_created", "rows_failed",
+                                "errors", "updated_at"])
+        transaction.on_commit(lambda: publish(job))
+
+    resume_from = job.rows_processed
+    created_before, failed_before, errors_before = job.rows_created, job.rows_failed, list(job.errors)
+    try:
+        with open(job.file_path, newline="", encoding="utf-8") as fh:
+            rows = islice(enumerate(csv.DictReader(fh), start=2), resume_from, None)
+            StudentImporter(keep_created=False, executor=job_hash_pool()).run(rows, on_chunk=on_chunk)
+    except Exception as exc:
+        logger.exception("Import job %s failed", job.pk)
+        job.status, job.detail = "failed", str(exc)
+    else:
+        job.status = "done"
+        Path(job.file_path).unlink(missing_ok=True)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "detail", "finished_at", "updated_at"])
+    publish(job)
+    return job
+
+
+def resume_jobs():
+    """
+    Restart the jobs whose process died: queued or running, but not saved for
+    CLAIM_TIMEOUT seconds. A live job saves its row after every chunk, so it
+    is left to the process running it.
+    """
+    stale = timezone.now() - timedelta(seconds=import_setting("CLAIM_TIMEOUT"))
+    resumed = []
+    for job in ImportJob.objects.filter(status__in=["queued", "running"], updated_at__lt=stale) \
+                                .order_by("created_at"):
+        if claim_job(job):
+            resumed.append(_run(job.pk))
+    return resumed
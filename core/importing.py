@@ -0,0 +1,220 @@
+# core/importing.py
+"""
+Bulk student import.
+
+Instead of running StudentSerializer (and its per-row uniqueness queries) for
+every CSV row, the importer loads teachers, usernames and roll numbers into
+sets once, validates rows with database-free field validation, hashes
+passwords (inline in a request, in one shared process pool for background
+jobs) and writes users and students with bulk_create, one transaction per
+chunk.
+"""
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from .hash_pool import hash_pool
+from .models import Section, Student, Teacher, User, parse_class_name
+from .search import refresh_students
+from .signals import models_changed
+
+DEFAULTS = {
+    "BATCH_SIZE": 500,       # rows validated and inserted per transaction
+    "HASH_WORKERS": 1,       # processes hashing passwords per request import; 1 = inline
+    "JOB_HASH_WORKERS": None,  # shared pool of background jobs; None = CPU count, 1 = inline
+    "JOB_WORKERS": 2,        # threads running background import jobs; 0 = run inline
+    "CLAIM_TIMEOUT": 300,    # seconds without progress before a running job counts as dead
+}
+
+
+def import_setting(name):
+    return getattr(settings, "STUDENT_IMPORT", {}).get(name, DEFAULTS[name])
+
+
+class StudentRowSerializer(serializers.Serializer):
+    """Field-level validation of one CSV row; never touches the database."""
+    username         = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email            = serializers.EmailField(allow_blank=True)
+    first_name       = serializers.CharField(max_length=150, allow_blank=True)
+    last_name        = serializers.CharField(max_length=150, allow_blank=True)
+    password         = serializers.CharField(required=False, allow_blank=True)
+    phone            = serializers.CharField(max_length=15)
+    roll_number      = serializers.CharField(max_length=20)
+    student_class    = serializers.CharField(max_length=50)
+    date_of_birth    = serializers.DateField()
+    admission_date   = serializers.DateField()
+    status           = serializers.ChoiceField(choices=["active", "inactive"], required=False)
+    assigned_teacher = serializers.IntegerField(required=False, allow_null=True)
+
+
+_job_pool = None
+_job_pool_lock = threading.Lock()
+
+
+def job_hash_pool():
+    """
+    The process pool background jobs hash passwords in, started on first use
+    and shared by every job of this process; None when JOB_HASH_WORKERS is 1.
+    """
+    global _job_pool
+    workers = import_setting("JOB_HASH_WORKERS") or os.cpu_count() or 1
+    if workers <= 1:
+        return None
+    with _job_pool_lock:
+        if _job_pool is None:
+            _job_pool = hash_pool(workers)
+    return _job_pool
+
+
+def _hash_passwords(passwords, executor):
+    if executor is None:
+        return [make_password(p) for p in passwords]
+    return list(executor.map(make_password, passwords, chunksize=max(1, len(passwords) // 32)))
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class StudentImporter:
+    """
+    Import ``(row_number, row_dict)`` pairs; rows use the same columns as
+    StudentViewSet.import_csv. Errors are reported per row in the same
+    "Row N: ..." form, and an invalid row never blocks the rest of its chunk.
+    Created students are kept (with user and teacher attached, so they
+    serialize without queries) unless ``keep_created`` is False.
+
+    Passwords are hashed in ``executor`` when given (it is left running),
+    otherwise in a pool of ``hash_workers`` processes started for this run,
+    or inline when that is 1.
+    """
+
+    def __init__(self, batch_size=None, hash_workers=None, keep_created=True, executor=None):
+        self.keep_created = keep_created
+        self.batch_size = batch_size or import_setting("BATCH_SIZE")
+        self.hash_workers = hash_workers or import_setting("HASH_WORKERS") or os.cpu_count() or 1
+        self.executor = executor
+        self.teachers = Teacher.objects.select_related("user").in_bulk()
+        self.usernames = set(User.objects.values_list("username", flat=True))
+        self.roll_numbers = set(Student.objects.values_list("roll_number", flat=True))
+        # (grade, section) → Section; bulk_create skips Student.save, which normally links them
+        self.sections = {(s.school_class.grade, s.name): s
+                         for s in Section.objects.select_related("school_class")}
+        self.created, self.errors = [], []
+        self.rows = self.created_count = 0
+
+    def validate(self, idx, row):
+        """Return validated data for a row, or record its error and return None."""
+        teacher_id = row.get("assigned_teacher_id") or None
+        data = {
+            "username": row.get("username"),
+            "email": row.get("email"),
+            "first_name": row.get("first_name"),
+            "last_name": row.get("last_name"),
+            "password": row.get("password") or "",
+            "phone": row.get("phone"),
+            "roll_number": row.get("roll_number"),
+            "student_class": row.get("student_class"),
+            "date_of_birth": row.get("date_of_birth"),
+            "admission_date": row.get("admission_date"),
+            "status": row.get("status") or "active",
+            "assigned_teacher": teacher_id if str(teacher_id or "").isdigit() else None,
+        }
+        ser = StudentRowSerializer(data=data)
+        if not ser.is_valid():
+            self.errors.append(f"Row {idx}: {ser.errors}")
+            return None
+        valid = ser.validated_data
+        if valid["username"] in self.usernames:
+            self.errors.append(f"Row {idx}: {{'user': {{'username': ['A user with that username already exists.']}}}}")
+            return None
+        if valid["roll_number"] in self.roll_numbers:
+            self.errors.append(f"Row {idx}: {{'roll_number': ['student with this roll number already exists.']}}")
+            return None
+        # an unknown teacher leaves the student unassigned, as before
+        valid["assigned_teacher"] = self.teachers.get(valid.get("assigned_teacher"))
+        key = parse_class_name(valid["student_class"])
+        if key not in self.sections:
+            self.sections[key] = Section.for_name(valid["student_class"])
+        valid["section"] = self.sections[key]
+        self.usernames.add(valid["username"])
+        self.roll_numbers.add(valid["roll_number"])
+        return valid
+
+    def build_users(self, valid_rows, executor):
+        hashes = _hash_passwords([v["password"] or f'{v["username"]}123' for v in valid_rows], executor)
+        return [
+            User(username=v["username"], email=v["email"], first_name=v["first_name"],
+                 last_name=v["last_name"], role="student", password=pwd)
+            for v, pwd in zip(valid_rows, hashes)
+        ]
+
+    def insert(self, numbered_valid, users):
+        valid_rows = [v for _, v in numbered_valid]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                students = Student.objects.bulk_create([
+                    Student(user=user, phone=v["phone"], roll_number=v["roll_number"],
+                            student_class=v["student_class"], date_of_birth=v["date_of_birth"],
+                            admission_date=v["admission_date"], status=v.get("status", "active"),
+                            assigned_teacher=v["assigned_teacher"], section=v["section"],
+                            school_class_id=v["section"] and v["section"].school_class_id)
+                    for user, v in zip(users, valid_rows)
+                ])
+        except IntegrityError as exc:
+            # rows written concurrently by someone else; report the whole chunk
+            self.errors.extend(f"Row {idx}: {exc}" for idx, _ in numbered_valid)
+            return []
+        models_changed(User, Student)
+        transaction.on_commit(lambda: refresh_students([s.pk for s in students]))
+        self.created_count += len(students)
+        if self.keep_created:
+            self.created.extend(students)
+        return students
+
+    def run(self, numbered_rows, on_chunk=None):
+        """
+        Import all rows and return throughput stats. ``on_chunk(importer)`` is
+        called inside each chunk's transaction, after its rows are written.
+        """
+        start = time.perf_counter()
+        executor = own_executor = None
+        if self.executor is not None:
+            executor = self.executor
+        elif self.hash_workers > 1:
+            executor = own_executor = hash_pool(self.hash_workers)
+        try:
+            for chunk in _chunks(numbered_rows, self.batch_size):
+                self.rows += len(chunk)
+                valid = [(idx, v) for idx, v in ((idx, self.validate(idx, row)) for idx, row in chunk) if v]
+                users = self.build_users([v for _, v in valid], executor) if valid else []
+                with transaction.atomic():
+                    if valid:
+                        self.insert(valid, users)
+                    if on_chunk is not None:
+                        on_chunk(self)
+        finally:
+            if own_executor is not None:
+                own_executor.shutdown()
+        elapsed = time.perf_counter() - start
+        return {
+            "rows": self.rows,
+            "created": self.created_count,
+            "failed": len(self.errors),
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(self.rows / elapsed, 1) if elapsed else None,
+        }
@@ -0,0 +1,75 @@
+# core/inbox.py
+"""
+Per-participant chat inbox state.
+
+Every (chat, participant) pair has a ChatInbox row holding the newest message
+id the participant has read, how many messages from others arrived after it
+and when the chat last saw activity. The rows are created when participants
+join a chat (see the m2m_changed hook in core/signals.py) and kept current by
+``record_message`` and ``mark_read``, each a couple of UPDATEs in one
+transaction, so listing the inbox with unread badges is an indexed read of
+ChatInbox alone.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import ChatInbox, Message
+
+
+def open_inboxes(chat_id, user_ids):
+    """Create missing inbox rows for users who joined a chat."""
+    ChatInbox.objects.bulk_create(
+        [ChatInbox(chat_id=chat_id, user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+
+
+def record_message(message):
+    """
+    A message was sent: it is read by its sender and unread for everyone
+    else; the chat moves to the top of every participant's inbox.
+    """
+    inboxes = ChatInbox.objects.filter(chat_id=message.chat_id)
+    with transaction.atomic():
+        inboxes.exclude(user_id=message.sender_id).update(
+            unread_count=F("unread_count") + 1, last_activity=message.timestamp,
+        )
+        inboxes.filter(user_id=message.sender_id).update(
+            last_read_id=Greatest("last_read_id", message.pk), unread_count=0,
+            last_activity=message.timestamp,
+        )
+
+
+def send_message(chat_id, user, content):
+    """Write a chat message and update the participants' inboxes with it."""
+    with transaction.atomic():
+        message = Message.objects.create(chat_id=chat_id, sender=user, content=content)
+        record_message(message)
+    return message
+
+
+def mark_read(chat_id, user, up_to_id=None):
+    """
+    Mark the chat read for ``user`` up to message ``up_to_id`` (default, and
+    at most: the chat's newest message) and return the updated inbox row, or None if the user has
+    no inbox for the chat. Message.read is set on the messages from others
+    that this covers, and the unread counter is recounted from the index.
+    """
+    messages = Message.objects.filter(chat_id=chat_id)
+    with transaction.atomic():
+        inbox = ChatInbox.objects.select_for_update().filter(chat_id=chat_id, user=user).first()
+        if inbox is None:
+            return None
+        newest = messages.order_by("-id").values_list("id", flat=True).first() or 0
+        # never past this chat's newest message, or later messages would count as read
+        up_to_id = newest if up_to_id is None else min(up_to_id, newest)
+        if up_to_id <= inbox.last_read_id:
+            return inbox
+        from_others = messages.exclude(sender=user)
+        from_others.filter(id__gt=inbox.last_read_id, id__lte=up_to_id, read=False).update(read=True)
+        inbox.last_read_id = up_to_id
+        inbox.unread_count = from_others.filter(id__gt=up_to_id).count()
+        inbox.save(update_fields=["last_read_id", "unread_count"])
+    return inbox
+
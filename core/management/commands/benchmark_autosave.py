@@ -0,0 +1,90 @@
+import random
+import time
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.autosave import AnswerBuffer
+from core.models import Exam, Option, Question, Student, StudentExam, User
+
+
+class Command(BaseCommand):
+    help = ("Simulate concurrent test-takers autosaving answers and compare database writes "
+            "with one write per click. Runs in a transaction that is rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=1000)
+        parser.add_argument("--questions", type=int, default=40)
+        parser.add_argument("--duration", type=int, default=60, help="Simulated seconds.")
+        parser.add_argument("--clicks-per-minute", type=float, default=6,
+                            help="Answer changes per student per minute.")
+        parser.add_argument("--flush-interval", type=float, default=2.0, help="Simulated seconds.")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            attempt_ids, choices = self.setup(options)
+            result = self.simulate(rng, attempt_ids, choices, options)
+            transaction.set_rollback(True)
+
+        clicks, statements, rows, flush_seconds = result
+        self.stdout.write(f"{options['students']} students × {options['duration']}s, "
+                          f"{options['clicks_per_minute']:g} "
+                          f"changes/min each, flush every {options['flush_interval']:g}s")
+        self.stdout.write(f"  answer changes            {clicks}")
+        self.stdout.write(f"  one write per change      {clicks} statements")
+        self.stdout.write(f"  buffered                  {statements} statements, {rows} rows")
+        if statements:
+            self.stdout.write(f"  reduction                 {clicks / statements:.0f}× fewer statements, "
+                              f"{clicks / max(rows, 1):.1f}× fewer rows")
+            self.stdout.write(f"  flush time                {1000 * flush_seconds / statements:.1f} ms "
+                              f"avg per statement")
+
+    def setup(self, options):
+        exam = Exam.objects.create(title="Autosave benchmark", target_class="0",
+                                   start_time=timezone.now(), duration_min=60)
+        questions = Question.objects.bulk_create(
+            [Question(exam=exam, text=f"Q{i}") for i in range(options["questions"])])
+        options_ = Option.objects.bulk_create(
+            [Option(question=q, text=str(k), is_correct=k == 0) for q in questions for k in range(4)])
+        choices = {}
+        for option in options_:
+            choices.setdefault(option.question_id, []).append(option.id)
+
+        tag = f"bench{int(time.time())}"
+        users = User.objects.bulk_create([
+            User(username=f"{tag}_{i}", role="student", password="!") for i in range(options["students"])])
+        students = Student.objects.bulk_create([
+            Student(user=u, phone="0", roll_number=f"{tag}{i}", student_class="0",
+                    date_of_birth=timezone.now().date(), admission_date=timezone.now().date(),
+                    status="active")
+            for i, u in enumerate(users)])
+        attempts = StudentExam.objects.bulk_create([StudentExam(student=s, exam=exam) for s in students])
+        return [a.pk for a in attempts], choices
+
+    def simulate(self, rng, attempt_ids, choices, options):
+        buffer = AnswerBuffer()
+        question_ids = list(choices)
+        per_second = options["clicks_per_minute"] / 60
+        clicks = statements = rows = 0
+        flush_seconds = 0.0
+        next_flush = options["flush_interval"]
+        for second in range(1, options["duration"] + 1):
+            for attempt_id in attempt_ids:
+                n = int(per_second) + (rng.random() < per_second % 1)
+                for _ in range(n):
+                    q = rng.choice(question_ids)
+                    buffer.put(attempt_id, [(q, rng.choice(choices[q]))])
+                clicks += n
+            if second >= next_flush or second == options["duration"]:
+                next_flush += options["flush_interval"]
+                start = time.perf_counter()
+                with CaptureQueriesContext(connection) as ctx:
+                    rows += buffer.flush()
+                flush_seconds += time.perf_counter() - start
+                statements += sum(1 for q in ctx.captured_queries
+                                  if q["sql"].lstrip().upper().startswith(("INSERT", "UPDATE")))
+        return clicks, statements, rows, flush_seconds
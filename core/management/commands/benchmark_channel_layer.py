@@ -0,0 +1,93 @@
+import asyncio
+import multiprocessing
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from core.channel_layers import SQLiteChannelLayer
+
+
+def _worker(path, receivers, expected, poll_interval, ready, results):
+    """One ASGI worker process: ``receivers`` consumers in one group, as chat sockets would be."""
+
+    async def consume(layer, channel):
+        latencies = []
+        for _ in range(expected):
+            message = await layer.receive(channel)
+            latencies.append(time.time() - message["sent"])
+        return latencies
+
+    async def main():
+        layer = SQLiteChannelLayer(path, poll_interval=poll_interval, capacity=expected + 1)
+        channels = [await layer.new_channel() for _ in range(receivers)]
+        for channel in channels:
+            await layer.group_add("bench", channel)
+        ready.release()
+        per_consumer = await asyncio.gather(*(consume(layer, c) for c in channels))
+        await layer.close()
+        return [latency for latencies in per_consumer for latency in latencies]
+
+    results.put(asyncio.run(main()))
+
+
+class Command(BaseCommand):
+    help = ("Measure SQLiteChannelLayer fan-out across worker processes: one sender group_sends "
+            "to receivers spread over --workers processes. Uses a temporary database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Receiving processes.")
+        parser.add_argument("--receivers", type=int, default=50, help="Group members per worker.")
+        parser.add_argument("--messages", type=int, default=200, help="group_send calls.")
+        parser.add_argument("--rate", type=float, default=0,
+                            help="group_send calls per second; 0 = as fast as possible.")
+        parser.add_argument("--poll-interval", type=float, default=0.01)
+
+    def handle(self, *args, **options):
+        workers, receivers, n = options["workers"], options["receivers"], options["messages"]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "channels.sqlite3")
+            SQLiteChannelLayer(path)._connection()      # create the schema before the workers race to
+
+            ctx = multiprocessing.get_context("spawn")
+            ready, results = ctx.Semaphore(0), ctx.Queue()
+            procs = [ctx.Process(target=_worker, args=(path, receivers, n, options["poll_interval"],
+                                                       ready, results))
+                     for _ in range(workers)]
+            for proc in procs:
+                proc.start()
+            for _ in procs:
+                ready.acquire()
+
+            start = time.perf_counter()
+            send_seconds = asyncio.run(self.send(path, n, options["rate"]))
+            latencies = [latency for _ in procs for latency in results.get()]
+            elapsed = time.perf_counter() - start
+            for proc in procs:
+                proc.join()
+
+        deliveries = workers * receivers * n
+        latencies.sort()
+        self.stdout.write(f"{workers} workers × {receivers} receivers, {n} group_sends "
+                          f"({deliveries} deliveries), poll every {options['poll_interval'] * 1000:g} ms")
+        self.stdout.write(f"  group_send                {1000 * send_seconds / n:.2f} ms avg, "
+                          f"{n / send_seconds:.0f}/s")
+        self.stdout.write(f"  deliveries                {deliveries / elapsed:.0f} messages/s")
+        self.stdout.write(f"  fan-out latency           p50 {1000 * statistics.median(latencies):.1f} ms, "
+                          f"p95 {1000 * latencies[int(0.95 * (len(latencies) - 1))]:.1f} ms, "
+                          f"p99 {1000 * latencies[int(0.99 * (len(latencies) - 1))]:.1f} ms, "
+                          f"max {1000 * latencies[-1]:.1f} ms")
+
+    async def send(self, path, n, rate):
+        layer = SQLiteChannelLayer(path)
+        start = time.perf_counter()
+        busy = 0.0
+        for i in range(n):
+            if rate:
+                await asyncio.sleep(max(0.0, start + i / rate - time.perf_counter()))
+            began = time.perf_counter()
+            await layer.group_send("bench", {"type": "chat.message", "sent": time.time(), "n": i})
+            busy += time.perf_counter() - began
+        return busy
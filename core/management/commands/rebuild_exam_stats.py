@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import stats
+from core.models import Exam, ExamStats
+
+
+class Command(BaseCommand):
+    help = "Recompute ExamStats from StudentExam/Answer rows and check them against the live aggregation."
+
+    def add_arguments(self, parser):
+        parser.add_argument("exam_ids", nargs="*", type=int, help="Only these exams (default: all).")
+        parser.add_argument("--check", action="store_true",
+                            help="Compare the stored stats with the live aggregation without rebuilding.")
+
+    def handle(self, *args, **options):
+        exam_ids = options["exam_ids"] or list(Exam.objects.values_list("id", flat=True))
+        failed = 0
+        for exam_id in exam_ids:
+            if options["check"]:
+                record = ExamStats.objects.filter(exam_id=exam_id).first() or ExamStats(exam_id=exam_id)
+            else:
+                record = stats.rebuild(exam_id)
+            diff = stats.mismatches(record)
+            if diff:
+                failed += 1
+                for field, (stored, live) in diff.items():
+                    self.stderr.write(f"Exam {exam_id}: {field} is {stored}, live aggregation says {live}")
+        if failed:
+            raise CommandError(f"{failed} exam(s) have statistics that disagree with StudentExam.")
+        verb = "Checked" if options["check"] else "Rebuilt"
+        self.stdout.write(self.style.SUCCESS(f"{verb} statistics for {len(exam_ids)} exam(s)."))
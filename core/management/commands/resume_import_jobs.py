@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.import_jobs import resume_jobs
+
+
+class Command(BaseCommand):
+    help = "Finish student import jobs interrupted by a crash or restart, from their last committed chunk."
+
+    def handle(self, *args, **options):
+        jobs = resume_jobs()
+        for job in jobs:
+            self.stdout.write(f"Job {job.pk}: {job.status}, {job.rows_processed} rows processed")
+        self.stdout.write(self.style.SUCCESS(f"Resumed {len(jobs)} job(s)."))
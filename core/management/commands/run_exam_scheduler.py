@@ -0,0 +1,25 @@
+import threading
+
+from django.core.management.base import BaseCommand
+
+from core.scheduler import ExamScheduler
+
+
+class Command(BaseCommand):
+    help = "Finalize open exam attempts as exams reach their end time, until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true",
+                            help="Finalize every exam that is already over, then exit (e.g. from cron).")
+
+    def handle(self, *args, **options):
+        scheduler = ExamScheduler()
+        if options["once"]:
+            scheduler.tick()
+            return
+        stop = threading.Event()
+        self.stdout.write("Watching exam deadlines; Ctrl+C to stop.")
+        try:
+            scheduler.run(stop)
+        except KeyboardInterrupt:
+            stop.set()
@@ -0,0 +1,25 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from core.submissions import SubmissionWorkerPool, queue_setting
+
+
+class Command(BaseCommand):
+    help = "Grade queued exam submissions until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Number of worker threads (defaults to EXAM_SUBMISSION_QUEUE['WORKERS']).")
+
+    def handle(self, *args, **options):
+        workers = options["workers"] or queue_setting("WORKERS") or 1
+        pool = SubmissionWorkerPool(workers)
+        pool.start()
+        self.stdout.write(f"Grading submissions with {workers} worker(s); Ctrl+C to stop.")
+        try:
+            signal.pause()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.stop()
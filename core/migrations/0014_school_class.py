@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def parse_class_name(value):
+    # frozen copy of core.models.parse_class_name
+    value = value or ""
+    digits = "".join(ch for ch in value if ch.isdigit())
+    grade = int(digits) if digits else None
+    section = "".join(ch for ch in value if ch.isalpha()).upper()
+    if section.startswith("GRADE"):
+        section = section[len("GRADE"):]
+    return grade, section[:10]
+
+
+def link_classes(apps, schema_editor):
+    SchoolClass = apps.get_model("core", "SchoolClass")
+    Section = apps.get_model("core", "Section")
+    Student = apps.get_model("core", "Student")
+    Exam = apps.get_model("core", "Exam")
+    grades, sections = {}, {}
+
+    def grade_for(grade):
+        if grade not in grades:
+            grades[grade] = SchoolClass.objects.get_or_create(grade=grade)[0]
+        return grades[grade]
+
+    for value in Student.objects.values_list("student_class", flat=True).distinct():
+        grade, name = parse_class_name(value)
+        if grade is None:
+            continue
+        section = Section.objects.get_or_create(school_class=grade_for(grade), name=name)[0]
+        Student.objects.filter(student_class=value).update(school_class=section.school_class, section=section)
+
+    for value in Exam.objects.values_list("target_class", flat=True).distinct():
+        grade, _ = parse_class_name(value)
+        if grade is not None:
+            Exam.objects.filter(target_class=value).update(school_class=grade_for(grade))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_student_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchoolClass',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grade', models.PositiveSmallIntegerField(unique=True)),
+            ],
+            options={
+                'ordering': ('grade',),
+            },
+        ),
+        migrations.CreateModel(
+            name='Section',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=10)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='exam',
+            name='core_exam_target__5f471f_idx',
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='school_class',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exams', to='core.schoolclass'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='school_class',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='students', to='core.schoolclass'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['school_class', '-created_at', '-id'], name='core_exam_school__11336a_idx'),
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='school_class',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sections', to='core.schoolclass'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='section',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='students', to='core.section'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='section',
+            unique_together={('school_class', 'name')},
+        ),
+        migrations.RunPython(link_classes, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def fill_end_time(apps, schema_editor):
+    Exam = apps.get_model("core", "Exam")
+    exams = list(Exam.objects.only("start_time", "duration_min"))
+    for exam in exams:
+        exam.end_time = exam.start_time + timedelta(minutes=exam.duration_min)
+    Exam.objects.bulk_update(exams, ["end_time"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_school_class'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='end_time',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_end_time, reverse_code=migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='exam',
+            name='end_time',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['start_time'], name='core_exam_start_t_8e68d8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['end_time'], name='core_exam_end_tim_a99720_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['school_class', 'end_time'], name='core_exam_school__b48e45_idx'),
+        ),
+    ]
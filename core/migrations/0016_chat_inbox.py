@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:14
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def fill_inboxes(apps, schema_editor):
+    Chat = apps.get_model("core", "Chat")
+    ChatInbox = apps.get_model("core", "ChatInbox")
+    Message = apps.get_model("core", "Message")
+    inboxes = []
+    for chat in Chat.objects.prefetch_related("participants"):
+        for user in chat.participants.all():
+            state = Message.objects.filter(chat=chat).aggregate(
+                last_read_id=Max("id", filter=Q(sender=user) | Q(read=True)),
+                unread_count=Count("id", filter=~Q(sender=user) & Q(read=False)),
+                last_activity=Max("timestamp"),
+            )
+            inboxes.append(ChatInbox(
+                chat=chat, user=user,
+                last_read_id=state["last_read_id"] or 0,
+                unread_count=state["unread_count"],
+                last_activity=state["last_activity"] or django.utils.timezone.now(),
+            ))
+    ChatInbox.objects.bulk_create(inboxes, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_exam_end_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatInbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_id', models.PositiveBigIntegerField(default=0)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('last_activity', models.DateTimeField(default=django.utils.timezone.now)),
+                ('chat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inboxes', to='core.chat')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_inboxes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'last_activity', 'id'], name='core_chatin_user_id_d43ab8_idx')],
+                'constraints': [models.UniqueConstraint(fields=('chat', 'user'), name='unique_chat_inbox')],
+            },
+        ),
+        migrations.RunPython(fill_inboxes, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:49
+
+from django.db import migrations, models
+
+
+def reject_duplicates(apps, schema_editor):
+    """Keep the oldest pending submission per student and exam; the rest would be rejected anyway."""
+    QueuedSubmission = apps.get_model("core", "QueuedSubmission")
+    seen = set()
+    duplicates = []
+    for sub in QueuedSubmission.objects.filter(status__in=["queued", "processing"]).order_by("id"):
+        key = (sub.exam_id, sub.student_id)
+        if key in seen:
+            duplicates.append(sub.pk)
+        seen.add(key)
+    QueuedSubmission.objects.filter(pk__in=duplicates) \
+                            .update(status="rejected", detail="You already submitted.")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_chat_inbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(reject_duplicates, reverse_code=migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='queuedsubmission',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'processing'])), fields=('exam', 'student'), name='unique_pending_submission'),
+        ),
+    ]
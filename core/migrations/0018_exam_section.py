@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def parse_class_name(value):
+    # frozen copy of core.models.parse_class_name
+    value = value or ""
+    digits = "".join(ch for ch in value if ch.isdigit())
+    grade = int(digits) if digits else None
+    section = "".join(ch for ch in value if ch.isalpha()).upper()
+    if section.startswith("GRADE"):
+        section = section[len("GRADE"):]
+    return grade, section[:10]
+
+
+def link_sections(apps, schema_editor):
+    """Exams targeting a section ("10A") are shown to that section only, not the whole grade."""
+    SchoolClass = apps.get_model("core", "SchoolClass")
+    Section = apps.get_model("core", "Section")
+    Exam = apps.get_model("core", "Exam")
+    for value in Exam.objects.values_list("target_class", flat=True).distinct():
+        grade, name = parse_class_name(value)
+        if grade is None or not name:
+            continue
+        school_class = SchoolClass.objects.get_or_create(grade=grade)[0]
+        section = Section.objects.get_or_create(school_class=school_class, name=name)[0]
+        Exam.objects.filter(target_class=value).update(school_class=school_class, section=section)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_unique_pending_submission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='section',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exams', to='core.section'),
+        ),
+        migrations.RunPython(link_sections, reverse_code=migrations.RunPython.noop),
+    ]
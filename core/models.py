@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.conf import settings
+import uuid
 from datetime import timedelta
 from django.utils import timezone
 
@@ -17,6 +18,73 @@ class User(AbstractUser):
         return f"{self.username} ({self.role})"
 
 
+def parse_class_name(value):
+    """
+    Split a free-text class like "10A", "10-A" or "Grade 10 b" into
+    ``(grade, section)``: ``(10, "A")``. Grade is None when there are no digits.
+    """
+    value = value or ""
+    digits = "".join(ch for ch in value if ch.isdigit())
+    grade = int(digits) if digits else None
+    section = "".join(ch for ch in value if ch.isalpha()).upper()
+    if section.startswith("GRADE"):
+        section = section[len("GRADE"):]
+    return grade, section[:10]
+
+
+class SchoolClass(models.Model):
+    """A grade (e.g. 10); exams target a grade, students sit in one of its sections."""
+    grade = models.PositiveSmallIntegerField(unique=True)
+
+    class Meta:
+        ordering = ("grade",)
+
+    def __str__(self):
+        return f"Grade {self.grade}"
+
+    @classmethod
+    def for_name(cls, value):
+        """The grade a free-text class belongs to, created on first use."""
+        grade, _ = parse_class_name(value)
+        return None if grade is None else cls.objects.get_or_create(grade=grade)[0]
+
+
+class Section(models.Model):
+    school_class = models.ForeignKey(SchoolClass, on_delete=models.CASCADE, related_name="sections")
+    name         = models.CharField(max_length=10, blank=True)   # "" when the class has no letter
+
+    class Meta:
+        unique_together = ("school_class", "name")
+
+    def __str__(self):
+        return f"{self.school_class.grade}{self.name}"
+
+    @classmethod
+    def for_name(cls, value):
+        """The section a free-text class like "10A" names, created on first use."""
+        grade, name = parse_class_name(value)
+        if grade is None:
+            return None
+        school_class, _ = SchoolClass.objects.get_or_create(grade=grade)
+        return cls.objects.get_or_create(school_class=school_class, name=name)[0]
+
+
+def class_changed(instance, field, link, update_fields):
+    """
+    Whether ``instance.<field>`` (a free-text class) must be parsed again on
+    save: new rows without their ``link`` set yet, and rows whose class differs
+    from the value ``from_db`` loaded. A deferred class that was never
+    assigned, or one left out of ``update_fields``, is not saved, so no.
+    """
+    if update_fields is not None and field not in update_fields:
+        return False
+    if field in instance.get_deferred_fields():
+        return False
+    if not hasattr(instance, "_loaded_class"):      # built in memory, never saved
+        return getattr(instance, link) is None
+    return getattr(instance, field) != getattr(instance, "_loaded_class", None)
+
+
 class Teacher(models.Model):
     user                  = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     phone                 = models.CharField(max_length=15)
@@ -38,6 +106,34 @@ class Student(models.Model):
     admission_date   = models.DateField()
     status           = models.CharField(max_length=10, choices=[("active", "Active"), ("inactive", "Inactive")])
     assigned_teacher = models.ForeignKey(Teacher, on_delete=models.SET_NULL, null=True, blank=True)
+    # normalized from student_class on save
+    school_class     = models.ForeignKey(SchoolClass, on_delete=models.SET_NULL, null=True, blank=True,
+                                         related_name="students")
+    section          = models.ForeignKey(Section, on_delete=models.SET_NULL, null=True, blank=True,
+                                         related_name="students")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["assigned_teacher", "id"]),      # keyset pagination per teacher
+            models.Index(fields=["student_class"]),
+            models.Index(fields=["status"]),
+            models.Index(fields=["assigned_teacher", "status"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_class = instance.__dict__.get("student_class")   # absent when deferred
+        return instance
+
+    def save(self, *args, **kwargs):
+        if class_changed(self, "student_class", "section_id", kwargs.get("update_fields")):
+            self.section = Section.for_name(self.student_class)
+            self.school_class = self.section.school_class if self.section else None
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "school_class", "section"}
+        super().save(*args, **kwargs)
+        self._loaded_class = self.__dict__.get("student_class")
 
     def deactivate(self):
         self.status = "inactive"
@@ -53,6 +149,29 @@ class Student(models.Model):
 from django.conf import settings
 from django.db import models
 
+EXAM_WINDOWS = ("upcoming", "live", "past")
+
+
+def exam_window(start_time, end_time, now):
+    """Which of EXAM_WINDOWS an exam is in at ``now``; mirrors ExamQuerySet.window."""
+    if now < start_time:
+        return "upcoming"
+    return "live" if now < end_time else "past"
+
+
+class ExamQuerySet(models.QuerySet):
+    def window(self, name, now=None):
+        """Exams that are upcoming, live or past at ``now``, as an indexed range query."""
+        now = now or timezone.now()
+        if name == "upcoming":
+            return self.filter(start_time__gt=now)
+        if name == "live":
+            return self.filter(start_time__lte=now, end_time__gt=now)
+        if name == "past":
+            return self.filter(end_time__lte=now)
+        raise ValueError(f"Unknown exam window {name!r}; use one of {', '.join(EXAM_WINDOWS)}.")
+
+
 class Exam(models.Model):
     """Created by an admin or a teacher; taken by the teacher’s students."""
     title        = models.CharField(max_length=120)
@@ -60,15 +179,55 @@ class Exam(models.Model):
     teacher      = models.ForeignKey('core.Teacher', on_delete=models.PROTECT,
                                      related_name='exams',null=True,blank=True)
     target_class = models.CharField(max_length=50) #added a specific class for the exam
+    school_class = models.ForeignKey(SchoolClass, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name="exams")   # normalized from target_class on save
+    # set when target_class names a section ("10A"): only that section sees the exam
+    section      = models.ForeignKey(Section, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name="exams")
     start_time   = models.DateTimeField()
     duration_min = models.PositiveIntegerField()
+    end_time     = models.DateTimeField(editable=False)   # start_time + duration_min, set on save
     created_at   = models.DateTimeField(auto_now_add=True)
 
+    objects = ExamQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # keyset pagination (newest first) for admins, teachers and classes
+            models.Index(fields=["-created_at", "-id"]),
+            models.Index(fields=["teacher", "-created_at", "-id"]),
+            models.Index(fields=["school_class", "-created_at", "-id"]),
+            # upcoming / live / past range queries
+            models.Index(fields=["start_time"]),
+            models.Index(fields=["end_time"]),
+            models.Index(fields=["school_class", "end_time"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_class = instance.__dict__.get("target_class")   # absent when deferred
+        return instance
+
+    def save(self, *args, **kwargs):
+        if class_changed(self, "target_class", "school_class_id", kwargs.get("update_fields")):
+            self._previous_school_class_id = self.school_class_id
+            _, name = parse_class_name(self.target_class)
+            self.section = Section.for_name(self.target_class) if name else None
+            self.school_class = self.section.school_class if self.section else \
+                SchoolClass.for_name(self.target_class)
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "school_class", "section"}
+        # queryset.update() of start_time/duration_min must set end_time itself
+        self.start_time = self._meta.get_field("start_time").to_python(self.start_time)
+        self.end_time = self.start_time + timedelta(minutes=self.duration_min)
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "end_time"}
+        super().save(*args, **kwargs)
+        self._loaded_class = self.__dict__.get("target_class")
+
     def __str__(self):
         return self.title
-    @property
-    def end_time(self):
-        return self.start_time + timedelta(minutes=self.duration_min)
 
 
 class Question(models.Model):
@@ -118,11 +277,163 @@ class Answer(models.Model):
         unique_together = ('attempt', 'question')
 
 
+class ExamStats(models.Model):
+    """
+    Running score statistics of an exam, updated with every graded attempt.
+
+    Kept as sums so the mean and variance can be derived without scanning
+    StudentExam; ``manage.py rebuild_exam_stats`` recomputes it from scratch.
+    """
+    BUCKETS = 10   # histogram buckets of 10 points; 100 falls into the last
+
+    exam             = models.OneToOneField(Exam, on_delete=models.CASCADE,
+                                            related_name='stats')
+    attempt_count    = models.PositiveIntegerField(default=0)
+    score_sum        = models.FloatField(default=0)
+    score_sq_sum     = models.FloatField(default=0)
+    min_score        = models.FloatField(null=True, blank=True)
+    max_score        = models.FloatField(null=True, blank=True)
+    histogram        = models.JSONField(default=list)
+    question_correct = models.JSONField(default=dict)   # question_id → correct answers
+    updated_at       = models.DateTimeField(auto_now=True)
+
+    def record(self, score, correct_question_ids=()):
+        score = float(score)
+        self.attempt_count += 1
+        self.score_sum += score
+        self.score_sq_sum += score * score
+        self.min_score = score if self.min_score is None else min(self.min_score, score)
+        self.max_score = score if self.max_score is None else max(self.max_score, score)
+        if len(self.histogram) != self.BUCKETS:
+            self.histogram = [0] * self.BUCKETS
+        self.histogram[min(max(int(score // 10), 0), self.BUCKETS - 1)] += 1
+        for qid in correct_question_ids:
+            self.question_correct[str(qid)] = self.question_correct.get(str(qid), 0) + 1
+
+    @property
+    def average(self):
+        return self.score_sum / self.attempt_count if self.attempt_count else None
+
+    @property
+    def stddev(self):
+        if not self.attempt_count:
+            return None
+        mean = self.average
+        return max(self.score_sq_sum / self.attempt_count - mean * mean, 0) ** 0.5
+
+    def as_dict(self):
+        return {
+            "attempt_count": self.attempt_count,
+            "average_score": self.average,
+            "stddev": self.stddev,
+            "min_score": self.min_score,
+            "max_score": self.max_score,
+            "histogram": self.histogram or [0] * self.BUCKETS,
+            "question_correct": self.question_correct,
+        }
+
+
+class QueuedSubmission(models.Model):
+    """A submission accepted by the asynchronous pipeline, waiting to be graded."""
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("processing", "Processing"),
+        ("graded", "Graded"),
+        ("rejected", "Rejected"),
+    ]
+    receipt    = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    exam       = models.ForeignKey(Exam, on_delete=models.CASCADE,
+                                   related_name='queued_submissions')
+    student    = models.ForeignKey('core.Student', on_delete=models.CASCADE,
+                                   related_name='queued_submissions')
+    answers    = models.JSONField()
+    status     = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    score      = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    detail     = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    graded_at  = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"])]
+        constraints = [
+            # at most one submission per student and exam waiting to be graded
+            models.UniqueConstraint(fields=["exam", "student"],
+                                    condition=models.Q(status__in=["queued", "processing"]),
+                                    name="unique_pending_submission"),
+        ]
+
+
+
+
+class ImportJob(models.Model):
+    """A student CSV import running in the background."""
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+    id             = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by     = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                                       related_name='import_jobs')
+    file_path      = models.CharField(max_length=255)
+    status         = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    rows_processed = models.PositiveIntegerField(default=0)   # data rows committed; resume point
+    rows_created   = models.PositiveIntegerField(default=0)
+    rows_failed    = models.PositiveIntegerField(default=0)
+    errors         = models.JSONField(default=list)
+    detail         = models.TextField(blank=True)
+    created_at     = models.DateTimeField(auto_now_add=True)
+    started_at     = models.DateTimeField(null=True, blank=True)
+    updated_at     = models.DateTimeField(auto_now=True)
+    finished_at    = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def rows_per_sec(self):
+        if not self.started_at or not self.rows_processed:
+            return None
+        elapsed = ((self.finished_at or self.updated_at) - self.started_at).total_seconds()
+        return round(self.rows_processed / elapsed, 1) if elapsed > 0 else None
+
+    def progress(self):
+        return {
+            "job_id": str(self.pk),
+            "status": self.status,
+            "rows_processed": self.rows_processed,
+            "rows_created": self.rows_created,
+            "rows_failed": self.rows_failed,
+            "rows_per_sec": self.rows_per_sec,
+        }
+
+
+class ChatQuerySet(models.QuerySet):
+    def with_last_message(self):
+        """
+        Annotate each chat with its newest message as ``last_message_*``
+        columns (id, content, timestamp, read, sender_id, sender_username),
+        via correlated subqueries on the (chat, timestamp, id) index.
+        """
+        newest = Message.objects.filter(chat=models.OuterRef("pk")).order_by("-timestamp", "-id")
+        columns = {
+            "id": models.IntegerField(),
+            "content": models.TextField(),
+            "timestamp": models.DateTimeField(),
+            "read": models.BooleanField(),
+            "sender_id": models.IntegerField(),
+            "sender__username": models.CharField(),
+        }
+        return self.annotate(**{
+            f"last_message_{name.replace('__', '_')}": models.Subquery(newest.values(name)[:1], output_field=field)
+            for name, field in columns.items()
+        })
 
 
 class Chat(models.Model):
     participants = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name="chats")
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="created_chats")
+
+    objects = ChatQuerySet.as_manager()
     
 class Message(models.Model):
     chat = models.ForeignKey(Chat, on_delete=models.CASCADE, related_name="messages")
@@ -133,6 +444,25 @@ class Message(models.Model):
 
     class Meta:
         ordering = ("timestamp",)
+        indexes = [models.Index(fields=["chat", "timestamp", "id"])]
 
     def __str__(self):
         return f"{self.sender.username}: {self.content[:30]}"
+
+
+class ChatInbox(models.Model):
+    """
+    One participant's view of a chat, kept up to date as messages are sent
+    and read (core/inbox.py), so unread badges and the activity-sorted
+    inbox never have to scan Message.
+    """
+    chat          = models.ForeignKey(Chat, on_delete=models.CASCADE, related_name="inboxes")
+    user          = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                                      related_name="chat_inboxes")
+    last_read_id  = models.PositiveBigIntegerField(default=0)   # newest message id the user has read
+    unread_count  = models.PositiveIntegerField(default=0)
+    last_activity = models.DateTimeField(default=timezone.now)  # newest message, or when joined
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["chat", "user"], name="unique_chat_inbox")]
+        indexes = [models.Index(fields=["user", "last_activity", "id"])]
@@ -0,0 +1,145 @@
+# core/pagination.py
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+Pages are fetched with ``WHERE <sort key> > <cursor> ORDER BY <sort key>
+LIMIT n`` instead of ``COUNT(*)`` plus ``OFFSET``, so the ten-thousandth page
+costs the same as the first as long as the sort key is indexed (see the
+Meta.indexes on Student, Exam, Message and ChatInbox). Clients may pick the page size
+with ``?page_size=`` up to ``max_page_size``.
+"""
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, Cursor, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE", 10)
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "id"
+
+
+class ExamPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class ExamRowPagination(ExamPagination):
+    """
+    ExamPagination over a student's cached exam rows (core/dashboard.py):
+    ``(id, created_at, …)`` tuples, newest first, instead of a queryset. The
+    cursor holds the (created_at, id) of the page edge, like the queryset
+    version, so pages stay put while exams are added.
+    """
+
+    def paginate_rows(self, rows, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        if cursor is None:
+            start = 0
+        else:
+            edge = self._edge(cursor.position)
+            if cursor.reverse:      # the page ending just before the edge row
+                start = max(sum(1 for row in rows if (row[1], row[0]) > edge) - self.page_size, 0)
+            else:                   # the page starting just after it
+                start = sum(1 for row in rows if (row[1], row[0]) >= edge)
+        self.rows = rows[start:start + self.page_size]
+        self.has_previous, self.has_next = start > 0, start + len(self.rows) < len(rows)
+        return self.rows
+
+    def _edge(self, position):
+        created_at, _, pk = (position or "").partition(",")
+        created_at = parse_datetime(created_at)
+        if created_at is None or not pk.isdigit():
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, int(pk)
+
+    def _link(self, row, reverse):
+        return self.encode_cursor(Cursor(offset=0, reverse=reverse,
+                                         position=f"{row[1].isoformat()},{row[0]}"))
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self._link(self.rows[-1], False) if self.has_next else None,
+            "previous": self._link(self.rows[0], True) if self.has_previous else None,
+            "results": data,
+        })
+
+
+class MessagePagination(BasePagination):
+    """
+    Chat history windows, newest first.
+
+    ``?limit=`` messages (default 50) ending just before ``?before=<id>``, or
+    starting just after ``?after=<id>``, or the latest ones when neither is
+    given. Windows are (timestamp, id) ranges on the (chat, timestamp, id)
+    index, bounded on timestamp so the index is seeked rather than scanned; ``next`` links to older messages and ``previous`` to newer ones.
+    """
+    default_limit = 50
+    max_limit = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        params = request.query_params
+        self.limit = self._int(params, "limit", self.default_limit, minimum=1)
+        self.limit = min(self.limit, self.max_limit)
+        before = self._int(params, "before")
+        after = self._int(params, "after")
+        if before is not None and after is not None:
+            raise ValidationError({"detail": "Use either before or after, not both."})
+
+        anchor_id = before if before is not None else after
+        if anchor_id is None:
+            rows = list(queryset.order_by("-timestamp", "-id")[:self.limit + 1])
+            self.has_older, self.has_newer = len(rows) > self.limit, False
+            rows = rows[:self.limit]
+        else:
+            anchor = queryset.filter(pk=anchor_id).values_list("timestamp", flat=True).first()
+            if anchor is None:
+                raise ValidationError({"detail": f"Message {anchor_id} is not in this chat."})
+            if before is not None:
+                older = Q(timestamp__lte=anchor) & (Q(timestamp__lt=anchor) | Q(id__lt=before))
+                rows = list(queryset.filter(older).order_by("-timestamp", "-id")[:self.limit + 1])
+                self.has_older, self.has_newer = len(rows) > self.limit, True
+                rows = rows[:self.limit]
+            else:
+                newer = Q(timestamp__gte=anchor) & (Q(timestamp__gt=anchor) | Q(id__gt=after))
+                rows = list(queryset.filter(newer).order_by("timestamp", "id")[:self.limit + 1])
+                self.has_older, self.has_newer = True, len(rows) > self.limit
+                rows = rows[:self.limit][::-1]
+        self.page = rows
+        return rows
+
+    def _int(self, params, name, default=None, minimum=0):
+        value = params.get(name)
+        if value in (None, ""):
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            number = None
+        if number is None or number < minimum:
+            raise ValidationError({name: f"Must be an integer of at least {minimum}."})
+        return number
+
+    def _link(self, param, message_id):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(remove_query_param(url, "before"), "after")
+        return replace_query_param(url, param, message_id)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self._link("before", self.page[-1].pk) if self.page and self.has_older else None,
+            "previous": self._link("after", self.page[0].pk) if self.page and self.has_newer else None,
+            "results": data,
+        })
+
+
+class InboxPagination(KeysetPagination):
+    ordering = ("-last_activity", "-id")
@@ -1,6 +1,7 @@
 from django.urls import re_path
-from .consumers import ChatConsumer
+from .consumers import ChatConsumer, ImportProgressConsumer
 
 websocket_urlpatterns = [
     re_path(r"ws/chat/(?P<chat_id>\w+)/$", ChatConsumer.as_asgi()),
+    re_path(r"ws/imports/(?P<job_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})/$", ImportProgressConsumer.as_asgi()),
 ]
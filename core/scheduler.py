@@ -0,0 +1,169 @@
+# core/scheduler.py
+"""
+Exam deadline scheduler.
+
+Attempts that are never submitted would otherwise stay open forever. The
+scheduler keeps a min-heap of ``(end_time, exam_id)`` for exams ending soon,
+sleeps until the earliest deadline and then finalizes every open attempt at
+that exam in bulk (``finalize_exam``), so no request has to check the clock.
+
+It runs either as an asyncio task on the ASGI server's loop
+(``EXAM_SCHEDULER["IN_PROCESS"]``, see school_mgmt/asgi.py) or on its own with
+``manage.py run_exam_scheduler``. The heap is reloaded from the database
+every RELOAD_INTERVAL seconds, which also picks up new and rescheduled exams;
+finalizing is idempotent, so several schedulers may run at once.
+
+Before finalizing, the scheduler flushes the AnswerBuffer of *its own*
+process only. Answers autosaved through other processes reach the database
+through those processes' flushers (within autosave FLUSH_INTERVAL); whatever
+is still buffered there when the deadline passes is lost, because
+``AnswerBuffer.flush`` drops answers of attempts that are already closed.
+With ``manage.py run_exam_scheduler`` that is every web worker, so the last
+FLUSH_INTERVAL seconds of autosaves before a deadline may not be graded; run
+the scheduler IN_PROCESS to include the answers buffered by that process.
+"""
+import asyncio
+import heapq
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .autosave import answer_buffer
+from .grading import claim_attempts, grade_attempts
+from .models import Answer, Exam, StudentExam
+from .signals import models_changed, students_changed
+from .stats import record_results
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "IN_PROCESS": False,     # run as an asyncio task inside the ASGI app
+    "RELOAD_INTERVAL": 60,   # seconds between heap reloads from the database
+}
+
+
+def scheduler_setting(name):
+    return getattr(settings, "EXAM_SCHEDULER", {}).get(name, DEFAULTS[name])
+
+
+def finalize_exam(exam_id, now=None):
+    """
+    Close every open attempt at an exam whose end time has passed.
+
+    Attempts with saved answers are graded from them in one batch (unanswered
+    questions count as wrong); the rest
+    are closed with a score of 0 by a single UPDATE (their status stays
+    "unattempted"). Attempts finished concurrently are skipped. Returns the
+    number of attempts closed.
+    """
+    exam = Exam.objects.filter(pk=exam_id, end_time__lte=now or timezone.now()).first()
+    if exam is None:
+        return 0    # gone, or moved to a later end time
+    with transaction.atomic():
+        open_attempts = list(StudentExam.objects.select_for_update()
+                                                .filter(exam=exam, finished_at__isnull=True))
+        if not open_attempts:
+            return 0
+        saved = defaultdict(list)
+        for attempt_id, question_id, option_id in Answer.objects \
+                .filter(attempt__in=open_attempts).values_list("attempt_id", "question_id", "chosen_id"):
+            saved[attempt_id].append({"question_id": question_id, "option_id": option_id})
+
+        partial = [(a, saved[a.pk]) for a in open_attempts if a.pk in saved]
+        graded = grade_attempts(partial, finished_at=exam.end_time, score_all_questions=True) if partial else []
+        # claimed like graded attempts, so a submit racing the deadline is counted once
+        empty = claim_attempts([a.pk for a in open_attempts if a.pk not in saved], exam.end_time)
+        if empty:
+            StudentExam.objects.filter(pk__in=empty).update(score=0)
+            record_results({exam.pk: [(0, ())] * len(empty)})
+            models_changed(StudentExam)
+            students_changed(a.student_id for a in open_attempts if a.pk in empty)
+    return len(graded) + len(empty)
+
+
+class ExamScheduler:
+    def __init__(self, reload_interval=None):
+        self.reload_interval = reload_interval or scheduler_setting("RELOAD_INTERVAL")
+        self.heap = []
+        self.reloaded_at = None
+
+    def reload(self, now):
+        """Rebuild the heap: overdue exams with open attempts, then those ending soon."""
+        open_attempts = StudentExam.objects.filter(exam=OuterRef("pk"), finished_at__isnull=True)
+        overdue = Exam.objects.filter(Exists(open_attempts), end_time__lte=now) \
+                              .values_list("end_time", "id")
+        ending = Exam.objects.filter(end_time__gt=now,
+                                     end_time__lte=now + timedelta(seconds=2 * self.reload_interval)) \
+                             .values_list("end_time", "id")
+        self.heap = list({*overdue, *ending})
+        heapq.heapify(self.heap)
+        self.reloaded_at = now
+
+    def pop_due(self, now):
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due.append(heapq.heappop(self.heap)[1])
+        return due
+
+    def tick(self, now=None):
+        """Finalize what is due; return seconds until there is work again."""
+        now = now or timezone.now()
+        if self.reloaded_at is None or (now - self.reloaded_at).total_seconds() >= self.reload_interval:
+            self.reload(now)
+        due = self.pop_due(now)
+        if due:
+            try:
+                answer_buffer.flush()    # only this process's buffer; see the module docstring
+            except Exception:
+                logger.exception("Flushing autosaved answers failed")
+        for exam_id in due:
+            try:
+                closed = finalize_exam(exam_id, now)
+            except Exception:
+                logger.exception("Finalizing exam %s failed", exam_id)
+                continue
+            if closed:
+                logger.info("Finalized %s open attempt(s) of exam %s", closed, exam_id)
+        until_reload = self.reload_interval - (now - self.reloaded_at).total_seconds()
+        if self.heap:
+            return max(0.0, min(until_reload, (self.heap[0][0] - now).total_seconds()))
+        return max(0.0, until_reload)
+
+    def _tick_in_thread(self):
+        try:
+            return self.tick()
+        finally:
+            close_old_connections()
+
+    def run(self, stop):
+        """Loop until the ``stop`` threading.Event is set."""
+        while not stop.is_set():
+            stop.wait(self._tick_in_thread())
+
+    async def run_async(self):
+        while True:
+            try:
+                delay = await sync_to_async(self._tick_in_thread, thread_sensitive=False)()
+            except Exception:
+                logger.exception("Exam scheduler tick failed")
+                delay = self.reload_interval
+            await asyncio.sleep(delay)
+
+
+class ExamSchedulerMiddleware:
+    """ASGI wrapper that starts the scheduler on the server's event loop."""
+
+    def __init__(self, app):
+        self.app = app
+        self.task = None
+
+    async def __call__(self, scope, receive, send):
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(ExamScheduler().run_async())
+        return await self.app(scope, receive, send)
@@ -0,0 +1,131 @@
+# core/search.py
+"""
+In-process typeahead index over students.
+
+Each student is indexed by username, full name and roll number. Queries of
+three or more characters are answered from trigram postings, shorter ones
+from 1-2 character word prefixes; candidates are always re-checked against
+the stored text, so postings may keep stale ids and updates only append.
+
+The index is rebuilt when the shared ``search:students`` version moves. Saves
+in this process are applied incrementally after commit (core/signals.py) and
+adopt the version they bump, so only other processes' writes force a rebuild.
+"""
+import json
+import threading
+from array import array
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .caching import bump_version, get_version
+from .models import Student
+
+SEP = "\x1f"
+_EMPTY = array("I")
+SEARCH_FIELDS = ("id", "user__username", "user__first_name", "user__last_name", "roll_number")
+
+
+def _text(username, first_name, last_name, roll_number):
+    return SEP.join([username, f"{first_name} {last_name}".strip(), roll_number])
+
+
+def _grams(text):
+    grams = set()
+    for field in text.lower().split(SEP):
+        for word in field.split():
+            grams.update(("^" + word[:1], "^" + word[:2]))
+        grams.update(field[i:i + 3] for i in range(len(field) - 2))
+    return grams
+
+
+def _matches(text, query):
+    fields = text.lower().split(SEP)
+    if len(query) >= 3:
+        return any(query in field for field in fields)
+    return any(word.startswith(query) for field in fields for word in field.split())
+
+
+class StudentSearchIndex:
+    def __init__(self):
+        self.docs = {}          # student id → _text(...)
+        self.postings = {}      # gram → array of student ids
+        self.version = None
+        self.lock = threading.RLock()
+
+    def add(self, student_id, text):
+        self.docs[student_id] = text
+        for gram in _grams(text):
+            self.postings.setdefault(gram, array("I")).append(student_id)
+
+    def remove(self, student_id):
+        self.docs.pop(student_id, None)
+
+    def rebuild(self, version):
+        fresh = StudentSearchIndex()
+        for pk, *fields in Student.objects.values_list(*SEARCH_FIELDS).order_by().iterator(chunk_size=5000):
+            fresh.add(pk, _text(*fields))
+        with self.lock:
+            self.docs, self.postings, self.version = fresh.docs, fresh.postings, version
+
+    def search(self, query, limit=None):
+        """Ids of matching students in ascending order."""
+        query = " ".join(query.lower().split())
+        if not query:
+            return []
+        keys = ["^" + query] if len(query) < 3 else {query[i:i + 3] for i in range(len(query) - 2)}
+        with self.lock:
+            docs = self.docs
+            candidates = min((self.postings.get(key, _EMPTY) for key in keys), key=len)
+            found = sorted({pk for pk in candidates if pk in docs and _matches(docs[pk], query)})
+        return found if limit is None else found[:limit]
+
+    def entries(self, ids):
+        """(id, username, full name, roll number) for ids still in the index."""
+        with self.lock:
+            return [(pk, *self.docs[pk].split(SEP)) for pk in ids if pk in self.docs]
+
+
+_index = StudentSearchIndex()
+
+
+def search_filter(query):
+    """
+    Q matching every student the index finds for ``query``, to be combined
+    with the caller's other filters in SQL. There is no cap: capping before
+    role scoping and the other filters would drop the caller's own matches.
+    On SQLite the ids travel as one JSON parameter, so any number fits.
+    """
+    ids = student_index().search(query)
+    if connection.vendor == "sqlite":
+        return Q(pk__in=RawSQL("SELECT value FROM json_each(%s)", (json.dumps(ids),)))
+    return Q(pk__in=ids)
+
+
+def student_index():
+    """The process-wide index, rebuilt first if another process changed students."""
+    version = get_version("search", "students")
+    if _index.version != version:
+        with _index.lock:
+            if _index.version != version:
+                _index.rebuild(version)
+    return _index
+
+
+def refresh_students(student_ids):
+    """
+    Re-read ``student_ids`` into this process's index (removing deleted ones)
+    and bump the shared version so other processes rebuild. Call after commit.
+    """
+    before = get_version("search", "students")
+    rows = list(Student.objects.filter(pk__in=student_ids).values_list(*SEARCH_FIELDS))
+    after = bump_version("search", "students")
+    with _index.lock:
+        if _index.version != before:
+            return   # stale or never built: the next search rebuilds anyway
+        for pk in student_ids:
+            _index.remove(pk)
+        for pk, *fields in rows:
+            _index.add(pk, _text(*fields))
+        _index.version = after
@@ -3,6 +3,8 @@ from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db import transaction
+from django.db.models import QuerySet, prefetch_related_objects
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import smart_bytes, smart_str
 
@@ -10,8 +12,9 @@ from django.utils.encoding import smart_bytes, smart_str
 from .models import (
     User, Teacher, Student,
     Exam, Question, Option, StudentExam,
-    Message, Chat,
+    Message, Chat, ChatInbox,
 )
+from .signals import invalidate_exam, models_changed
 
 
 #  USER / AUTH SERIALIZERS
@@ -86,6 +89,7 @@ class StudentSerializer(serializers.ModelSerializer):
     class Meta:
         model  = Student
         fields = "__all__"
+        read_only_fields = ["school_class", "section"]   # derived from student_class on save
 
     def to_representation(self, instance):
         """Customize output so assigned_teacher shows id + name."""
@@ -133,17 +137,21 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 
 #  EXAM / QUESTION / OPTION SERIALIZERS
 class OptionInputSerializer(serializers.ModelSerializer):
+    # optional on update: keeps the existing option (and answers choosing it)
+    id = serializers.IntegerField(required=False)
+
     class Meta:
         model  = Option
-        fields = ["text", "is_correct"]
+        fields = ["id", "text", "is_correct"]
 
 
 class QuestionInputSerializer(serializers.ModelSerializer):
+    id      = serializers.IntegerField(required=False)
     options = OptionInputSerializer(many=True, write_only=True)
 
     class Meta:
         model  = Question
-        fields = ["text", "options"]
+        fields = ["id", "text", "options"]
 
 
 # -- READ‑ONLY (output) serializers --
@@ -161,14 +169,53 @@ class QuestionSerializer(serializers.ModelSerializer):
         fields = ["id", "text", "options"]
 
 
-class ExamReadSerializer(serializers.ModelSerializer):
-    questions    = QuestionSerializer(many=True, read_only=True)
+class ExamListSerializer(serializers.ListSerializer):
+    """Eager-loads the child's relations once for the whole list."""
+
+    def to_representation(self, data):
+        eager = getattr(self.child, "setup_eager_loading", None)
+        if eager is not None:
+            if isinstance(data, QuerySet):
+                data = eager(data)
+            else:
+                data = list(data)
+                prefetch_related_objects(data, *self.child.prefetch_lookups)
+        return super().to_representation(data)
+
+
+class ExamSummarySerializer(serializers.ModelSerializer):
+    """Exam without its questions; used for list views."""
     teacher_name = serializers.CharField(source="teacher.user.get_full_name", read_only=True)
+    prefetch_lookups = ("teacher__user",)
 
     class Meta:
         model  = Exam
         fields = ["id", "title", "description", "teacher_name","target_class",
-                  "start_time", "duration_min", "end_time", "questions"]
+                  "start_time", "duration_min", "end_time"]
+        list_serializer_class = ExamListSerializer
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.select_related("teacher__user")
+
+    def to_representation(self, instance):
+        # a no-op when the queryset already loaded these relations
+        if not isinstance(self.parent, ExamListSerializer):
+            prefetch_related_objects([instance], *self.prefetch_lookups)
+        return super().to_representation(instance)
+
+
+class ExamReadSerializer(ExamSummarySerializer):
+    questions = QuestionSerializer(many=True, read_only=True)
+    prefetch_lookups = ("teacher__user", "questions__options")
+
+    class Meta(ExamSummarySerializer.Meta):
+        fields = ExamSummarySerializer.Meta.fields + ["questions"]
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.select_related("teacher__user").prefetch_related("questions__options")
+
     def get_end_time(self, obj):
         return obj.end_time
 
@@ -183,6 +230,8 @@ class ExamCreateSerializer(serializers.ModelSerializer):
                   "start_time", "duration_min", "questions"]
 
     def validate(self, data):
+        if self.partial and "questions" not in data:
+            return data
         if not data.get("questions"):
             raise serializers.ValidationError("At least one question required.")
         for q in data["questions"]:
@@ -190,35 +239,111 @@ class ExamCreateSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("Each question needs options.")
         return data
 
+    @transaction.atomic
     def create(self, validated_data):
         q_data = validated_data.pop("questions")
         exam = Exam.objects.create(**validated_data)
-        for q in q_data:
-            opts = q.pop("options")
-            question = Question.objects.create(exam=exam, **q)
-            for opt in opts:
-                Option.objects.create(question=question, **opt)
+        questions = Question.objects.bulk_create(
+            [Question(exam=exam, text=q["text"]) for q in q_data]
+        )
+        Option.objects.bulk_create([
+            Option(question=question, text=opt["text"], is_correct=opt.get("is_correct", False))
+            for question, q in zip(questions, q_data) for opt in q["options"]
+        ])
+        # bulk_create sends no signals
+        models_changed(Question, Option)
+        invalidate_exam(exam.pk)
         return exam
+
+    @transaction.atomic
     def update(self, instance, validated_data):
-        q_data = validated_data.pop("questions", [])
-    
-    # Update basic exam fields
+        q_data = validated_data.pop("questions", None)
+
+        # Update basic exam fields
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
 
-    # Clear old questions and options
-        instance.questions.all().delete()
-
-    # Recreate questions and options
-        for q in q_data:
-            opts = q.pop("options")
-            question = Question.objects.create(exam=instance, **q)
-            for opt in opts:
-                Option.objects.create(question=question, **opt)
-
+        if q_data is not None:
+            self.sync_questions(instance, q_data)
+        invalidate_exam(instance.pk)
         return instance
 
+    def sync_questions(self, exam, q_data):
+        """
+        Bring the exam's questions and options in line with ``q_data`` with a
+        fixed number of queries. Items are matched by id, or else by text, so
+        unchanged questions and options keep their ids (and the answers that
+        point at them); only what changed is inserted, updated or deleted.
+        """
+        existing = {q.pk: q for q in exam.questions.prefetch_related("options")}
+        matched = {}                                  # index in q_data → Question
+        for i, q in enumerate(q_data):
+            if "id" in q:
+                if q["id"] not in existing:
+                    raise serializers.ValidationError(
+                        {"questions": [f"Question {q['id']} does not belong to this exam."]})
+                matched[i] = existing.pop(q["id"])
+        by_text = {}
+        for question in existing.values():
+            by_text.setdefault(question.text, []).append(question)
+        for i, q in enumerate(q_data):
+            if i not in matched and by_text.get(q["text"]):
+                matched[i] = by_text[q["text"]].pop(0)
+                del existing[matched[i].pk]
+
+        new_questions = Question.objects.bulk_create(
+            [Question(exam=exam, text=q["text"]) for i, q in enumerate(q_data) if i not in matched]
+        )
+        created = iter(new_questions)
+        changed_questions, new_options, changed_options, stale_options = [], [], [], []
+        for i, q in enumerate(q_data):
+            if i in matched:
+                question = matched[i]
+                if question.text != q["text"]:
+                    question.text = q["text"]
+                    changed_questions.append(question)
+                self._diff_options(question, q["options"], new_options, changed_options, stale_options)
+            else:
+                question = next(created)
+                new_options.extend(
+                    Option(question=question, text=opt["text"], is_correct=opt.get("is_correct", False))
+                    for opt in q["options"]
+                )
+
+        Question.objects.bulk_update(changed_questions, ["text"])
+        Option.objects.bulk_update(changed_options, ["text", "is_correct"])
+        Option.objects.bulk_create(new_options)
+        Option.objects.filter(pk__in=stale_options).delete()
+        Question.objects.filter(pk__in=list(existing)).delete()
+        models_changed(Question, Option)
+
+    @staticmethod
+    def _diff_options(question, o_data, new_options, changed_options, stale_options):
+        existing = {o.pk: o for o in question.options.all()}
+        matched = {}
+        for i, opt in enumerate(o_data):
+            if "id" in opt:
+                if opt["id"] not in existing:
+                    raise serializers.ValidationError(
+                        {"questions": [f"Option {opt['id']} does not belong to question {question.pk}."]})
+                matched[i] = existing.pop(opt["id"])
+        for i, opt in enumerate(o_data):
+            if i not in matched:
+                same = next((o for o in existing.values() if o.text == opt["text"]), None)
+                if same is not None:
+                    matched[i] = existing.pop(same.pk)
+
+        for i, opt in enumerate(o_data):
+            is_correct = opt.get("is_correct", False)
+            option = matched.get(i)
+            if option is None:
+                new_options.append(Option(question=question, text=opt["text"], is_correct=is_correct))
+            elif (option.text, option.is_correct) != (opt["text"], is_correct):
+                option.text, option.is_correct = opt["text"], is_correct
+                changed_options.append(option)
+        stale_options.extend(existing)
+
 
 #  STUDENT SUBMISSION & RESULTS
 
@@ -285,7 +410,18 @@ class MessageSerializer(serializers.ModelSerializer):
         model = Message
         fields = ["id", "chat", "sender_id", "sender_username", "content", "timestamp", "read"]
 
+class ChatInboxSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChatInbox
+        fields = ["chat", "unread_count", "last_read_id", "last_activity"]
+
+
 class ChatSerializer(serializers.ModelSerializer):
+    """
+    Reads ``last_message_*`` annotations (Chat.objects.with_last_message())
+    and prefetched participants when present, so a chat list costs the same
+    few queries whatever its length; bare instances fall back to queries.
+    """
     participants_detail = serializers.SerializerMethodField()
     created_by_username = serializers.CharField(source="created_by.username", read_only=True)
     last_message = serializers.SerializerMethodField()
@@ -306,5 +442,17 @@ class ChatSerializer(serializers.ModelSerializer):
         ]
 
     def get_last_message(self, obj):
-        msg = obj.messages.order_by("-timestamp").first()
-        return MessageSerializer(msg).data if msg else None
+        if not hasattr(obj, "last_message_id"):
+            msg = obj.messages.select_related("sender").order_by("-timestamp", "-id").first()
+            return MessageSerializer(msg).data if msg else None
+        if obj.last_message_id is None:
+            return None
+        return {
+            "id": obj.last_message_id,
+            "chat": obj.pk,
+            "sender_id": obj.last_message_sender_id,
+            "sender_username": obj.last_message_sender_username,
+            "content": obj.last_message_content,
+            "timestamp": serializers.DateTimeField().to_representation(obj.last_message_timestamp),
+            "read": obj.last_message_read,
+        }
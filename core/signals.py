@@ -0,0 +1,123 @@
+# core/signals.py
+"""Cache invalidation hooks; connected in CoreConfig.ready()."""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import bump_version, touch_models
+from .dashboard import student_key
+from .inbox import open_inboxes
+from .models import Chat, ChatInbox, Exam, Option, Question, Student, StudentExam, User
+from .search import refresh_students
+
+
+def invalidate(namespace, obj_id):
+    """
+    Bump a cache version immediately, so this process stops using stale
+    entries, and again on commit so no other process can cache pre-commit data
+    under the new version.
+    """
+    bump_version(namespace, obj_id)
+    transaction.on_commit(lambda: bump_version(namespace, obj_id))
+
+
+def invalidate_exam(exam_id):
+    """Drop everything cached for an exam (answer key, summary, analysis, …)."""
+    invalidate("exam", exam_id)
+
+
+def students_changed(student_ids):
+    """Drop the cached dashboards of students (see core/dashboard.py)."""
+    for student_id in set(student_ids):
+        invalidate("student-exams", student_id)
+
+
+def models_changed(*models):
+    """Bump export versions of ``models`` now and again on commit (see above)."""
+    touch_models(*models)
+    transaction.on_commit(lambda: touch_models(*models))
+
+
+@receiver([post_save, post_delete])
+def core_model_changed(sender, **kwargs):
+    if sender._meta.app_label == "core":
+        models_changed(sender)
+
+
+@receiver([post_save, post_delete], sender=Exam)
+def exam_changed(sender, instance, **kwargs):
+    invalidate_exam(instance.pk)
+    # the grade it moved from (if any) and the one it is in now list it differently
+    for class_id in {instance.school_class_id, getattr(instance, "_previous_school_class_id", None)} - {None}:
+        invalidate("class-exams", class_id)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    invalidate_exam(instance.exam_id)
+
+
+@receiver([post_save, post_delete], sender=Option)
+def option_changed(sender, instance, origin=None, **kwargs):
+    if origin is not None and getattr(origin, "model", type(origin)) in (Question, Exam):
+        return  # cascaded from a question or exam delete; their own handlers cover the exam
+    exam_id = Question.objects.filter(pk=instance.question_id) \
+                              .values_list("exam_id", flat=True).first()
+    if exam_id is not None:
+        invalidate_exam(exam_id)
+
+
+@receiver([post_save, post_delete], sender=Student)
+def student_search_changed(sender, instance, **kwargs):
+    student_id = instance.pk
+    transaction.on_commit(lambda: refresh_students([student_id]))
+
+
+@receiver(post_save, sender=User)
+def user_search_changed(sender, instance, update_fields=None, **kwargs):
+    if instance.role != "student":
+        return
+    if update_fields and not {"username", "first_name", "last_name"} & set(update_fields):
+        return   # e.g. last_login on sign-in
+    student_id = Student.objects.filter(user_id=instance.pk).values_list("id", flat=True).first()
+    if student_id is not None:
+        transaction.on_commit(lambda: refresh_students([student_id]))
+
+
+@receiver([post_save, post_delete], sender=StudentExam)
+def attempt_changed(sender, instance, **kwargs):
+    students_changed([instance.student_id])
+
+
+@receiver([post_save, post_delete], sender=Student)
+def student_changed(sender, instance, **kwargs):
+    # class or teacher may have changed; the user → student mapping may be new or gone
+    students_changed([instance.pk])
+    user_id = instance.user_id
+    cache.delete(student_key(user_id))
+    transaction.on_commit(lambda: cache.delete(student_key(user_id)))
+
+
+@receiver(post_save, sender=User)
+def teacher_renamed(sender, instance, update_fields=None, **kwargs):
+    """Exam summaries show the teacher's name."""
+    if instance.role != "teacher":
+        return
+    if update_fields and not {"first_name", "last_name"} & set(update_fields):
+        return
+    for exam_id in Exam.objects.filter(teacher__user=instance).values_list("id", flat=True):
+        invalidate_exam(exam_id)
+
+
+@receiver(m2m_changed, sender=Chat.participants.through)
+def chat_participants_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep one ChatInbox row per participant (see core/inbox.py)."""
+    if action not in ("post_add", "post_remove") or not pk_set:
+        return
+    chat_ids, user_ids = (pk_set, [instance.pk]) if reverse else ([instance.pk], pk_set)
+    for chat_id in chat_ids:
+        if action == "post_add":
+            open_inboxes(chat_id, user_ids)
+        else:
+            ChatInbox.objects.filter(chat_id=chat_id, user_id__in=user_ids).delete()
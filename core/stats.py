@@ -0,0 +1,71 @@
+# core/stats.py
+"""Maintenance of the materialised ExamStats rows."""
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min
+
+from .models import Answer, ExamStats, StudentExam
+
+
+def record_results(results):
+    """
+    Fold freshly graded attempts into their exams' statistics.
+
+    ``results`` maps exam_id → [(score, correct_question_ids), ...]. Must run
+    inside the transaction that saves the attempts; the stats rows are locked
+    so concurrent submissions cannot lose updates.
+    """
+    for exam_id, graded in results.items():
+        stats, _ = ExamStats.objects.select_for_update().get_or_create(exam_id=exam_id)
+        for score, correct_question_ids in graded:
+            stats.record(score, correct_question_ids)
+        stats.save()
+
+
+def finished_attempts(exam_id):
+    return StudentExam.objects.filter(exam_id=exam_id, finished_at__isnull=False,
+                                      score__isnull=False)
+
+
+def rebuild(exam_id):
+    """Recompute an exam's statistics from StudentExam/Answer rows."""
+    stats = ExamStats(exam_id=exam_id)
+    for score in finished_attempts(exam_id).values_list("score", flat=True).iterator():
+        stats.record(score)
+
+    correct = Answer.objects.filter(attempt__exam_id=exam_id, attempt__finished_at__isnull=False,
+                                    attempt__score__isnull=False, chosen__is_correct=True) \
+                            .values_list("question_id").annotate(n=Count("id"))
+    stats.question_correct = {str(qid): n for qid, n in correct}
+
+    with transaction.atomic():
+        ExamStats.objects.filter(exam_id=exam_id).delete()
+        stats.save()
+    return stats
+
+
+def live_aggregate(exam_id):
+    """The numbers ExamStats should agree with, aggregated from StudentExam."""
+    agg = finished_attempts(exam_id).aggregate(
+        count=Count("id"), avg=Avg("score"), min=Min("score"), max=Max("score"),
+    )
+    return {
+        "attempt_count": agg["count"],
+        "average_score": float(agg["avg"]) if agg["avg"] is not None else None,
+        "min_score": float(agg["min"]) if agg["min"] is not None else None,
+        "max_score": float(agg["max"]) if agg["max"] is not None else None,
+    }
+
+
+def mismatches(stats, tolerance=0.01):
+    """Fields where ``stats`` disagrees with the live aggregation."""
+    live = live_aggregate(stats.exam_id)
+    stored = stats.as_dict()
+    diff = {}
+    for field, expected in live.items():
+        actual = stored[field]
+        if expected is None or actual is None:
+            if expected != actual:
+                diff[field] = (actual, expected)
+        elif abs(actual - expected) > tolerance:
+            diff[field] = (actual, expected)
+    return diff
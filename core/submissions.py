@@ -0,0 +1,177 @@
+# core/submissions.py
+"""
+Optional asynchronous submission pipeline.
+
+When ``EXAM_SUBMISSION_QUEUE["ENABLED"]`` is set, ``ExamViewSet.submit`` only
+stores the validated payload in the QueuedSubmission table and hands back a
+receipt. Worker threads (started lazily in the web process, or run on their
+own with ``manage.py run_submission_workers``) claim queued rows in batches
+and grade each batch in one transaction. The table is the queue, so nothing
+beyond the database is needed and pending work survives restarts.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .grading import grade_attempts
+from .models import QueuedSubmission, StudentExam
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": False,
+    "MAX_DEPTH": 5000,      # pending submissions before answering 429
+    "BATCH_SIZE": 100,      # submissions graded per transaction
+    "WORKERS": 2,           # threads started in the web process (0 = none)
+    "POLL_INTERVAL": 0.5,   # seconds an idle worker sleeps
+    "CLAIM_TIMEOUT": 300,   # seconds before a stuck claim is re-queued
+    "RETRY_AFTER": 5,       # Retry-After header sent with 429
+}
+
+
+def queue_setting(name):
+    return getattr(settings, "EXAM_SUBMISSION_QUEUE", {}).get(name, DEFAULTS[name])
+
+
+class QueueFull(Exception):
+    """Raised when the number of pending submissions reaches MAX_DEPTH."""
+
+
+class AlreadyQueued(Exception):
+    """Raised when the student already has a submission for the exam waiting to be graded."""
+
+    def __init__(self, submission):
+        super().__init__(submission.receipt if submission else None)
+        self.submission = submission
+
+
+PENDING = ("queued", "processing")
+
+
+def enqueue(exam, student, answers):
+    mine = QueuedSubmission.objects.filter(exam=exam, student=student, status__in=PENDING)
+    existing = mine.first()
+    if existing:
+        raise AlreadyQueued(existing)
+    pending = QueuedSubmission.objects.filter(status__in=PENDING).count()
+    if pending >= queue_setting("MAX_DEPTH"):
+        raise QueueFull()
+    try:
+        with transaction.atomic():
+            return QueuedSubmission.objects.create(
+                exam=exam, student=student,
+                answers=[{"question_id": a["question_id"], "option_id": a["option_id"]} for a in answers],
+            )
+    except IntegrityError:   # a concurrent request queued one first (unique_pending_submission)
+        raise AlreadyQueued(mine.first())
+
+
+def claim_batch(size):
+    """Mark up to ``size`` queued submissions as processing and return them."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=queue_setting("CLAIM_TIMEOUT"))
+    QueuedSubmission.objects.filter(status="processing", claimed_at__lt=stale).update(status="queued")
+
+    with transaction.atomic():
+        ids = list(QueuedSubmission.objects.select_for_update(skip_locked=True)
+                   .filter(status="queued").order_by("id")
+                   .values_list("id", flat=True)[:size])
+        if not ids:
+            return []
+        # the status guard keeps a concurrent worker from claiming the same rows
+        QueuedSubmission.objects.filter(id__in=ids, status="queued") \
+                                .update(status="processing", claimed_at=now)
+    return list(QueuedSubmission.objects.filter(id__in=ids, status="processing", claimed_at=now))
+
+
+def process_batch(size=None):
+    """Grade one batch of queued submissions. Returns how many were handled."""
+    batch = claim_batch(size or queue_setting("BATCH_SIZE"))
+    if not batch:
+        return 0
+
+    student_ids = {s.student_id for s in batch}
+    exam_ids = {s.exam_id for s in batch}
+    existing = StudentExam.objects.filter(student_id__in=student_ids, exam_id__in=exam_ids)
+    attempts = {(a.student_id, a.exam_id): a for a in existing}
+    missing = {(s.student_id, s.exam_id) for s in batch} - attempts.keys()
+    if missing:
+        StudentExam.objects.bulk_create(
+            [StudentExam(student_id=st, exam_id=ex) for st, ex in missing],
+            ignore_conflicts=True,
+        )
+        created = StudentExam.objects.filter(student_id__in=student_ids, exam_id__in=exam_ids)
+        attempts = {(a.student_id, a.exam_id): a for a in created}
+
+    to_grade = []
+    for sub in batch:
+        attempt = attempts[(sub.student_id, sub.exam_id)]
+        if attempt.finished_at:
+            sub.status, sub.detail = "rejected", "You already submitted."
+            continue
+        attempt.finished_at = timezone.now()   # a second queued copy gets rejected
+        to_grade.append((attempt, sub))
+
+    now = timezone.now()
+    with transaction.atomic():
+        graded = {a.pk for a in grade_attempts([(attempt, sub.answers) for attempt, sub in to_grade])}
+        for attempt, sub in to_grade:
+            if attempt.pk in graded:
+                sub.status, sub.score = "graded", attempt.score
+            else:   # finished meanwhile by another request or the scheduler
+                sub.status, sub.detail = "rejected", "You already submitted."
+        for sub in batch:
+            sub.graded_at = now
+        QueuedSubmission.objects.bulk_update(batch, ["status", "score", "detail", "graded_at"])
+    return len(batch)
+
+
+class SubmissionWorkerPool:
+    """A few daemon threads draining the submission queue."""
+
+    def __init__(self, workers=None):
+        self.workers = queue_setting("WORKERS") if workers is None else workers
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"submission-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                handled = process_batch()
+            except Exception:
+                logger.exception("Grading a submission batch failed")
+                handled = 0
+            finally:
+                close_old_connections()
+            if not handled:
+                self._stop.wait(queue_setting("POLL_INTERVAL"))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def ensure_workers():
+    """Start this process's worker pool the first time it is needed."""
+    global _pool
+    if _pool is not None or not queue_setting("WORKERS"):
+        return
+    with _pool_lock:
+        if _pool is None:
+            _pool = SubmissionWorkerPool()
+            _pool.start()
@@ -0,0 +1,35 @@
+# core/testing/conftest.py
+import datetime as dt
+
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from core.models import User, Teacher
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    cache.clear()     # exam payloads, dashboards and the search index all live here
+
+
+@pytest.fixture
+def teacher():
+    user = User.objects.create_user("teach", password="x", role="teacher", first_name="Ada", last_name="L")
+    return Teacher.objects.create(user=user, phone="1", subject_specialization="Math",
+                                  employee_id="E1", date_of_joining=dt.date.today(), status="active")
+
+
+@pytest.fixture
+def client(teacher):
+    client = APIClient()
+    client.force_authenticate(teacher.user)
+    return client
+
+
+@pytest.fixture
+def api():
+    admin = User.objects.create_user("adm", password="x", role="admin")
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
@@ -0,0 +1,98 @@
+# core/testing/test_analysis.py
+import datetime as dt
+import time
+
+import numpy as np
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.analysis import analyse
+from core.grading import AnswerKey, grade_attempt
+from core.models import User, Teacher, Student, Exam, Question, Option, StudentExam
+
+pytestmark = pytest.mark.django_db
+
+
+def test_analysis_endpoint_reports_difficulty_and_discrimination():
+    t_user = User.objects.create_user("teach", password="x", role="teacher")
+    teacher = Teacher.objects.create(
+        user=t_user, phone="1", subject_specialization="Math",
+        employee_id="E1", date_of_joining=dt.date.today(), status="active"
+    )
+    exam = Exam.objects.create(title="Quiz", teacher=teacher, target_class="10",
+                               start_time=timezone.now(), duration_min=30)
+    questions = []
+    for i in range(2):
+        q = Question.objects.create(exam=exam, text=f"Q{i}")
+        questions.append((q, Option.objects.create(question=q, text="yes", is_correct=True),
+                          Option.objects.create(question=q, text="no", is_correct=False)))
+
+    # Q0 is answered right by the two strongest students only, Q1 by everyone but the last
+    pattern = [(1, 1), (1, 1), (0, 1), (0, 0)]
+    for i, row in enumerate(pattern):
+        s_user = User.objects.create_user(f"s{i}", password="x", role="student")
+        student = Student.objects.create(
+            user=s_user, phone="2", roll_number=f"R{i}", student_class="10-A",
+            date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+            status="active", assigned_teacher=teacher
+        )
+        answers = [{"question_id": q.id, "option_id": (right if ok else wrong).id}
+                   for (q, right, wrong), ok in zip(questions, row)]
+        grade_attempt(StudentExam.objects.create(student=student, exam=exam), answers)
+
+    client = APIClient()
+    client.force_authenticate(t_user)
+    r = client.get(reverse("exam-analysis", args=[exam.id]))
+    assert r.status_code == 200
+    assert r.data["attempt_count"] == 4
+
+    q0, q1 = r.data["questions"]
+    assert q0["difficulty"] == 0.5
+    assert q1["difficulty"] == 0.75
+    assert q0["discrimination"] > 0.8
+    assert [o["share"] for o in q0["options"]] == [0.5, 0.5]
+
+
+def test_analyse_10k_attempts_by_100_questions_is_fast():
+    n_attempts, n_questions, n_options = 10_000, 100, 4
+    rows = [(q * n_options + o + 1, q + 1, o == 0)
+            for q in range(n_questions) for o in range(n_options)]
+    key = AnswerKey(1, rows)
+
+    rng = np.random.default_rng(0)
+    attempt_ids = np.repeat(np.arange(1, n_attempts + 1), n_questions)
+    questions = np.tile(np.arange(n_questions), n_attempts)
+    option_ids = questions * n_options + rng.integers(0, n_options, len(questions)) + 1
+
+    start = time.perf_counter()
+    result = analyse(key, attempt_ids, option_ids)
+    elapsed = time.perf_counter() - start
+
+    assert result["attempt_count"] == n_attempts
+    assert len(result["questions"]) == n_questions
+    assert abs(result["questions"][0]["difficulty"] - 0.25) < 0.02
+    assert elapsed < 1
+
+
+def test_analysis_does_not_prefetch_the_question_tree():
+    t_user = User.objects.create_user("teach", password="x", role="teacher")
+    teacher = Teacher.objects.create(
+        user=t_user, phone="1", subject_specialization="Math",
+        employee_id="E1", date_of_joining=dt.date.today(), status="active"
+    )
+    exam = Exam.objects.create(title="Quiz", teacher=teacher, target_class="10",
+                               start_time=timezone.now(), duration_min=30)
+    Option.objects.create(question=Question.objects.create(exam=exam, text="Q"),
+                          text="yes", is_correct=True)
+
+    client = APIClient()
+    client.force_authenticate(t_user)
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(reverse("exam-analysis", args=[exam.id])).status_code == 200
+    # only list/retrieve render the questions; analysis reads its own answer key
+    assert not [q["sql"] for q in ctx.captured_queries
+                if '"core_question"."exam_id" IN' in q["sql"]]
@@ -0,0 +1,147 @@
+# core/testing/test_autosave.py
+import datetime as dt
+
+import pytest
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.autosave import AnswerBuffer, answer_buffer
+from core.models import User, Teacher, Student, Exam, Question, Option, Answer, StudentExam
+from core.submissions import process_batch
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    cache.clear()
+    answer_buffer.drain()
+    monkeypatch.setattr("core.views.ensure_flusher", lambda: None)   # flush by hand
+    yield
+    answer_buffer.drain()
+
+
+@pytest.fixture
+def setup():
+    t_user = User.objects.create_user("teach", password="x", role="teacher")
+    teacher = Teacher.objects.create(user=t_user, phone="1", subject_specialization="Math",
+                                     employee_id="E1", date_of_joining=dt.date.today(), status="active")
+    s_user = User.objects.create_user("stud", password="x", role="student")
+    student = Student.objects.create(user=s_user, phone="2", roll_number="R1", student_class="10A",
+                                     date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+                                     status="active", assigned_teacher=teacher)
+    exam = Exam.objects.create(title="Quiz", teacher=teacher, target_class="10",
+                               start_time=timezone.now(), duration_min=30)
+    for i in range(4):
+        q = Question.objects.create(exam=exam, text=f"Q{i}")
+        Option.objects.create(question=q, text="right", is_correct=True)
+        Option.objects.create(question=q, text="wrong", is_correct=False)
+    client = APIClient()
+    client.force_authenticate(s_user)
+    return client, student, exam
+
+
+def _pick(exam, i, correct):
+    q = exam.questions.order_by("id")[i]
+    return {"question_id": q.id, "option_id": q.options.get(is_correct=correct).id}
+
+
+def test_buffer_coalesces_and_flushes_in_one_statement(setup):
+    _, student, exam = setup
+    attempts = [StudentExam.objects.create(student=student, exam=exam)]
+    q = exam.questions.order_by("id")[0]
+    right, wrong = q.options.order_by("-is_correct")
+    buffer = AnswerBuffer()
+    for option in (wrong, right, wrong, right):
+        buffer.put(attempts[0].pk, [(q.id, option.id)])
+    assert len(buffer) == 1
+    with CaptureQueriesContext(connection) as ctx:
+        assert buffer.flush() == 1
+    assert sum(query["sql"].startswith("INSERT") for query in ctx.captured_queries) == 1
+    assert Answer.objects.get(attempt=attempts[0]).chosen == right
+    assert buffer.flush() == 0
+
+
+def test_autosave_is_buffered_and_merged_on_submit(setup):
+    client, _, exam = setup
+    url = reverse("exam-autosave", args=[exam.id])
+    r = client.post(url, {"answers": [_pick(exam, 0, False)]}, format="json")
+    assert r.status_code == 202
+    client.post(url, {"answers": [_pick(exam, 0, True), _pick(exam, 1, True)]}, format="json")
+    assert not Answer.objects.exists()          # nothing written until a flush
+
+    answer_buffer.flush()
+    assert Answer.objects.count() == 2
+    client.post(url, {"answers": [_pick(exam, 2, True)]}, format="json")   # still buffered
+
+    r = client.post(reverse("exam-submit", args=[exam.id]),
+                    {"answers": [_pick(exam, 3, False)]}, format="json")
+    assert r.status_code == 200
+    assert float(r.data["score"]) == 75.0        # 3 of 4 right: saved + buffered + submitted
+    assert len(answer_buffer) == 0
+
+
+def test_autosave_rejects_foreign_options_and_closed_attempts(setup):
+    client, student, exam = setup
+    url = reverse("exam-autosave", args=[exam.id])
+    q0, q1 = exam.questions.order_by("id")[:2]
+    bad = {"question_id": q0.id, "option_id": q1.options.first().id}
+    assert client.post(url, {"answers": [bad]}, format="json").status_code == 400
+
+    StudentExam.objects.create(student=student, exam=exam, finished_at=timezone.now(), score=0)
+    assert client.post(url, {"answers": [_pick(exam, 0, True)]}, format="json").status_code == 400
+
+
+def test_flush_drops_answers_of_closed_attempts(setup):
+    client, student, exam = setup
+    client.post(reverse("exam-autosave", args=[exam.id]), {"answers": [_pick(exam, 0, True)]}, format="json")
+    StudentExam.objects.filter(student=student).update(finished_at=timezone.now(), score=0)
+    assert answer_buffer.flush() == 0
+    assert not Answer.objects.exists()
+
+
+@override_settings(EXAM_SUBMISSION_QUEUE={"ENABLED": True, "WORKERS": 0, "MAX_DEPTH": 0})
+def test_queued_submit_refused_keeps_buffered_answers(setup):
+    client, _, exam = setup
+    client.post(reverse("exam-autosave", args=[exam.id]), {"answers": [_pick(exam, 0, True)]}, format="json")
+
+    r = client.post(reverse("exam-submit", args=[exam.id]), {"answers": [_pick(exam, 1, True)]}, format="json")
+    assert r.status_code == 429
+    assert len(answer_buffer) == 1              # still there for the retry
+
+    with override_settings(EXAM_SUBMISSION_QUEUE={"ENABLED": True, "WORKERS": 0, "MAX_DEPTH": 10}):
+        r = client.post(reverse("exam-submit", args=[exam.id]),
+                        {"answers": [_pick(exam, 1, True)]}, format="json")
+        assert r.status_code == 202
+        assert len(answer_buffer) == 0
+        assert process_batch() == 1
+    assert Answer.objects.filter(chosen__is_correct=True).count() == 2    # autosaved + submitted
+
+
+def test_failed_flush_keeps_answers_and_newer_puts_win(setup, monkeypatch):
+    _, student, exam = setup
+    attempt = StudentExam.objects.create(student=student, exam=exam)
+    q0, q1 = exam.questions.order_by("id")[:2]
+    right, wrong = q0.options.order_by("-is_correct")
+    buffer = AnswerBuffer()
+    buffer.put(attempt.pk, [(q0.id, wrong.id), (q1.id, q1.options.first().id)])
+
+    def locked(rows):
+        # still visible to a submit while the write is in flight
+        assert buffer.peek(attempt.pk)[q0.id] == wrong.id
+        buffer.put(attempt.pk, [(q0.id, right.id)])      # a newer click during the write
+        raise OperationalError("database is locked")
+
+    monkeypatch.setattr("core.autosave.save_answers", locked)
+    with pytest.raises(OperationalError):
+        buffer.flush()
+    assert buffer.peek(attempt.pk) == {q0.id: right.id, q1.id: q1.options.first().id}
+
+    monkeypatch.undo()
+    assert buffer.flush() == 2
+    assert Answer.objects.get(attempt=attempt, question=q0).chosen == right
@@ -0,0 +1,122 @@
+# core/testing/test_channel_layers.py
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+from channels.exceptions import ChannelFull
+
+from core.channel_layers import SQLiteChannelLayer
+
+
+def _run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 10))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "channels.sqlite3"
+
+
+def test_group_semantics(path):
+    layer = SQLiteChannelLayer(path)
+
+    async def scenario():
+        a, b = await layer.new_channel(), await layer.new_channel()
+        await layer.group_add("chat_1", a)
+        await layer.group_add("chat_1", b)
+        await layer.group_send("chat_1", {"type": "chat.message", "n": 1})
+        assert await layer.receive(a) == {"type": "chat.message", "n": 1}
+        assert await layer.receive(b) == {"type": "chat.message", "n": 1}
+
+        await layer.group_discard("chat_1", b)
+        await layer.group_send("chat_1", {"type": "chat.message", "n": 2})
+        assert (await layer.receive(a))["n"] == 2
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(layer.receive(b), 0.2)
+
+        await layer.send("worker", {"type": "job"})
+        assert await layer.receive("worker") == {"type": "job"}
+        await layer.close()
+
+    _run(scenario())
+
+
+def test_messages_cross_layer_instances(path):
+    """Two layers on one file behave like two worker processes."""
+    sender, receiver = SQLiteChannelLayer(path), SQLiteChannelLayer(path)
+
+    async def scenario():
+        channel = await receiver.new_channel()
+        await receiver.group_add("user_7", channel)
+        pending = asyncio.ensure_future(receiver.receive(channel))
+        await sender.group_send("user_7", {"type": "chat.message", "payload": {"content": "hi"}})
+        assert (await pending)["payload"]["content"] == "hi"
+        await receiver.close()
+
+    _run(scenario())
+
+
+def _send_from_child(path):
+    asyncio.run(SQLiteChannelLayer(path).group_send("chat_9", {"type": "chat.message", "from": "child"}))
+
+
+def test_messages_cross_processes(path):
+    layer = SQLiteChannelLayer(path)
+
+    async def scenario():
+        channel = await layer.new_channel()
+        await layer.group_add("chat_9", channel)
+        child = multiprocessing.get_context("spawn").Process(target=_send_from_child, args=(str(path),))
+        child.start()
+        message = await layer.receive(channel)
+        child.join()
+        assert message == {"type": "chat.message", "from": "child"}
+        await layer.close()
+
+    _run(scenario())
+
+
+def test_capacity_and_expiry(path):
+    layer = SQLiteChannelLayer(path, capacity=2, expiry=1)
+
+    async def scenario():
+        channel = await layer.new_channel()
+        await layer.send(channel, {"n": 1})
+        await layer.send(channel, {"n": 2})
+        with pytest.raises(ChannelFull):
+            await layer.send(channel, {"n": 3})
+        await layer.group_add("chat_1", channel)
+        await layer.group_send("chat_1", {"n": 4})      # full: skipped, not an error
+
+        time.sleep(1.1)
+        await layer.group_send("chat_1", {"n": 5})      # expired messages drop the channel from groups
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(layer.receive(channel), 0.2)
+        await layer.close()
+
+    _run(scenario())
+
+
+def test_cancelled_receives_release_their_queues(path):
+    layer = SQLiteChannelLayer(path)
+
+    async def scenario():
+        channels = [await layer.new_channel() for _ in range(50)]
+        waiting = [asyncio.ensure_future(layer.receive(c)) for c in channels]
+        await asyncio.sleep(0.05)
+        for task in waiting:                       # the sockets disconnect
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        assert layer._queues == {}
+        await asyncio.sleep(layer.poll_interval * 5)
+        assert layer._poller.done()                # nothing left to poll for
+
+        # a fresh receive starts polling again
+        channel = await layer.new_channel()
+        pending = asyncio.ensure_future(layer.receive(channel))
+        await layer.send(channel, {"type": "ping"})
+        assert await pending == {"type": "ping"}
+        await layer.close()
+
+    _run(scenario())
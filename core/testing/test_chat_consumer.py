@@ -0,0 +1,97 @@
+# core/testing/test_chat_consumer.py
+import asyncio
+import datetime as dt
+
+import pytest
+from asgiref.sync import sync_to_async
+from channels.routing import URLRouter
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import User, Teacher, Student, Chat
+from core.routing import websocket_urlpatterns
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+application = URLRouter(websocket_urlpatterns)
+
+
+@pytest.fixture(autouse=True)
+def empty_layer():
+    asyncio.run(get_channel_layer().flush())
+
+
+def _student(teacher, name):
+    user = User.objects.create_user(name, password="x", role="student")
+    Student.objects.create(
+        user=user, phone="2", roll_number=name, student_class="10-A",
+        date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+        status="active", assigned_teacher=teacher
+    )
+    return user
+
+
+def _chat(user, teacher):
+    chat = Chat.objects.create(created_by=user)
+    chat.participants.add(user, teacher.user)
+    return chat
+
+
+async def _connect(user, chat_id):
+    communicator = WebsocketCommunicator(application, f"/ws/chat/{chat_id}/?token={AccessToken.for_user(user)}")
+    connected, _ = await communicator.connect()
+    assert connected
+    return communicator
+
+
+def _run(coro):
+    asyncio.run(asyncio.wait_for(coro, 20))
+
+
+def test_all_chats_socket_subscribes_once_and_sees_new_chats(teacher):
+    for i in range(20):
+        _chat(_student(teacher, f"s{i}"), teacher)
+    amy = _student(teacher, "amy")
+
+    async def scenario():
+        inbox = await _connect(teacher.user, "all")
+        # one group for all 20 chats, whatever their number
+        memberships = [g for g, channels in get_channel_layer().groups.items() if channels]
+        assert memberships == [f"user_{teacher.user_id}"]
+
+        # created after the teacher connected
+        chat = await sync_to_async(_chat)(amy, teacher)
+        student = await _connect(amy, chat.pk)
+        await student.send_json_to({"content": "hello"})
+        assert (await student.receive_json_from())["content"] == "hello"
+        received = await inbox.receive_json_from()
+        assert received["content"] == "hello" and received["chat"] == chat.pk
+
+        await inbox.send_json_to({"content": "welcome", "chat_id": chat.pk})
+        assert (await student.receive_json_from())["content"] == "welcome"
+        assert (await inbox.receive_json_from())["content"] == "welcome"
+        assert await inbox.receive_nothing()
+        await student.disconnect()
+        await inbox.disconnect()
+
+    _run(scenario())
+
+
+def test_teacher_cannot_post_into_other_chats(teacher):
+    other = Teacher.objects.create(
+        user=User.objects.create_user("other", password="x", role="teacher"), phone="3",
+        subject_specialization="Art", employee_id="E2", date_of_joining=dt.date.today(), status="active")
+    amy = _student(teacher, "amy")
+    chat = _chat(amy, teacher)
+
+    async def scenario():
+        student = await _connect(amy, chat.pk)
+        intruder = await _connect(other.user, "all")
+        await intruder.send_json_to({"content": "spam", "chat_id": chat.pk})
+        assert await student.receive_nothing(timeout=0.3)
+        await student.disconnect()
+        await intruder.disconnect()
+
+    _run(scenario())
+    assert not chat.messages.exists()
@@ -0,0 +1,103 @@
+# core/testing/test_chat_inbox.py
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.consumers import ChatConsumer
+from core.models import User, Student, Chat, ChatInbox, Message
+
+pytestmark = pytest.mark.django_db
+
+
+def _client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def _student_chat(teacher, name):
+    user = User.objects.create_user(name, password="x", role="student")
+    Student.objects.create(
+        user=user, phone="2", roll_number=name, student_class="10-A",
+        date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+        status="active", assigned_teacher=teacher
+    )
+    r = _client(user).post(reverse("chat-list"), {"participants": [teacher.user_id]}, format="json")
+    assert r.status_code == 201
+    return user, Chat.objects.get(pk=r.data["id"])
+
+
+def _send(chat, user, content):
+    return ChatConsumer().save_message(chat.pk, user, content)
+
+
+def _inbox(user, chat):
+    return ChatInbox.objects.get(user=user, chat=chat)
+
+
+def test_messages_update_unread_counts(teacher):
+    amy, chat = _student_chat(teacher, "amy")
+    assert ChatInbox.objects.filter(chat=chat).count() == 2
+    for i in range(3):
+        _send(chat, amy, f"question {i}")
+    last = _send(chat, teacher.user, "answer")
+    assert _inbox(teacher.user, chat).unread_count == 0
+    assert _inbox(teacher.user, chat).last_read_id == last.pk
+    assert _inbox(amy, chat).unread_count == 1
+    assert _inbox(amy, chat).last_activity == last.timestamp
+
+
+def test_inbox_is_sorted_by_activity_without_reading_messages(teacher):
+    chats = {}
+    for name in ("amy", "bob", "cat"):
+        user, chat = _student_chat(teacher, name)
+        chats[name] = chat
+        _send(chat, user, "hi")
+    _send(chats["amy"], User.objects.get(username="amy"), "again")
+
+    with CaptureQueriesContext(connection) as ctx:
+        r = _client(teacher.user).get(reverse("chat-inbox"))
+    assert r.status_code == 200
+    assert [row["chat"] for row in r.data["results"]] == [chats[n].pk for n in ("amy", "cat", "bob")]
+    assert [row["unread_count"] for row in r.data["results"]] == [2, 1, 1]
+    assert not any("core_message" in q["sql"] for q in ctx.captured_queries)
+
+
+def test_mark_read_up_to_id(teacher):
+    amy, chat = _student_chat(teacher, "amy")
+    sent = [_send(chat, amy, f"m{i}") for i in range(5)]
+    client = _client(teacher.user)
+    url = reverse("chat-mark-read", args=[chat.pk])
+
+    r = client.post(url, {"up_to_id": sent[2].pk}, format="json")
+    assert r.status_code == 200
+    assert r.data["unread_count"] == 2 and r.data["last_read_id"] == sent[2].pk
+    assert list(Message.objects.filter(chat=chat, sender=amy).values_list("read", flat=True)) == \
+        [True, True, True, False, False]
+
+    # an older id never moves the marker back
+    assert client.post(url, {"up_to_id": sent[0].pk}, format="json").data["unread_count"] == 2
+    assert client.post(url, {}, format="json").data["unread_count"] == 0
+    assert client.post(url, {"up_to_id": "x"}, format="json").status_code == 400
+
+    # ids beyond the newest message are clamped, so later messages stay unread
+    assert client.post(url, {"up_to_id": 10**9}, format="json").data["last_read_id"] == sent[-1].pk
+    _send(chat, amy, "late")
+    assert _inbox(teacher.user, chat).unread_count == 1
+    assert client.post(url, {}, format="json").data["unread_count"] == 0
+
+    # replying reads the chat too
+    _send(chat, amy, "m5")
+    reply = _send(chat, teacher.user, "reply")
+    assert _inbox(teacher.user, chat).unread_count == 0
+    assert _inbox(teacher.user, chat).last_read_id == reply.pk
+
+
+def test_mark_read_needs_participation(teacher):
+    _, chat = _student_chat(teacher, "amy")
+    bob = User.objects.create_user("bob", password="x", role="student")
+    assert _client(bob).post(reverse("chat-mark-read", args=[chat.pk]), {}).status_code == 404
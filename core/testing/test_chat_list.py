@@ -0,0 +1,55 @@
+# core/testing/test_chat_list.py
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import User, Student, Chat, Message
+from core.serializers import ChatSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+def _chats(teacher, n, start=0):
+    for i in range(start, start + n):
+        user = User.objects.create_user(f"s{i}", password="x", role="student", first_name=f"S{i}")
+        Student.objects.create(
+            user=user, phone="2", roll_number=f"R{i}", student_class="10-A",
+            date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+            status="active", assigned_teacher=teacher
+        )
+        chat = Chat.objects.create(created_by=user)
+        chat.participants.add(user, teacher.user)
+        if i % 3:   # every third chat has no messages yet
+            Message.objects.create(chat=chat, sender=user, content=f"hello {i}")
+            Message.objects.create(chat=chat, sender=teacher.user, content=f"reply {i}")
+
+
+def _list(client):
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.get(reverse("chat-list"), {"page_size": 100})
+    assert r.status_code == 200
+    return r.data["results"], len(ctx.captured_queries)
+
+
+def test_chat_list_query_count_does_not_grow(client, teacher):
+    _chats(teacher, 3)
+    few, few_queries = _list(client)
+    _chats(teacher, 30, start=3)
+    many, many_queries = _list(client)
+    assert len(few) == 3 and len(many) == 33
+    assert few_queries == many_queries
+
+
+def test_annotated_chats_serialize_like_bare_ones(client, teacher):
+    _chats(teacher, 6)
+    rows, _ = _list(client)
+    bare = {c.pk: ChatSerializer(c).data for c in Chat.objects.all()}
+    for row in rows:
+        assert row == bare[row["id"]]
+    last = {row["id"]: row["last_message"] for row in rows}
+    assert sum(m is None for m in last.values()) == 2
+    assert {m["content"] for m in last.values() if m} == {f"reply {i}" for i in (1, 2, 4, 5)}
+    assert all(m["sender_username"] == "teach" for m in last.values() if m)
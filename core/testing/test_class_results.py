@@ -0,0 +1,92 @@
+# core/testing/test_class_results.py
+import asyncio
+import datetime as dt
+import json
+
+import pytest
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import User, Teacher, Student, Exam, StudentExam
+from core.views import ClassResultsView
+
+pytestmark = pytest.mark.django_db
+
+
+def _results(n_exams, n_students):
+    t_user = User.objects.create_user("teach", password="x", role="teacher")
+    teacher = Teacher.objects.create(
+        user=t_user, phone="1", subject_specialization="Math",
+        employee_id="E1", date_of_joining=dt.date.today(), status="active"
+    )
+    students = []
+    for i in range(n_students):
+        s_user = User.objects.create_user(f"s{i}", password="x", role="student",
+                                          first_name="Stu", last_name=str(i))
+        students.append(Student.objects.create(
+            user=s_user, phone="2", roll_number=f"R{i}", student_class="10-A",
+            date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+            status="active", assigned_teacher=teacher
+        ))
+    for e in range(n_exams):
+        exam = Exam.objects.create(title=f"Exam {e}", teacher=teacher, target_class="10",
+                                   start_time=timezone.now(), duration_min=30)
+        for stu in students:
+            StudentExam.objects.create(student=stu, exam=exam, score=50, status="attempted")
+
+
+def test_class_results_single_query(api):
+    _results(n_exams=3, n_students=4)
+    with CaptureQueriesContext(connection) as ctx:
+        r = api.get(reverse("class-results", args=[10]))
+    assert r.status_code == 200
+    assert len(r.data) == 12
+    assert r.data[0]["student_name"] == "Stu 0"
+    assert len(ctx.captured_queries) == 1
+
+
+def test_class_results_cursor_pages(api):
+    _results(n_exams=2, n_students=3)
+    url = reverse("class-results", args=[10])
+
+    first = api.get(url, {"limit": 4}).data
+    assert len(first["results"]) == 4
+    second = api.get(url, {"limit": 4, "cursor": first["next_cursor"]}).data
+    assert len(second["results"]) == 2
+    assert second["next_cursor"] is None
+
+
+def test_class_results_ndjson_stream(api):
+    _results(n_exams=2, n_students=2)
+    r = api.get(reverse("class-results", args=[10]), {"stream": "ndjson"})
+    assert r["Content-Type"] == "application/x-ndjson"
+    lines = b"".join(r.streaming_content).decode().splitlines()
+    assert [json.loads(line)["exam_title"] for line in lines] == ["Exam 0", "Exam 0", "Exam 1", "Exam 1"]
+
+    r = api.get(reverse("class-results", args=[10]), {"stream": "json"})
+    assert len(json.loads(b"".join(r.streaming_content))) == 4
+
+
+@pytest.mark.django_db(transaction=True)
+def test_class_results_stream_row_by_row_under_asgi(api, monkeypatch):
+    _results(n_exams=1, n_students=3)
+    token = api.post(reverse("token_obtain_pair"), {"username": "adm", "password": "x"}).data["access"]
+    encoded = []
+    to_item = ClassResultsView.to_item
+    monkeypatch.setattr(ClassResultsView, "to_item", staticmethod(lambda row: encoded.append(row) or to_item(row)))
+
+    async def fetch():
+        response = await AsyncClient().get(reverse("class-results", args=[10]), {"stream": "ndjson"},
+                                           headers={"Authorization": f"Bearer {token}"})
+        parts, progress = [], []
+        async for part in response:
+            parts.append(part)
+            progress.append(len(encoded))
+        return parts, progress
+
+    parts, progress = asyncio.run(fetch())
+    assert progress == [1, 2, 3]             # each row is sent as soon as it is encoded
+    assert [json.loads(p)["student_name"] for p in parts] == ["Stu 0", "Stu 1", "Stu 2"]
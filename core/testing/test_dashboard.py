@@ -0,0 +1,133 @@
+# core/testing/test_dashboard.py
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.dashboard import student_exams
+from core.grading import grade_attempt
+from core.models import User, Student, Exam, StudentExam
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def student(teacher):
+    user = User.objects.create_user("amy", password="x", role="student")
+    return Student.objects.create(user=user, phone="2", roll_number="R1", student_class="10A",
+                                  date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+                                  status="active", assigned_teacher=teacher)
+
+
+@pytest.fixture
+def client(student):
+    client = APIClient()
+    client.force_authenticate(student.user)
+    return client
+
+
+def _exam(teacher, title, cls="10", start=None):
+    return Exam.objects.create(title=title, teacher=teacher, target_class=cls,
+                               start_time=start or timezone.now(), duration_min=30)
+
+
+def _titles(client, name="exam-list"):
+    data = client.get(reverse(name)).data
+    return [e["title"] for e in (data["results"] if isinstance(data, dict) else data)]
+
+
+def test_steady_state_polls_need_no_queries(client, teacher):
+    _exam(teacher, "A")
+    _exam(teacher, "B")
+    _exam(teacher, "Past", start=timezone.now() - dt.timedelta(days=1))
+    assert _titles(client) == ["Past", "B", "A"]
+    with CaptureQueriesContext(connection) as ctx:
+        assert _titles(client) == ["Past", "B", "A"]
+        assert _titles(client, "exam-unattempted") == ["Past"]
+    assert len(ctx.captured_queries) == 0
+
+
+def test_exam_writes_refresh_the_list(client, teacher):
+    exam = _exam(teacher, "A")
+    assert _titles(client) == ["A"]
+    exam.title = "A2"
+    exam.save()
+    _exam(teacher, "B")
+    _exam(teacher, "Other grade", cls="9")
+    assert _titles(client) == ["B", "A2"]
+    exam.target_class = "9"
+    exam.save()
+    assert _titles(client) == ["B"]
+    teacher.user.first_name = "Grace"
+    teacher.user.save()
+    assert client.get(reverse("exam-list")).data["results"][0]["teacher_name"] == "Grace L"
+
+
+def test_attempts_and_class_changes_refresh_the_student(client, student, teacher):
+    past = _exam(teacher, "Past", start=timezone.now() - dt.timedelta(days=1))
+    assert _titles(client, "exam-unattempted") == ["Past"]
+    attempt = StudentExam.objects.create(student=student, exam=past)
+    grade_attempt(attempt, [])
+    assert _titles(client, "exam-unattempted") == []
+
+    _exam(teacher, "Grade 11", cls="11")
+    student.student_class = "11B"
+    student.save()
+    assert _titles(client) == ["Grade 11"]
+
+
+def test_deleted_attempt_refreshes_the_student(client, student, teacher):
+    past = _exam(teacher, "Past", start=timezone.now() - dt.timedelta(days=1))
+    attempt = StudentExam.objects.create(student=student, exam=past)
+    assert _titles(client, "exam-unattempted") == []
+    StudentExam.objects.filter(pk=attempt.pk).delete()   # queryset delete still sends signals
+    assert _titles(client, "exam-unattempted") == ["Past"]
+
+
+def test_user_without_profile_sees_nothing():
+    user = User.objects.create_user("ghost", password="x", role="student")
+    client = APIClient()
+    client.force_authenticate(user)
+    assert _titles(client) == []
+
+
+def test_student_exam_list_is_keyset_paged(client, teacher):
+    for title in "ABCDE":
+        _exam(teacher, title)
+    r = client.get(reverse("exam-list"), {"page_size": 2})
+    assert [e["title"] for e in r.data["results"]] == ["E", "D"]
+    assert r.data["previous"] is None
+
+    _exam(teacher, "F")                        # a new exam does not shift the next page
+    r = client.get(r.data["next"])
+    assert [e["title"] for e in r.data["results"]] == ["C", "B"]
+    last = client.get(r.data["next"]).data
+    assert [e["title"] for e in last["results"]] == ["A"] and last["next"] is None
+
+    back = client.get(last["previous"]).data
+    assert [e["title"] for e in back["results"]] == ["C", "B"]
+    assert client.get(reverse("exam-list"), {"cursor": "bogus"}).status_code == 404
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+def test_polls_stay_cached_for_a_realistic_school(teacher):
+    _exam(teacher, "A")
+    _exam(teacher, "B")
+    users = []
+    for i in range(150):
+        user = User.objects.create_user(f"s{i}", password="x", role="student")
+        Student.objects.create(user=user, phone="2", roll_number=f"S{i}", student_class="10A",
+                               date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+                               status="active", assigned_teacher=teacher)
+        users.append(user)
+    for user in users:
+        student_exams(user)                     # first poll of every student fills the cache
+    with CaptureQueriesContext(connection) as ctx:
+        for user in users:
+            assert len(student_exams(user)) == 2
+    assert len(ctx.captured_queries) == 0
@@ -0,0 +1,97 @@
+# core/testing/test_delivery.py
+import datetime as dt
+import json
+import pickle
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.delivery import ExamPayload, get_payload
+from core.models import User, Student, Exam, Question, Option
+from core.serializers import ExamReadSerializer
+
+pytestmark = pytest.mark.django_db
+
+SHUFFLED = {"SHUFFLE_QUESTIONS": True, "SHUFFLE_OPTIONS": True}
+
+
+def _student_client(teacher, name, cls="10A"):
+    user = User.objects.create_user(name, password="x", role="student")
+    Student.objects.create(user=user, phone="2", roll_number=name, student_class=cls,
+                           date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+                           status="active", assigned_teacher=teacher)
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def _exam(teacher, n_questions=5, n_options=6, cls="10"):
+    exam = Exam.objects.create(title="Quiz “ü”", teacher=teacher, target_class=cls,
+                               start_time=timezone.now(), duration_min=30)
+    for i in range(n_questions):
+        q = Question.objects.create(exam=exam, text=f"Q{i}")
+        for j in range(n_options):
+            Option.objects.create(question=q, text=f"O{i}.{j}", is_correct=j == 0)
+    return exam
+
+
+def test_payload_matches_the_serializer(teacher):
+    exam = _exam(teacher)
+    payload = get_payload(exam.id)
+    expected = json.loads(json.dumps(ExamReadSerializer(exam).data, default=str))
+    assert json.loads(payload.body) == json.loads(json.dumps(expected))
+    assert b"is_correct" not in payload.body
+    assert pickle.loads(pickle.dumps(payload)).body == payload.body
+
+
+def test_student_fetches_hit_the_cache_and_revalidate(teacher):
+    exam = _exam(teacher)
+    client = _student_client(teacher, "amy")
+    url = reverse("exam-detail", args=[exam.id])
+    first = client.get(url)
+    assert first.status_code == 200 and first["Content-Type"] == "application/json"
+    with CaptureQueriesContext(connection) as ctx:
+        again = client.get(url)
+        not_modified = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert len(ctx.captured_queries) == 0
+    assert again.content == first.content and again["ETag"] == first["ETag"]
+    assert not_modified.status_code == 304
+
+    option = Option.objects.filter(question__exam=exam).first()
+    option.text = "changed"
+    option.save()
+    changed = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert changed.status_code == 200 and b"changed" in changed.content
+
+
+def test_other_grades_exam_is_not_found(teacher):
+    exam = _exam(teacher, cls="9")
+    assert _student_client(teacher, "amy").get(reverse("exam-detail", args=[exam.id])).status_code == 404
+
+
+@override_settings(EXAM_DELIVERY=SHUFFLED)
+def test_shuffling_is_a_stable_per_student_permutation(teacher):
+    exam = _exam(teacher)
+    url = reverse("exam-detail", args=[exam.id])
+    amy, bob = _student_client(teacher, "amy"), _student_client(teacher, "bob")
+    a1, a2, b1 = amy.get(url), amy.get(url), bob.get(url)
+    assert a1.content == a2.content and a1["ETag"] == a2["ETag"]
+    assert a1.content != b1.content and a1["ETag"] != b1["ETag"]
+
+    canonical = json.loads(get_payload(exam.id).body)
+    shuffled = a1.json()
+    assert {q["id"] for q in shuffled["questions"]} == {q["id"] for q in canonical["questions"]}
+    by_id = {q["id"]: q for q in canonical["questions"]}
+    for q in shuffled["questions"]:
+        assert sorted(o["id"] for o in q["options"]) == sorted(o["id"] for o in by_id[q["id"]]["options"])
+    assert amy.get(url, HTTP_IF_NONE_MATCH=a1["ETag"]).status_code == 304
+
+
+def test_render_without_questions():
+    payload = ExamPayload(1, "v", b'{"id":1,"questions":[', ())
+    assert json.loads(payload.body) == {"id": 1, "questions": []}
@@ -0,0 +1,107 @@
+# core/testing/test_exam_authoring.py
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import User, Student, Exam, Question, Option, StudentExam, Answer
+
+pytestmark = pytest.mark.django_db
+
+
+def _payload(teacher, questions):
+    return {"title": "Algebra", "description": "", "teacher": teacher.pk, "target_class": "10",
+            "start_time": timezone.now().isoformat(), "duration_min": 30, "questions": questions}
+
+
+def _questions(n, n_options=4):
+    return [{"text": f"Q{i}", "options": [{"text": f"O{i}.{j}", "is_correct": j == 0}
+                                          for j in range(n_options)]}
+            for i in range(n)]
+
+
+def _current(exam):
+    """The exam's questions in the shape of the write payload, ids included."""
+    return [{"id": q.pk, "text": q.text,
+             "options": [{"id": o.pk, "text": o.text, "is_correct": o.is_correct}
+                         for o in q.options.order_by("id")]}
+            for q in exam.questions.order_by("id")]
+
+
+def test_create_inserts_in_bulk(client, teacher):
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.post(reverse("exam-list"), _payload(teacher, _questions(200)), format="json")
+    assert r.status_code == 201, r.data
+    assert Question.objects.count() == 200 and Option.objects.count() == 800
+    assert Option.objects.filter(is_correct=True).count() == 200
+    assert len(ctx.captured_queries) <= 12
+
+
+def test_update_keeps_ids_and_answers(client, teacher):
+    client.post(reverse("exam-list"), _payload(teacher, _questions(200)), format="json")
+    exam = Exam.objects.get()
+    user = User.objects.create_user("amy", password="x", role="student")
+    student = Student.objects.create(user=user, phone="2", roll_number="R1", student_class="10A",
+                                     date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today())
+    attempt = StudentExam.objects.create(student=student, exam=exam)
+    first = exam.questions.order_by("id").first()
+    Answer.objects.create(attempt=attempt, question=first, chosen=first.options.order_by("id").first())
+
+    questions = _current(exam)
+    questions[1]["text"] = "Q1 reworded"
+    questions[2]["options"][3]["is_correct"] = True
+    questions[3]["options"].pop()
+    questions[4]["options"].append({"text": "new option", "is_correct": False})
+    del questions[0]["id"]                       # matched by text instead
+    removed = questions.pop(5)["id"]
+    questions.append({"text": "Q new", "options": [{"text": "a", "is_correct": True}]})
+
+    before = set(Option.objects.values_list("id", flat=True))
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.put(reverse("exam-detail", args=[exam.id]), _payload(teacher, questions), format="json")
+    assert r.status_code == 200, r.data
+    assert len(ctx.captured_queries) <= 25
+
+    assert Answer.objects.filter(attempt=attempt).count() == 1
+    assert not Question.objects.filter(pk=removed).exists()
+    assert Question.objects.get(pk=questions[1]["id"]).text == "Q1 reworded"
+    assert Option.objects.get(pk=questions[2]["options"][3]["id"]).is_correct
+    assert Question.objects.filter(exam=exam).count() == 200
+    after = set(Option.objects.values_list("id", flat=True))
+    assert len(before - after) == 5               # one dropped option, four of the removed question
+    assert len(after - before) == 2
+
+
+def test_update_rejects_foreign_ids(client, teacher):
+    client.post(reverse("exam-list"), _payload(teacher, _questions(2)), format="json")
+    client.post(reverse("exam-list"), _payload(teacher, _questions(2)), format="json")
+    mine, other = Exam.objects.order_by("id")
+    questions = _current(mine)
+    questions[0]["id"] = other.questions.first().pk
+    r = client.put(reverse("exam-detail", args=[mine.id]), _payload(teacher, questions), format="json")
+    assert r.status_code == 400
+    assert Question.objects.filter(exam=other).count() == 2
+
+
+def test_patch_without_questions_leaves_them(client, teacher):
+    client.post(reverse("exam-list"), _payload(teacher, _questions(3)), format="json")
+    exam = Exam.objects.get()
+    ids = sorted(exam.questions.values_list("id", flat=True))
+    r = client.patch(reverse("exam-detail", args=[exam.id]), {"title": "Renamed"}, format="json")
+    assert r.status_code == 200, r.data
+    assert sorted(exam.questions.values_list("id", flat=True)) == ids
+
+
+def test_update_invalidates_the_delivered_exam(client, teacher):
+    client.post(reverse("exam-list"), _payload(teacher, _questions(2)), format="json")
+    exam = Exam.objects.get()
+    url = reverse("exam-detail", args=[exam.id])
+    before = client.get(url)
+    questions = _current(exam)
+    questions[0]["options"][0]["text"] = "edited"
+    client.put(url, _payload(teacher, questions), format="json")
+    after = client.get(url)
+    assert after["ETag"] != before["ETag"] and b"edited" in after.content
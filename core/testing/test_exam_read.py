@@ -0,0 +1,60 @@
+# core/testing/test_exam_read.py
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Exam, Question, Option
+from core.serializers import ExamReadSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+def _exam(teacher, n_questions, n_options=3):
+    exam = Exam.objects.create(title="Quiz", teacher=teacher, target_class="10",
+                               start_time=timezone.now(), duration_min=30)
+    for i in range(n_questions):
+        q = Question.objects.create(exam=exam, text=f"Q{i}")
+        for j in range(n_options):
+            Option.objects.create(question=q, text=f"O{j}", is_correct=j == 0)
+    return exam
+
+
+def _count(api, url):
+    with CaptureQueriesContext(connection) as ctx:
+        r = api.get(url)
+    assert r.status_code == 200
+    return r, len(ctx.captured_queries)
+
+
+def test_list_returns_summaries_in_constant_queries(api, teacher):
+    _exam(teacher, 2)
+    r, few = _count(api, reverse("exam-list"))
+    assert "questions" not in r.data["results"][0]
+    assert r.data["results"][0]["teacher_name"] == "Ada L"
+
+    for _ in range(5):
+        _exam(teacher, 2)
+    _, many = _count(api, reverse("exam-list"))
+    assert few == many
+
+
+def test_retrieve_full_tree_in_constant_queries(api, teacher):
+    small, large = _exam(teacher, 1), _exam(teacher, 10)
+    r, few = _count(api, reverse("exam-detail", args=[small.id]))
+    assert len(r.json()["questions"][0]["options"]) == 3
+    assert "is_correct" not in r.json()["questions"][0]["options"][0]
+
+    r, many = _count(api, reverse("exam-detail", args=[large.id]))
+    assert len(r.json()["questions"]) == 10
+    assert few == many
+
+
+def test_serializer_prefetches_plain_instances(teacher):
+    exams = [_exam(teacher, 4) for _ in range(3)]
+    exams = list(Exam.objects.filter(pk__in=[e.pk for e in exams]))
+    with CaptureQueriesContext(connection) as ctx:
+        data = ExamReadSerializer(exams, many=True).data
+    assert sum(len(e["questions"]) for e in data) == 12
+    assert len(ctx.captured_queries) == 4   # teachers, users, questions, options
@@ -0,0 +1,107 @@
+# core/testing/test_exam_stats.py
+import datetime as dt
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.grading import grade_attempt, grade_attempts
+from core.models import User, Teacher, Student, Exam, Question, Option, StudentExam, ExamStats
+from core.scheduler import finalize_exam
+
+pytestmark = pytest.mark.django_db
+
+
+def _setup(n_students):
+    t_user = User.objects.create_user("teach", password="x", role="teacher")
+    teacher = Teacher.objects.create(
+        user=t_user, phone="1", subject_specialization="Math",
+        employee_id="E1", date_of_joining=dt.date.today(), status="active"
+    )
+    students = []
+    for i in range(n_students):
+        s_user = User.objects.create_user(f"s{i}", password="x", role="student")
+        students.append(Student.objects.create(
+            user=s_user, phone="2", roll_number=f"R{i}", student_class="10-A",
+            date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+            status="active", assigned_teacher=teacher
+        ))
+    exam = Exam.objects.create(title="Quiz", teacher=teacher, target_class="10",
+                               start_time=timezone.now(), duration_min=30)
+    questions = []
+    for i in range(2):
+        q = Question.objects.create(exam=exam, text=f"Q{i}")
+        questions.append((q, Option.objects.create(question=q, text="yes", is_correct=True),
+                          Option.objects.create(question=q, text="no", is_correct=False)))
+    return t_user, exam, students, questions
+
+
+def _grade(exam, student, questions, n_correct):
+    attempt = StudentExam.objects.create(student=student, exam=exam)
+    answers = [{"question_id": q.id, "option_id": (right if i < n_correct else wrong).id}
+               for i, (q, right, wrong) in enumerate(questions)]
+    return grade_attempt(attempt, answers)
+
+
+def test_stats_updated_on_each_submission():
+    _, exam, students, questions = _setup(3)
+    for student, n_correct in zip(students, (2, 1, 0)):
+        _grade(exam, student, questions, n_correct)
+
+    stats = ExamStats.objects.get(exam=exam)
+    assert stats.attempt_count == 3
+    assert stats.average == 50
+    assert (stats.min_score, stats.max_score) == (0, 100)
+    assert stats.histogram[0] == 1 and stats.histogram[5] == 1 and stats.histogram[9] == 1
+    assert stats.question_correct == {str(questions[0][0].id): 2, str(questions[1][0].id): 1}
+
+
+def test_grading_an_attempt_twice_counts_once():
+    _, exam, students, questions = _setup(1)
+    attempt = StudentExam.objects.create(student=students[0], exam=exam)
+    stale = StudentExam.objects.get(pk=attempt.pk)     # e.g. a double-clicked submit
+    answers = [{"question_id": q.id, "option_id": right.id} for q, right, _ in questions]
+    assert grade_attempt(attempt, answers) is not None
+    assert grade_attempts([(stale, answers), (stale, answers)]) == []
+    # the scheduler finds nothing left to close either
+    assert finalize_exam(exam.id, now=exam.end_time) == 0
+    assert ExamStats.objects.get(exam=exam).attempt_count == 1
+
+
+def test_results_reads_stats_without_scanning_attempts():
+    t_user, exam, students, questions = _setup(2)
+    for student in students:
+        _grade(exam, student, questions, 1)
+
+    client = APIClient()
+    client.force_authenticate(t_user)
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.get(reverse("exam-results", args=[exam.id]))
+    assert r.status_code == 200
+    assert r.data["average_score"] == 50
+    assert r.data["stats"]["attempt_count"] == 2
+    assert "attempts" not in r.data
+    assert not any("core_studentexam" in q["sql"] for q in ctx.captured_queries)
+
+    r = client.get(reverse("exam-results", args=[exam.id]), {"include": "attempts"})
+    assert len(r.data["attempts"]) == 2
+
+
+def test_rebuild_command_restores_and_checks_stats():
+    _, exam, students, questions = _setup(2)
+    for student, n_correct in zip(students, (2, 1)):
+        _grade(exam, student, questions, n_correct)
+    expected = ExamStats.objects.get(exam=exam).as_dict()
+
+    ExamStats.objects.filter(exam=exam).update(attempt_count=7, score_sum=1)
+    with pytest.raises(CommandError):
+        call_command("rebuild_exam_stats", exam.id, "--check")
+
+    call_command("rebuild_exam_stats", exam.id)
+    assert ExamStats.objects.get(exam=exam).as_dict() == expected
+    call_command("rebuild_exam_stats", "--check")
@@ -0,0 +1,75 @@
+# core/testing/test_exam_windows.py
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import User, Student, Exam
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def exams(teacher):
+    now = timezone.now()
+    return {
+        "past": Exam.objects.create(title="past", teacher=teacher, target_class="10",
+                                    start_time=now - dt.timedelta(hours=2), duration_min=30),
+        "live": Exam.objects.create(title="live", teacher=teacher, target_class="10",
+                                    start_time=now - dt.timedelta(minutes=10), duration_min=30),
+        "upcoming": Exam.objects.create(title="upcoming", teacher=teacher, target_class="10",
+                                        start_time=now + dt.timedelta(days=1), duration_min=30),
+        "other grade": Exam.objects.create(title="other grade", teacher=teacher, target_class="9",
+                                           start_time=now - dt.timedelta(hours=2), duration_min=30),
+    }
+
+
+def _titles(r):
+    assert r.status_code == 200, r.data
+    data = r.data["results"] if isinstance(r.data, dict) else r.data
+    return sorted(e["title"] for e in data)
+
+
+def test_end_time_is_stored_and_kept_in_sync(exams):
+    exam = exams["live"]
+    assert exam.end_time == exam.start_time + dt.timedelta(minutes=30)
+    exam.duration_min = 90
+    exam.save(update_fields=["duration_min"])
+    exam.refresh_from_db()
+    assert exam.end_time == exam.start_time + dt.timedelta(minutes=90)
+
+
+def test_windows_are_range_queries(exams):
+    with CaptureQueriesContext(connection) as ctx:
+        live = list(Exam.objects.window("live"))
+    assert live == [exams["live"]]
+    assert '"core_exam"."end_time" >' in ctx.captured_queries[0]["sql"]
+    assert sorted(e.title for e in Exam.objects.window("past")) == ["other grade", "past"]
+    assert [e.title for e in Exam.objects.window("upcoming")] == ["upcoming"]
+    with pytest.raises(ValueError):
+        Exam.objects.window("someday")
+
+
+def test_list_when_for_teacher(exams, teacher):
+    client = APIClient()
+    client.force_authenticate(teacher.user)
+    url = reverse("exam-list")
+    assert _titles(client.get(url, {"when": "past"})) == ["other grade", "past"]
+    assert _titles(client.get(url, {"when": "live"})) == ["live"]
+    assert client.get(url, {"when": "soon"}).status_code == 400
+
+
+def test_student_windows_and_unattempted_are_class_scoped(exams, teacher):
+    user = User.objects.create_user("amy", password="x", role="student")
+    Student.objects.create(user=user, phone="2", roll_number="R1", student_class="10A",
+                           date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+                           status="active", assigned_teacher=teacher)
+    client = APIClient()
+    client.force_authenticate(user)
+    assert _titles(client.get(reverse("exam-list"), {"when": "upcoming"})) == ["upcoming"]
+    assert _titles(client.get(reverse("exam-list"), {"when": "past"})) == ["past"]
+    assert _titles(client.get(reverse("exam-unattempted"))) == ["past"]
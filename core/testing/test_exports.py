@@ -0,0 +1,158 @@
+# core/testing/test_exports.py
+import asyncio
+import csv
+import datetime as dt
+import gzip
+import io
+import json
+
+import pytest
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core import exports
+from core.exports import read_columnar
+from core.utils import CSVExportMixin
+from core.models import User, Teacher, Student, Exam, StudentExam
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def results():
+    t_user = User.objects.create_user("teach", password="x", role="teacher")
+    teacher = Teacher.objects.create(
+        user=t_user, phone="1", subject_specialization="Math",
+        employee_id="E1", date_of_joining=dt.date.today(), status="active"
+    )
+    exam = Exam.objects.create(title="Algebra", teacher=teacher, target_class="10",
+                               start_time=timezone.now(), duration_min=30)
+    for i in range(3):
+        s_user = User.objects.create_user(f"s{i}", password="x", role="student")
+        student = Student.objects.create(
+            user=s_user, phone="2", roll_number=f"R{i}", student_class="10-A",
+            date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+            status="active", assigned_teacher=teacher
+        )
+        StudentExam.objects.create(student=student, exam=exam, status="attempted",
+                                   score=None if i == 2 else 40.5 + i)
+    return exam
+
+
+def _body(res):
+    return b"".join(res.streaming_content)
+
+
+def _stream_under_asgi(api, monkeypatch, encoder, fmt):
+    """
+    GET the result export through AsyncClient and iterate it the way the
+    ASGI handler does; returns the body and, per part sent, how many chunks
+    ``encoder`` had produced by then.
+    """
+    produced = []
+    original = getattr(exports, encoder)
+
+    def counting(*args):
+        for chunk in original(*args):
+            produced.append(chunk)
+            yield chunk
+
+    monkeypatch.setattr(exports, encoder, counting)
+    monkeypatch.setattr(CSVExportMixin, "csv_chunk_size", 1)
+    token = api.post(reverse("token_obtain_pair"), {"username": "adm", "password": "x"}).data["access"]
+
+    async def fetch():
+        response = await AsyncClient().get(reverse("result-export-list"), {"format": fmt},
+                                           headers={"Authorization": f"Bearer {token}"})
+        parts, progress = [], []
+        async for part in response:
+            parts.append(part)
+            progress.append(len(produced))
+        return b"".join(parts), progress
+
+    return asyncio.run(fetch())
+
+
+def test_csv_gz_round_trip(api, results):
+    res = api.get(reverse("result-export-list"), {"format": "csv.gz"})
+    assert res.status_code == 200
+    assert res["Content-Type"] == "application/gzip"
+    assert 'filename="results.csv.gz"' in res["Content-Disposition"]
+    rows = list(csv.reader(io.StringIO(gzip.decompress(_body(res)).decode())))
+    assert rows[0][:3] == ["ID", "Exam ID", "Exam"]
+    assert len(rows) == 4
+    assert rows[1][2] == "Algebra"
+    assert rows[3][5] == ""          # NULL score
+
+
+def test_ndjson(api, results):
+    res = api.get(reverse("result-export-list"), {"format": "ndjson"})
+    lines = [json.loads(line) for line in _body(res).decode().splitlines()]
+    assert len(lines) == 3
+    assert lines[0]["student__roll_number"] == "R0"
+    assert lines[0]["score"] == 40.5
+    assert lines[2]["score"] is None
+
+
+def test_columnar_round_trip(api, results):
+    res = api.get(reverse("result-export-list"), {"format": "columnar"})
+    assert res.status_code == 200
+    names, rows = read_columnar(_body(res))
+    assert names[:3] == ["id", "exam_id", "exam__title"]
+    assert [r[3] for r in rows] == ["R0", "R1", "R2"]
+    assert [r[5] for r in rows] == [40.5, 41.5, None]
+    assert all(r[1] == results.pk for r in rows)
+    assert rows[0][8] is None        # finished_at never set
+
+
+def test_unknown_format_rejected(api, results):
+    res = api.get(reverse("result-export-list"), {"format": "xlsx"})
+    assert res.status_code == 400
+
+
+def test_conditional_request_skips_rows(api, results):
+    url = reverse("result-export-list")
+    first = api.get(url)
+    etag = first["ETag"]
+    with CaptureQueriesContext(connection) as ctx:
+        again = api.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert again.status_code == 304
+    assert again["ETag"] == etag
+    assert not [q for q in ctx.captured_queries if "core_studentexam" in q["sql"]]
+
+    # any write to a model the export reads from changes the validator
+    attempt = StudentExam.objects.first()
+    attempt.score = 99
+    attempt.save()
+    changed = api.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed["ETag"] != etag
+
+
+def test_if_modified_since(api, results):
+    url = reverse("result-export-list")
+    first = api.get(url)
+    res = api.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+    assert res.status_code == 304
+
+
+@pytest.mark.django_db(transaction=True)
+def test_csv_streams_chunk_by_chunk_under_asgi(api, results, monkeypatch):
+    body, progress = _stream_under_asgi(api, monkeypatch, "csv_stream", "csv")
+    assert progress == [1, 2, 3, 4]          # header + one row per chunk, each sent as it is made
+    assert len(list(csv.reader(io.StringIO(body.decode())))) == 4
+
+
+@pytest.mark.django_db(transaction=True)
+def test_gzip_and_columnar_stream_under_asgi(api, results, monkeypatch):
+    body, progress = _stream_under_asgi(api, monkeypatch, "csv_stream", "csv.gz")
+    assert progress == [1, 2, 3, 4, 4]       # each CSV chunk compressed and sent, then the trailer
+    assert len(gzip.decompress(body).decode().splitlines()) == 4
+
+    monkeypatch.undo()
+    body, progress = _stream_under_asgi(api, monkeypatch, "columnar_stream", "columnar")
+    assert progress == [1, 2, 3, 4, 5]       # header, one batch per row, end marker
+    assert len(read_columnar(body)[1]) == 3
@@ -0,0 +1,150 @@
+# core/testing/test_grading.py
+import datetime as dt
+import pickle
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.grading import AnswerKey, get_answer_key
+from core.models import User, Teacher, Student, Exam, Question, Option, Answer, StudentExam
+
+pytestmark = pytest.mark.django_db
+
+
+def _bootstrap():
+    t_user = User.objects.create_user("teach", password="x", role="teacher")
+    s_user = User.objects.create_user("stud", password="x", role="student")
+    teacher = Teacher.objects.create(
+        user=t_user, phone="1", subject_specialization="Math",
+        employee_id="E1", date_of_joining=dt.date.today(), status="active"
+    )
+    student = Student.objects.create(
+        user=s_user, phone="2", roll_number="R1", student_class="10-A",
+        date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+        status="active", assigned_teacher=teacher
+    )
+    return teacher, student
+
+
+def _exam(teacher, n_questions):
+    exam = Exam.objects.create(title="Quiz", teacher=teacher, target_class="10",
+                               start_time=timezone.now(), duration_min=30)
+    for i in range(n_questions):
+        q = Question.objects.create(exam=exam, text=f"Q{i}")
+        Option.objects.create(question=q, text="right", is_correct=True)
+        Option.objects.create(question=q, text="wrong", is_correct=False)
+    return exam
+
+
+def _answers(exam, correct_count):
+    answers = []
+    for i, q in enumerate(exam.questions.order_by("id")):
+        opt = q.options.get(is_correct=i < correct_count)
+        answers.append({"question_id": q.id, "option_id": opt.id})
+    return answers
+
+
+def _client(username):
+    client = APIClient()
+    r = client.post(reverse("token_obtain_pair"), {"username": username, "password": "x"}, format="json")
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {r.data['access']}")
+    return client
+
+
+def test_answer_key_check_ignores_foreign_options():
+    teacher, _ = _bootstrap()
+    exam, other = _exam(teacher, 2), _exam(teacher, 1)
+    key = AnswerKey.load(exam.id)
+
+    answers = _answers(exam, 1)
+    stray = other.questions.get().options.get(is_correct=True)
+    answers.append({"question_id": answers[0]["question_id"] + 100, "option_id": stray.id})
+
+    chosen, correct, total = key.check(answers)
+    assert len(chosen) == 2
+    assert correct == 1
+    assert total == 3
+
+
+def test_submit_grades_and_saves_answers():
+    teacher, student = _bootstrap()
+    exam = _exam(teacher, 4)
+
+    r = _client("stud").post(reverse("exam-submit", args=[exam.id]),
+                             {"answers": _answers(exam, 3)}, format="json")
+    assert r.status_code == 200
+    assert r.data["score"] == 75
+
+    attempt = StudentExam.objects.get(student=student, exam=exam)
+    assert attempt.status == "attempted"
+    assert attempt.finished_at is not None
+    assert Answer.objects.filter(attempt=attempt).count() == 4
+
+
+def test_submit_query_count_is_constant():
+    teacher, student = _bootstrap()
+    small, large = _exam(teacher, 1), _exam(teacher, 25)
+    client = _client("stud")
+
+    counts = []
+    for exam in (small, large):
+        payload = {"answers": _answers(exam, 1)}
+        with CaptureQueriesContext(connection) as ctx:
+            r = client.post(reverse("exam-submit", args=[exam.id]), payload, format="json")
+        assert r.status_code == 200
+        counts.append(len(ctx.captured_queries))
+
+    assert counts[0] == counts[1]
+
+
+def test_answer_key_is_cached_between_submissions():
+    teacher, _ = _bootstrap()
+    exam = _exam(teacher, 3)
+
+    first = get_answer_key(exam.id)
+    with CaptureQueriesContext(connection) as ctx:
+        again = get_answer_key(exam.id)
+    assert again is first
+    assert len(ctx.captured_queries) == 0
+    assert pickle.loads(pickle.dumps(first)).correct == first.correct
+
+
+def test_answer_key_invalidated_when_option_edited():
+    teacher, _ = _bootstrap()
+    exam = _exam(teacher, 1)
+    question = exam.questions.get()
+    before = get_answer_key(exam.id)
+
+    wrong = question.options.get(is_correct=False)
+    question.options.update(is_correct=False)
+    wrong.is_correct = True
+    wrong.save()
+
+    after = get_answer_key(exam.id)
+    assert after is not before
+    assert after.correct[question.id] == wrong.id
+
+
+def test_deleting_an_exam_does_not_look_up_each_option():
+    teacher, _ = _bootstrap()
+    exam = _exam(teacher, 5)
+    with CaptureQueriesContext(connection) as ctx:
+        exam.delete()
+    lookups = [q for q in ctx.captured_queries
+               if q["sql"].startswith("SELECT") and 'FROM "core_question" WHERE "core_question"."id" =' in q["sql"]]
+    assert lookups == []
+
+
+def test_submit_after_the_exam_ended_is_rejected():
+    teacher, student = _bootstrap()
+    exam = _exam(teacher, 1)
+    Exam.objects.filter(pk=exam.pk).update(start_time=timezone.now() - dt.timedelta(hours=1),
+                                           end_time=timezone.now() - dt.timedelta(minutes=30))
+    r = _client("stud").post(reverse("exam-submit", args=[exam.id]),
+                             {"answers": _answers(exam, 1)}, format="json")
+    assert r.status_code == 400
+    assert not StudentExam.objects.exists()      # no attempt created for a latecomer
@@ -0,0 +1,101 @@
+# core/testing/test_import_jobs.py
+import io
+import os
+from datetime import timedelta
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.import_jobs import create_job, resume_jobs, run_job
+from core.models import User, Student, ImportJob
+
+pytestmark = pytest.mark.django_db
+
+HEADER = "username,email,first_name,last_name,password,phone,roll_number,student_class," \
+         "date_of_birth,admission_date,status,assigned_teacher_id\n"
+
+
+@pytest.fixture(autouse=True)
+def import_settings(tmp_path):
+    with override_settings(
+        IMPORT_SPOOL_DIR=tmp_path,
+        STUDENT_IMPORT={"BATCH_SIZE": 2, "HASH_WORKERS": 1, "JOB_HASH_WORKERS": 1, "JOB_WORKERS": 0},
+        PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    ):
+        yield
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create_user("adm", password="x", role="admin")
+
+
+def _csv(n, bad_rows=()):
+    lines = [HEADER]
+    for i in range(n):
+        dob = "oops" if i in bad_rows else "2010-01-01"
+        lines.append(f"stu{i},s{i}@x.com,S,{i},,1,R{i},10-A,{dob},2024-01-01,active,\n")
+    return "".join(lines).encode()
+
+
+def test_job_endpoint_imports_and_reports_progress(admin):
+    client = APIClient()
+    client.force_authenticate(admin)
+    upload = io.BytesIO(_csv(5, bad_rows={3}))
+    upload.name = "students.csv"
+
+    r = client.post(reverse("student-import-csv") + "?mode=job", {"file": upload}, format="multipart")
+    assert r.status_code == 202
+    job_id = r.data["job_id"]
+
+    r = client.get(reverse("student-import-status", args=[job_id]))
+    assert r.status_code == 200
+    assert r.data["status"] == "done"
+    assert (r.data["rows_processed"], r.data["rows_created"], r.data["rows_failed"]) == (5, 4, 1)
+    assert r.data["errors"][0].startswith("Row 5:")
+    assert Student.objects.count() == 4
+    assert not os.path.exists(ImportJob.objects.get(pk=job_id).file_path)   # spool file removed
+
+
+def test_job_resumes_after_last_committed_chunk(admin):
+    job = create_job(SimpleUploadedFile("s.csv", _csv(5)), admin)
+    # simulate a crash after the first chunk (rows R0, R1) was committed
+    for i in range(2):
+        u = User.objects.create_user(f"stu{i}", password="x", role="student")
+        Student.objects.create(user=u, phone="1", roll_number=f"R{i}", student_class="10-A",
+                               date_of_birth="2010-01-01", admission_date="2024-01-01", status="active")
+    ImportJob.objects.filter(pk=job.pk).update(status="running", rows_processed=2, rows_created=2,
+                                               updated_at=timezone.now() - timedelta(minutes=10))
+
+    [job] = resume_jobs()
+    assert job.status == "done"
+    assert (job.rows_processed, job.rows_created, job.rows_failed) == (5, 5, 0)
+    assert Student.objects.count() == 5
+
+
+def test_live_job_is_not_resumed(admin):
+    job = create_job(SimpleUploadedFile("s.csv", _csv(3)), admin)
+    ImportJob.objects.filter(pk=job.pk).update(status="running")   # another process is on it
+
+    assert resume_jobs() == []
+    assert run_job(job.pk).status == "running"
+    assert not Student.objects.exists()
+
+
+def test_malformed_job_id_is_404(admin):
+    client = APIClient()
+    client.force_authenticate(admin)
+    assert client.get("/api/students/import/abc/").status_code == 404
+
+
+def test_import_status_requires_admin(admin):
+    job = create_job(SimpleUploadedFile("s.csv", _csv(1)), admin)
+    teacher = User.objects.create_user("teach", password="x", role="teacher")
+    client = APIClient()
+    client.force_authenticate(teacher)
+    r = client.get(reverse("student-import-status", args=[job.pk]))
+    assert r.status_code == 403
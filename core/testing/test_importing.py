@@ -0,0 +1,117 @@
+# core/testing/test_importing.py
+import io
+
+import pytest
+from django.conf import global_settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import importing
+from core.importing import StudentImporter, job_hash_pool
+from core.models import User, Student, Section
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("fast_hasher"),
+]
+
+HEADER = "username,email,first_name,last_name,password,phone,roll_number,student_class," \
+         "date_of_birth,admission_date,status,assigned_teacher_id\n"
+
+
+@pytest.fixture
+def fast_hasher():
+    with override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]):
+        yield
+
+
+def _rows(n, teacher_id, start=0):
+    return [
+        (i + 2, {"username": f"stu{i}", "email": f"s{i}@x.com", "first_name": "S", "last_name": str(i),
+                 "password": "", "phone": "1", "roll_number": f"R{i}", "student_class": "10-A",
+                 "date_of_birth": "2010-01-01", "admission_date": "2024-01-01", "status": "active",
+                 "assigned_teacher_id": str(teacher_id)})
+        for i in range(start, start + n)
+    ]
+
+
+def test_bulk_import_query_count_does_not_grow_with_rows(teacher):
+    Section.for_name("10-A")   # the class exists already; creating it is a one-off cost
+    counts = []
+    for start, n in ((0, 5), (100, 50)):
+        with CaptureQueriesContext(connection) as ctx:
+            stats = StudentImporter(batch_size=100, hash_workers=1).run(_rows(n, teacher.pk, start))
+        assert stats["created"] == n
+        counts.append(len(ctx.captured_queries))
+    assert counts[0] == counts[1]
+
+    stu = Student.objects.select_related("user").get(roll_number="R3")
+    assert stu.assigned_teacher == teacher
+    assert stu.user.role == "student"
+    assert stu.user.check_password("stu3123")
+
+
+def test_bulk_import_reports_row_errors(teacher):
+    User.objects.create_user("stu0", password="x", role="student")
+    rows = _rows(3, teacher.pk)
+    rows[1][1]["date_of_birth"] = "not a date"
+    rows[2][1]["assigned_teacher_id"] = "999"
+
+    importer = StudentImporter(hash_workers=1)
+    stats = importer.run(rows)
+    assert (stats["rows"], stats["created"], stats["failed"]) == (3, 1, 2)
+    assert importer.errors[0].startswith("Row 2:") and "username" in importer.errors[0]
+    assert importer.errors[1].startswith("Row 3:") and "date_of_birth" in importer.errors[1]
+    assert Student.objects.get(roll_number="R2").assigned_teacher is None
+
+
+def _pool_password_ok(username, raw):
+    # pool workers start from the settings module, so they ignore fast_hasher's override
+    with override_settings(PASSWORD_HASHERS=global_settings.PASSWORD_HASHERS):
+        return User.objects.get(username=username).check_password(raw)
+
+
+def test_bulk_import_hashes_in_process_pool(teacher):
+    importer = StudentImporter(hash_workers=2)
+    importer.run(_rows(4, teacher.pk))
+    assert _pool_password_ok("stu1", "stu1123")
+
+
+@override_settings(STUDENT_IMPORT={})
+def test_requests_hash_inline_and_jobs_share_one_pool(teacher, monkeypatch):
+    assert StudentImporter().hash_workers == 1      # no process pool inside a web request
+
+    monkeypatch.setattr(importing, "_job_pool", None)
+    with override_settings(STUDENT_IMPORT={"JOB_HASH_WORKERS": 2}):
+        pool = job_hash_pool()
+        try:
+            assert pool is not None and job_hash_pool() is pool
+            StudentImporter(executor=pool).run(_rows(2, teacher.pk))
+            StudentImporter(executor=pool).run(_rows(2, teacher.pk, start=2))
+            assert _pool_password_ok("stu3", "stu3123")
+        finally:
+            pool.shutdown()
+    with override_settings(STUDENT_IMPORT={"JOB_HASH_WORKERS": 1}):
+        monkeypatch.setattr(importing, "_job_pool", None)
+        assert job_hash_pool() is None
+
+
+def test_import_endpoint_bulk_mode(teacher):
+    admin = User.objects.create_user("adm", password="x", role="admin")
+    client = APIClient()
+    client.force_authenticate(admin)
+    body = HEADER + "".join(
+        ",".join(row.values()) + "\n" for _, row in _rows(3, teacher.pk)
+    )
+    upload = io.BytesIO(body.encode())
+    upload.name = "students.csv"
+
+    r = client.post(reverse("student-import-csv") + "?mode=bulk", {"file": upload}, format="multipart")
+    assert r.status_code == 201
+    assert len(r.data["created"]) == 3
+    assert r.data["created"][0]["assigned_teacher"]["id"] == teacher.pk
+    assert r.data["stats"]["rows"] == 3
+    assert r.data["errors"] == []
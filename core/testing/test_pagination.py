@@ -0,0 +1,111 @@
+# core/testing/test_pagination.py
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import User, Student, Exam, Chat, Message
+from core.pagination import KeysetPagination
+
+pytestmark = pytest.mark.django_db
+
+
+def _students(teacher, n):
+    for i in range(n):
+        user = User.objects.create_user(f"s{i}", password="x", role="student")
+        Student.objects.create(
+            user=user, phone="2", roll_number=f"R{i}", student_class="10-A",
+            date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+            status="active", assigned_teacher=teacher
+        )
+
+
+def _walk(client, url, **params):
+    pages, counts = [], []
+    while url:
+        with CaptureQueriesContext(connection) as ctx:
+            r = client.get(url, params)
+        assert r.status_code == 200
+        pages.append(r.data["results"])
+        counts.append(ctx.captured_queries)
+        url, params = r.data["next"], {}
+    return pages, counts
+
+
+def test_student_pages_cover_every_row_without_count(api, teacher):
+    _students(teacher, 25)
+    pages, queries = _walk(api, reverse("student-list"), page_size=10)
+    assert [len(p) for p in pages] == [10, 10, 5]
+    ids = [row["id"] for page in pages for row in page]
+    assert ids == sorted(ids) and len(set(ids)) == 25
+    assert pages[0][0]["assigned_teacher"]["name"] == "Ada L"
+    # same number of queries on every page, no COUNT(*) and no per-row lookups
+    assert len({len(q) for q in queries}) == 1
+    assert not any("COUNT(" in q["sql"] for page in queries for q in page)
+
+
+def test_page_size_is_capped(api, teacher, monkeypatch):
+    monkeypatch.setattr(KeysetPagination, "max_page_size", 2)
+    _students(teacher, 3)
+    r = api.get(reverse("student-list"), {"page_size": 10_000})
+    assert len(r.data["results"]) == 2
+    assert r.data["next"]
+
+
+def test_exams_newest_first(api, teacher):
+    for i in range(3):
+        Exam.objects.create(title=f"Exam {i}", teacher=teacher, target_class="10",
+                            start_time=timezone.now(), duration_min=30)
+    pages, _ = _walk(api, reverse("exam-list"), page_size=2)
+    titles = [row["title"] for page in pages for row in page]
+    assert titles == ["Exam 2", "Exam 1", "Exam 0"]
+
+
+def _chat(teacher, n):
+    _students(teacher, 1)
+    student_user = User.objects.get(username="s0")
+    chat = Chat.objects.create(created_by=student_user)
+    chat.participants.add(student_user, teacher.user)
+    stamp = timezone.now()
+    for i in range(n):
+        # pairs share a timestamp, so ties are broken by id
+        Message.objects.create(chat=chat, sender=student_user, content=f"m{i}",
+                               timestamp=stamp + dt.timedelta(seconds=i // 2))
+    client = APIClient()
+    client.force_authenticate(teacher.user)
+    return client, chat
+
+
+def test_chat_messages_are_paged_newest_first(teacher):
+    client, chat = _chat(teacher, 5)
+    pages, queries = _walk(client, reverse("chat-messages", args=[chat.id]), limit=2)
+    assert [[m["content"] for m in page] for page in pages] == [["m4", "m3"], ["m2", "m1"], ["m0"]]
+    assert len({len(q) for q in queries[1:]}) == 1
+
+
+def test_chat_history_window_after_and_before(teacher):
+    client, chat = _chat(teacher, 6)
+    url = reverse("chat-messages", args=[chat.id])
+    ids = list(Message.objects.order_by("id").values_list("id", flat=True))
+
+    r = client.get(url)
+    assert [m["content"] for m in r.data["results"]] == ["m5", "m4", "m3", "m2", "m1", "m0"]
+    assert r.data["next"] is None and r.data["previous"] is None
+
+    r = client.get(url, {"after": ids[1], "limit": 2})
+    assert [m["content"] for m in r.data["results"]] == ["m3", "m2"]
+    assert r.data["previous"] and r.data["next"]
+    newer = client.get(r.data["previous"])
+    assert [m["content"] for m in newer.data["results"]] == ["m5", "m4"]
+    assert newer.data["previous"] is None
+
+    r = client.get(url, {"before": ids[3]})
+    assert [m["content"] for m in r.data["results"]] == ["m2", "m1", "m0"]
+
+    assert client.get(url, {"before": ids[3], "after": ids[1]}).status_code == 400
+    assert client.get(url, {"before": 10_000}).status_code == 400
+    assert client.get(url, {"limit": 0}).status_code == 400
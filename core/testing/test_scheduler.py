@@ -0,0 +1,99 @@
+# core/testing/test_scheduler.py
+import datetime as dt
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import User, Student, Exam, Question, Option, Answer, StudentExam, ExamStats
+from core.scheduler import ExamScheduler, finalize_exam
+
+pytestmark = pytest.mark.django_db
+
+
+def _students(teacher, n):
+    students = []
+    for i in range(n):
+        user = User.objects.create_user(f"s{i}", password="x", role="student")
+        students.append(Student.objects.create(
+            user=user, phone="2", roll_number=f"R{i}", student_class="10A",
+            date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+            status="active", assigned_teacher=teacher
+        ))
+    return students
+
+
+def _exam(teacher, ends_in_min, n_questions=2):
+    start = timezone.now() + dt.timedelta(minutes=ends_in_min - 30)
+    exam = Exam.objects.create(title="Quiz", teacher=teacher, target_class="10",
+                               start_time=start, duration_min=30)
+    for i in range(n_questions):
+        q = Question.objects.create(exam=exam, text=f"Q{i}")
+        Option.objects.create(question=q, text="right", is_correct=True)
+        Option.objects.create(question=q, text="wrong", is_correct=False)
+    return exam
+
+
+def test_finalize_grades_partial_answers_and_closes_the_rest(teacher):
+    exam = _exam(teacher, ends_in_min=-1)
+    partial, silent, done = [StudentExam.objects.create(student=s, exam=exam) for s in _students(teacher, 3)]
+    q = exam.questions.order_by("id").first()
+    Answer.objects.create(attempt=partial, question=q, chosen=q.options.get(is_correct=True))
+    StudentExam.objects.filter(pk=done.pk).update(finished_at=timezone.now(), score=100, status="attempted")
+
+    assert finalize_exam(exam.id) == 2
+    partial.refresh_from_db(), silent.refresh_from_db(), done.refresh_from_db()
+    assert (partial.status, float(partial.score), partial.finished_at) == ("attempted", 50.0, exam.end_time)
+    assert (silent.status, float(silent.score), silent.finished_at) == ("unattempted", 0.0, exam.end_time)
+    assert float(done.score) == 100
+    assert ExamStats.objects.get(exam=exam).attempt_count == 2
+    assert finalize_exam(exam.id) == 0          # idempotent
+
+
+def test_running_exam_is_left_open(teacher):
+    exam = _exam(teacher, ends_in_min=5)
+    attempt = StudentExam.objects.create(student=_students(teacher, 1)[0], exam=exam)
+    assert finalize_exam(exam.id) == 0
+    attempt.refresh_from_db()
+    assert attempt.finished_at is None
+
+
+def test_scheduler_wakes_at_each_deadline(teacher):
+    soon, later = _exam(teacher, ends_in_min=1), _exam(teacher, ends_in_min=1.5)
+    _exam(teacher, ends_in_min=600)                         # beyond the reload horizon
+    for student in _students(teacher, 2):
+        StudentExam.objects.create(student=student, exam=soon)
+        StudentExam.objects.create(student=student, exam=later)
+
+    scheduler = ExamScheduler(reload_interval=60)
+    now = timezone.now()
+    delay = scheduler.tick(now)
+    assert sorted(exam_id for _, exam_id in scheduler.heap) == [soon.id, later.id]
+    assert delay == pytest.approx((soon.end_time - now).total_seconds())
+
+    # the clock reaches the first deadline: only that exam is finalized
+    at_first = soon.end_time
+    scheduler.tick(at_first)
+    assert not StudentExam.objects.filter(exam=soon, finished_at__isnull=True).exists()
+    assert StudentExam.objects.filter(exam=later, finished_at__isnull=True).count() == 2
+    assert [exam_id for _, exam_id in scheduler.heap] == [later.id]
+
+
+def test_reload_catches_up_on_missed_deadlines(teacher):
+    overdue = _exam(teacher, ends_in_min=-60)
+    StudentExam.objects.create(student=_students(teacher, 1)[0], exam=overdue)
+    call_command("run_exam_scheduler", "--once")
+    assert not StudentExam.objects.filter(finished_at__isnull=True).exists()
+
+
+def test_reload_skips_finished_exams(teacher):
+    student = _students(teacher, 1)[0]
+    empty = _exam(teacher, ends_in_min=-3 * 24 * 60)
+    closed = _exam(teacher, ends_in_min=-60)
+    StudentExam.objects.create(student=student, exam=closed, finished_at=timezone.now(), score=0)
+    pending = _exam(teacher, ends_in_min=-60)
+    StudentExam.objects.create(student=student, exam=pending)
+
+    scheduler = ExamScheduler(reload_interval=60)
+    scheduler.reload(timezone.now())
+    assert [exam_id for _, exam_id in scheduler.heap] == [pending.id]
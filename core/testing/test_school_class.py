@@ -0,0 +1,149 @@
+# core/testing/test_school_class.py
+import datetime as dt
+import importlib
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.views import ExamViewSet
+from core.models import (User, Student, Exam, StudentExam, SchoolClass, Section,
+                         parse_class_name)
+
+pytestmark = pytest.mark.django_db
+
+
+def _student(username, cls, teacher=None):
+    user = User.objects.create_user(username, password="x", role="student", first_name=username)
+    return Student.objects.create(user=user, phone="2", roll_number=username, student_class=cls,
+                                  date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+                                  status="active", assigned_teacher=teacher)
+
+
+def _exam(teacher, cls, title="Quiz"):
+    return Exam.objects.create(title=title, teacher=teacher, target_class=cls,
+                               start_time=timezone.now(), duration_min=30)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("10A", (10, "A")), ("10-a", (10, "A")), ("Grade 9 B", (9, "B")), ("10", (10, "")), ("KG", (None, "KG")),
+])
+def test_parse_class_name(value, expected):
+    assert parse_class_name(value) == expected
+
+
+def test_save_links_class_and_section(teacher):
+    stu = _student("amy", "10-A", teacher)
+    exam = _exam(teacher, "10")
+    assert stu.school_class == exam.school_class
+    assert stu.section.name == "A" and stu.section.school_class.grade == 10
+    stu.student_class = "11B"
+    stu.save(update_fields=["student_class"])
+    stu.refresh_from_db()
+    assert (stu.school_class.grade, stu.section.name) == (11, "B")
+    assert SchoolClass.objects.count() == 2
+
+
+def test_student_reaches_only_exams_of_their_grade(teacher):
+    stu = _student("amy", "10A", teacher)
+    mine = _exam(teacher, "10", "Mine")
+    other = _exam(teacher, "9", "Other")
+    client = APIClient()
+    client.force_authenticate(stu.user)
+    assert [e["title"] for e in client.get(reverse("exam-list")).data["results"]] == ["Mine"]
+    assert client.get(reverse("exam-detail", args=[other.id])).status_code == 404
+    assert client.get(reverse("exam-detail", args=[mine.id])).status_code == 200
+
+    # one indexed join through SchoolClass, no digit-stripping of student_class
+    view = ExamViewSet()
+    view.request = SimpleNamespace(user=stu.user)
+    with CaptureQueriesContext(connection) as ctx:
+        assert list(view.get_role_queryset()) == [mine]
+    assert len(ctx.captured_queries) == 1 and "core_student" in ctx.captured_queries[0]["sql"]
+
+
+def test_section_summary(teacher):
+    exam = _exam(teacher, "10")
+    for name, cls, score in [("a", "10A", 40), ("b", "10A", 60), ("c", "10B", 90)]:
+        StudentExam.objects.create(student=_student(name, cls, teacher), exam=exam, score=score,
+                                   status="attempted")
+    admin = User.objects.create_user("adm", password="x", role="admin")
+    client = APIClient()
+    client.force_authenticate(admin)
+    r = client.get(reverse("class-results", args=[10]), {"summary": "sections"})
+    assert [(row["section"], row["attempts"], row["average_score"]) for row in r.data] == [
+        ("A", 2, 50.0), ("B", 1, 90.0)]
+
+
+def test_data_migration_links_existing_rows(teacher):
+    stu = _student("amy", "10A", teacher)
+    exam = _exam(teacher, "10")
+    Student.objects.update(school_class=None, section=None)
+    Exam.objects.update(school_class=None)
+    Section.objects.all().delete()
+    SchoolClass.objects.all().delete()
+
+    migration = importlib.import_module("core.migrations.0014_school_class")
+    migration.link_classes(apps, None)
+
+    stu.refresh_from_db()
+    exam.refresh_from_db()
+    assert stu.section.name == "A" and stu.school_class_id == exam.school_class_id
+
+
+def test_section_exam_is_visible_to_that_section_only(teacher):
+    amy, bob = _student("amy", "10A", teacher), _student("bob", "10B", teacher)
+    _exam(teacher, "10", "Grade")
+    section_exam = _exam(teacher, "10A", "Section A")
+    assert section_exam.section == amy.section and section_exam.school_class == amy.school_class
+
+    for stu, titles in [(amy, ["Section A", "Grade"]), (bob, ["Grade"])]:
+        client = APIClient()
+        client.force_authenticate(stu.user)
+        assert [e["title"] for e in client.get(reverse("exam-list")).data["results"]] == titles
+        view = ExamViewSet()
+        view.request = SimpleNamespace(user=stu.user)
+        assert sorted(e.title for e in view.get_role_queryset()) == sorted(titles)
+    client.force_authenticate(bob.user)
+    assert client.get(reverse("exam-detail", args=[section_exam.id])).status_code == 404
+
+
+def test_deferred_loads_do_not_reparse_the_class(teacher):
+    _student("amy", "10A", teacher)
+    _exam(teacher, "10")
+    with CaptureQueriesContext(connection) as ctx:
+        stu = Student.objects.only("id", "phone").get()
+        stu.phone = "9"
+        stu.save(update_fields=["phone"])
+        exam = Exam.objects.only("id", "title", "start_time", "duration_min").get()
+        exam.title = "Renamed"
+        exam.save(update_fields=["title"])
+    sql = "\n".join(q["sql"] for q in ctx.captured_queries)
+    # neither the free-text class nor the section is loaded just to save another field
+    assert "student_class" not in sql and "target_class" not in sql and "core_section" not in sql
+
+    stu.student_class = "11C"
+    stu.save(update_fields=["student_class"])
+    stu.refresh_from_db()
+    assert (stu.school_class.grade, stu.section.name) == (11, "C")
+
+
+def test_patch_cannot_desync_section_from_student_class(teacher):
+    amy = _student("amy", "10A", teacher)
+    other = Section.for_name("10B")
+    admin = User.objects.create_user("adm", password="x", role="admin")
+    client = APIClient()
+    client.force_authenticate(admin)
+    r = client.patch(reverse("student-detail", args=[amy.pk]),
+                     {"section": other.pk, "school_class": other.school_class_id + 100}, format="json")
+    assert r.status_code == 200
+    amy.refresh_from_db()
+    assert (amy.student_class, amy.section.name) == ("10A", "A")
+
+    r = client.patch(reverse("student-detail", args=[amy.pk]), {"student_class": "10B"}, format="json")
+    assert r.status_code == 200 and r.data["section"] == other.pk
@@ -0,0 +1,121 @@
+# core/testing/test_search.py
+import datetime as dt
+import time
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.caching import bump_version
+from core.models import User, Teacher, Student
+from core.search import student_index
+
+pytestmark = pytest.mark.django_db
+
+
+def _teacher(n):
+    user = User.objects.create_user(f"t{n}", password="x", role="teacher")
+    return Teacher.objects.create(user=user, phone="1", subject_specialization="Math",
+                                  employee_id=f"E{n}", date_of_joining=dt.date.today(), status="active")
+
+
+def _student(username, roll, cls="10A", teacher=None, status="active", admitted=dt.date(2024, 6, 1),
+             first="", last=""):
+    user = User.objects.create_user(username, password="x", role="student",
+                                    first_name=first, last_name=last)
+    return Student.objects.create(user=user, phone="2", roll_number=roll, student_class=cls,
+                                  date_of_birth=dt.date(2010, 1, 1), admission_date=admitted,
+                                  status=status, assigned_teacher=teacher)
+
+
+def _ids(r):
+    assert r.status_code == 200, r.data
+    return [row["id"] for row in r.data["results"]]
+
+
+def test_filters(api):
+    t1, t2 = _teacher(1), _teacher(2)
+    a = _student("a", "R1", "10A", t1)
+    b = _student("b", "R2", "10A", t2, status="inactive")
+    c = _student("c", "R3", "9B", t1, admitted=dt.date(2023, 1, 1))
+    url = reverse("student-list")
+    assert _ids(api.get(url, {"student_class": "10A"})) == [a.id, b.id]
+    assert _ids(api.get(url, {"student_class": "10A", "status": "active"})) == [a.id]
+    assert _ids(api.get(url, {"assigned_teacher": t1.id})) == [a.id, c.id]
+    assert _ids(api.get(url, {"admitted_from": "2024-01-01"})) == [a.id, b.id]
+    assert _ids(api.get(url, {"admitted_to": "2023-12-31"})) == [c.id]
+    assert api.get(url, {"admitted_from": "2024-13-01"}).status_code == 400
+    assert api.get(url, {"assigned_teacher": "x"}).status_code == 400
+
+
+def test_search_prefix_and_substring(api):
+    ada = _student("ada.l", "R-100", first="Ada", last="Lovelace")
+    grace = _student("ghopper", "R-200", first="Grace", last="Hopper")
+    url = reverse("student-list")
+    assert _ids(api.get(url, {"search": "ad"})) == [ada.id]            # prefix
+    assert _ids(api.get(url, {"search": "OPPER"})) == [grace.id]       # substring, any case
+    assert _ids(api.get(url, {"search": "grace hop"})) == [grace.id]   # full name
+    assert _ids(api.get(url, {"search": "r-"})) == [ada.id, grace.id]  # roll numbers
+    assert _ids(api.get(url, {"search": "zzz"})) == []
+
+
+def test_index_follows_writes(api, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        stu = _student("sam", "R1", first="Sam", last="Jones")
+    index = student_index()
+    version = index.version
+    assert index.search("jones") == [stu.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        stu.user.last_name = "Smith"
+        stu.user.save()
+    # applied in place, not by a rebuild
+    assert student_index() is index and index.version != version
+    assert index.search("jones") == [] and index.search("smith") == [stu.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        stu.delete()
+    assert index.search("smith") == []
+
+
+def test_other_process_write_triggers_rebuild():
+    stu = _student("kim", "R9", first="Kim")
+    assert student_index().search("kim") == [stu.id]
+    Student.objects.filter(pk=stu.pk).update(roll_number="Z-77")   # no signals
+    bump_version("search", "students")                               # what another process does
+    assert student_index().search("z-7") == [stu.id]
+
+
+def test_search_is_applied_within_the_callers_scope():
+    mine, other = _teacher(1), _teacher(2)
+    for i in range(10):
+        _student(f"zed{i}", f"O{i}", teacher=other)
+    own = _student("zed_mine", "M1", teacher=mine)
+    client = APIClient()
+    client.force_authenticate(mine.user)
+    assert _ids(client.get(reverse("student-list"), {"search": "zed"})) == [own.id]
+
+
+def test_search_pages_past_many_matches(api):
+    students = [_student(f"kim{i:03d}", f"K{i}") for i in range(30)]
+    url, params, seen = reverse("student-list"), {"search": "kim", "page_size": 10}, []
+    while url:
+        r = api.get(url, params)
+        seen += _ids(r)
+        url, params = r.data["next"], {}
+    assert seen == [s.id for s in students]
+
+
+def test_typeahead(api):
+    for i in range(30):
+        _student(f"user{i:02d}", f"R{i}", first="Pat")
+    r = api.get(reverse("student-typeahead"), {"q": "user1", "limit": 5})
+    assert r.status_code == 200
+    assert [row["username"] for row in r.data] == [f"user1{i}" for i in range(5)]
+    assert r.data[0]["name"] == "Pat"
+    for bad in ("0", "-1", "x"):
+        assert api.get(reverse("student-typeahead"), {"q": "user", "limit": bad}).status_code == 400
+    # warm lookups are served from memory
+    start = time.perf_counter()
+    student_index().search("pat")
+    assert time.perf_counter() - start < 0.05
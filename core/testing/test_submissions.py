@@ -0,0 +1,97 @@
+# core/testing/test_submissions.py
+import datetime as dt
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import User, Teacher, Student, Exam, Question, Option, QueuedSubmission, StudentExam
+from core.submissions import process_batch
+
+pytestmark = pytest.mark.django_db
+
+QUEUE_ON = {"ENABLED": True, "WORKERS": 0, "MAX_DEPTH": 2, "BATCH_SIZE": 10}
+
+
+def _bootstrap(n_students=1):
+    t_user = User.objects.create_user("teach", password="x", role="teacher")
+    teacher = Teacher.objects.create(
+        user=t_user, phone="1", subject_specialization="Math",
+        employee_id="E1", date_of_joining=dt.date.today(), status="active"
+    )
+    for i in range(n_students):
+        s_user = User.objects.create_user(f"stud{i}", password="x", role="student")
+        Student.objects.create(
+            user=s_user, phone="2", roll_number=f"R{i}", student_class="10-A",
+            date_of_birth=dt.date(2010, 1, 1), admission_date=dt.date.today(),
+            status="active", assigned_teacher=teacher
+        )
+    exam = Exam.objects.create(title="Quiz", teacher=teacher, target_class="10",
+                               start_time=timezone.now(), duration_min=30)
+    q = Question.objects.create(exam=exam, text="2+2?")
+    right = Option.objects.create(question=q, text="4", is_correct=True)
+    Option.objects.create(question=q, text="5", is_correct=False)
+    return exam, {"answers": [{"question_id": q.id, "option_id": right.id}]}
+
+
+def _client(username):
+    client = APIClient()
+    r = client.post(reverse("token_obtain_pair"), {"username": username, "password": "x"}, format="json")
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {r.data['access']}")
+    return client
+
+
+@override_settings(EXAM_SUBMISSION_QUEUE=QUEUE_ON)
+def test_queued_submission_is_graded_by_worker():
+    exam, payload = _bootstrap()
+    client = _client("stud0")
+
+    r = client.post(reverse("exam-submit", args=[exam.id]), payload, format="json")
+    assert r.status_code == 202
+    receipt = r.data["receipt"]
+    assert not StudentExam.objects.exists()
+
+    status_url = reverse("exam-submission-status", args=[exam.id, receipt])
+    assert client.get(status_url).data["status"] == "queued"
+
+    assert process_batch() == 1
+    r = client.get(status_url)
+    assert r.data["status"] == "graded"
+    assert r.data["score"] == 100
+    assert StudentExam.objects.get().status == "attempted"
+
+
+@override_settings(EXAM_SUBMISSION_QUEUE=QUEUE_ON)
+def test_duplicate_queued_submission_is_rejected():
+    exam, payload = _bootstrap()
+    client = _client("stud0")
+    first = client.post(reverse("exam-submit", args=[exam.id]), payload, format="json")
+    again = client.post(reverse("exam-submit", args=[exam.id]), payload, format="json")
+    assert again.status_code == 409
+    assert again.data["receipt"] == first.data["receipt"]
+
+    assert process_batch() == 1
+    assert list(QueuedSubmission.objects.values_list("status", flat=True)) == ["graded"]
+
+    r = client.post(reverse("exam-submit", args=[exam.id]), payload, format="json")
+    assert r.status_code == 400
+
+
+@override_settings(EXAM_SUBMISSION_QUEUE=QUEUE_ON)
+def test_malformed_receipt_is_404():
+    exam, _ = _bootstrap()
+    r = _client("stud0").get(f"/api/exams/{exam.id}/submissions/abc/")
+    assert r.status_code == 404
+
+
+@override_settings(EXAM_SUBMISSION_QUEUE=QUEUE_ON)
+def test_full_queue_returns_429():
+    exam, payload = _bootstrap(n_students=3)
+    codes = [
+        _client(f"stud{i}").post(reverse("exam-submit", args=[exam.id]), payload, format="json")
+        for i in range(3)
+    ]
+    assert [r.status_code for r in codes] == [202, 202, 429]
+    assert codes[2]["Retry-After"]
@@ -3,7 +3,9 @@ from io import StringIO
 import csv
 
 from django.urls import reverse
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient, APIRequestFactory
 
 from core.models import User, Teacher, Student
@@ -59,7 +61,7 @@ class CSVExportMixinUnitTests(TestCase):
         self.assertIn("students.csv", res["Content-Disposition"])
 
         # parse CSV content
-        csv_body = res.content.decode("utf‑8")
+        csv_body = b"".join(res.streaming_content).decode("utf‑8")
         reader = csv.reader(StringIO(csv_body))
         rows = list(reader)
 
@@ -72,6 +74,22 @@ class CSVExportMixinUnitTests(TestCase):
         # Username column (index 1) should match
         self.assertEqual(rows[1][1], self.student.username)
 
+    def test_export_query_count_is_fixed(self):
+        client = self._client_with_token(self.admin)
+        for i in range(5):
+            user = User.objects.create_user(f"extra{i}", password="x", role="student")
+            Student.objects.create(user=user, phone="1", roll_number=f"X{i}", student_class="9-B",
+                                   date_of_birth="2010-01-01", admission_date="2024-01-01",
+                                   status="active", assigned_teacher=self.teacher_rec)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = client.get(reverse("student-export-list"))
+            rows = list(csv.reader(StringIO(b"".join(res.streaming_content).decode())))
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[-1][-1], self.teacher.username)
+        export_queries = [q for q in ctx.captured_queries if "core_student" in q["sql"]]
+        self.assertEqual(len(export_queries), 1)
+
     # ─────────────────────────── forbidden cases ───────────────────────────
     def test_non_admin_cannot_export_teachers(self):
         for user in (self.teacher, self.student):
@@ -36,7 +36,7 @@ def test_admin_can_export_teachers_csv(api):
     resp = api.get(url)
     assert resp.status_code == status.HTTP_200_OK
     assert resp["content-type"] == "text/csv"
-    rows = list(csv.reader(io.StringIO(resp.content.decode())))
+    rows = list(csv.reader(io.StringIO(b"".join(resp.streaming_content).decode())))
     assert rows[0] == ["ID", "Username", "Email", "First Name", "Last Name",
                        "Subject", "Employee ID", "Joined On", "Status"]
     assert rows[1][1] == "t"  # username column
@@ -14,6 +14,7 @@ from .views import (
     LogoutView,
     TeacherExportView, 
     StudentExportView,
+    ResultExportView,
     ExamViewSet,
 )
 
@@ -25,6 +26,7 @@ router.register("teachers", TeacherViewSet, basename="teacher")
 router.register("students", StudentViewSet, basename="student")
 router.register(r"teachers-export",  TeacherExportView, basename="teacher-export")
 router.register(r"students-export",  StudentExportView, basename="student-export")
+router.register(r"results-export",   ResultExportView,  basename="result-export")
 router.register("exams",           ExamViewSet,         basename="exam") 
 
 
@@ -1,41 +1,142 @@
-import csv
-from io import StringIO
-from django.http import HttpResponse
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework.negotiation import DefaultContentNegotiation
 from rest_framework.response import Response
 from rest_framework import permissions
 
+from core import exports
+from core.caching import models_state
+
+
+def not_modified(request, etag, last_modified=None):
+    """Whether a conditional GET can be answered with 304."""
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+    return bool(since and last_modified and int(last_modified.timestamp()) <= since)
+
+
+_END = object()
+
+
+class ChunkedStreamingHttpResponse(StreamingHttpResponse):
+    """
+    StreamingHttpResponse for a synchronous iterator that also streams under
+    ASGI (daphne). Django's own ``__aiter__`` reads a sync iterator with
+    ``sync_to_async(list)``, i.e. builds the whole body before sending a
+    byte; this pulls one chunk at a time on the sync thread instead.
+    WSGI and the sync test client iterate it as usual.
+    """
+
+    async def __aiter__(self):
+        if self.is_async:
+            async for part in super().__aiter__():
+                yield part
+            return
+        parts = self.streaming_content
+        pull = sync_to_async(next)
+        while (part := await pull(parts, _END)) is not _END:
+            yield part
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    """?format= picks the export format here, not a DRF renderer."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
 
 class CSVExportMixin:
     """
-    Mixin to export queryset to CSV.
+    Mixin to stream a queryset out as CSV (or another export format).
     Must define:
         - csv_fields: List of model field paths (e.g. user__username)
         - csv_headers: Optional list of column headers (same length as csv_fields)
         - csv_filename: Filename of downloaded CSV
+
+    ?format= selects csv (default), csv.gz, ndjson or columnar (see
+    core/exports.py). Rows are read with values_list(*csv_fields), so the joins
+    needed by nested paths happen in the one query, and are encoded (and
+    compressed) chunk by chunk so memory stays flat whatever the export size,
+    under daphne too (ChunkedStreamingHttpResponse).
+
+    Responses carry an ETag and Last-Modified derived from per-model change
+    versions, so a conditional request for unchanged data is answered with
+    304 without reading any rows.
     """
 
     permission_classes = [permissions.IsAuthenticated]
+    content_negotiation_class = ExportContentNegotiation
+    csv_chunk_size = 2000
+
+    export_formats = {
+        # format: (content type, filename extension)
+        "csv":      ("text/csv", ""),
+        "csv.gz":   ("application/gzip", ".gz"),
+        "ndjson":   ("application/x-ndjson", ""),
+        "columnar": ("application/vnd.school-mgmt.columnar", ""),
+    }
 
     def list(self, request, *args, **kwargs):
         if getattr(request.user, "role", "") != "admin":
             return Response({"detail": "Only admin can export."}, status=403)
 
+        fmt = request.query_params.get("format", "csv")
+        if fmt not in self.export_formats:
+            return Response({"detail": f"Unknown format, use one of {', '.join(self.export_formats)}."},
+                            status=400)
+
         queryset = self.filter_queryset(self.get_queryset())
         fields = getattr(self, "csv_fields", [])
         headers = getattr(self, "csv_headers", fields)
-        filename = getattr(self, "csv_filename", "export.csv")
+        filename = self.export_filename(fmt)
+        content_type = self.export_formats[fmt][0]
 
-        buffer = StringIO()
-        writer = csv.writer(buffer)
-        writer.writerow(headers)  # First row as column headers
+        etag, last_modified = self.export_validators(queryset.model, fields, fmt, request)
+        if not_modified(request, etag, last_modified):
+            response = HttpResponseNotModified()
+        else:
+            rows = queryset.values_list(*fields).iterator(chunk_size=self.csv_chunk_size)
+            response = ChunkedStreamingHttpResponse(
+                self.encode(fmt, queryset.model, fields, headers, rows), content_type=content_type
+            )
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
 
-        for obj in queryset:
-            row = [self.resolve_nested_attr(obj, field) for field in fields]
-            writer.writerow(row)
+    # ----- encoding -----
+    def encode(self, fmt, model, fields, headers, rows):
+        chunk = self.csv_chunk_size
+        if fmt == "csv":
+            return exports.csv_stream(headers, rows, chunk)
+        if fmt == "csv.gz":
+            return exports.gzip_stream(exports.csv_stream(headers, rows, chunk))
+        if fmt == "ndjson":
+            return exports.ndjson_stream(fields, rows, chunk)
+        kinds = [exports.column_type(exports.resolve_field(model, f)) for f in fields]
+        return exports.columnar_stream(fields, kinds, rows, chunk)
 
-        response = HttpResponse(buffer.getvalue(), content_type="text/csv")
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-        return response
+    def export_filename(self, fmt):
+        filename = getattr(self, "csv_filename", "export.csv")
+        if fmt in ("ndjson", "columnar"):
+            return f'{filename.rsplit(".", 1)[0]}.{"ndjson" if fmt == "ndjson" else "col"}'
+        return filename + self.export_formats[fmt][1]
+
+    # ----- conditional requests -----
+    def export_validators(self, model, fields, fmt, request):
+        """Strong ETag and Last-Modified for the export, without touching rows."""
+        models = {m for f in fields for m in exports.path_models(model, f)}
+        versions, last_modified = models_state(models)
+        digest = hashlib.sha1("|".join([
+            fmt, ",".join(fields), request.META.get("QUERY_STRING", ""), *versions,
+        ]).encode()).hexdigest()
+        return quote_etag(digest), last_modified
 
     @staticmethod
     def resolve_nested_attr(obj, attr_path):
@@ -47,4 +148,4 @@ class CSVExportMixin:
                     return ""
             return str(obj)
         except AttributeError:
-            return ""
\ No newline at end of file
+            return ""
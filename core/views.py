@@ -2,14 +2,17 @@
 from io import TextIOWrapper
 import csv
 
-from django.db.models import Avg
+from django.db.models import Avg, Count, F, Q
+from django.http import HttpResponse, HttpResponseNotModified
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import status, permissions, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
@@ -27,18 +30,29 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Exam, StudentExam
-from .models import Chat
-from .serializers import ChatSerializer
+from .models import Chat, ChatInbox
+from .serializers import ChatSerializer, ChatInboxSerializer
 from .serializers import MessageSerializer
 
-from core.utils import CSVExportMixin
+from core.utils import ChunkedStreamingHttpResponse, CSVExportMixin, not_modified
+from .analysis import exam_analysis
+from .dashboard import exam_summaries, student_exam_rows, student_exams, student_id_for, visible_exam_ids
+from .delivery import get_payload
+from .autosave import answer_buffer, collect_answers, ensure_flusher
+from .grading import get_answer_key, grade_attempt
+from .import_jobs import create_job, start_job
+from .importing import StudentImporter
+from .inbox import mark_read
+from .submissions import AlreadyQueued, QueueFull, enqueue, ensure_workers, queue_setting
+from .pagination import ExamPagination, ExamRowPagination, InboxPagination, MessagePagination
+from .search import search_filter, student_index
 from .models import (
-    Teacher, Student,
-    Exam, Question, Option, Answer, StudentExam
+    EXAM_WINDOWS, Teacher, Student,
+    Exam, StudentExam, QueuedSubmission, ExamStats, ImportJob
 )
 from .serializers import (
     TeacherSerializer, StudentSerializer, CustomTokenObtainPairSerializer,
-    ExamCreateSerializer, ExamReadSerializer,
+    ExamCreateSerializer, ExamReadSerializer, ExamSummarySerializer,
     SubmitExamSerializer, StudentExamSerializer
 )
 from .permission import (
@@ -46,6 +60,9 @@ from .permission import (
     IsTeacherOwner, IsStudentOfTeacher
 )
 
+# receipts and job ids in URLs; anything else is a 404 rather than a ValidationError
+UUID_PATTERN = r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+
 # ─────────────────────────────────────────────
 #  TEACHER VIEWSET
 # ─────────────────────────────────────────────
@@ -56,10 +73,11 @@ class TeacherViewSet(viewsets.ModelViewSet):
     # ----- queryset filtering -----
     def get_queryset(self):
         u = self.request.user
+        qs = Teacher.objects.select_related("user")
         if u.role == "admin":
-            return Teacher.objects.all()
+            return qs
         if u.role == "teacher":
-            return Teacher.objects.filter(user=u)
+            return qs.filter(user=u)
         return Teacher.objects.none()
     #To view their teacher
     def retrieve(self, request, *args, **kwargs):
@@ -126,7 +144,7 @@ class TeacherViewSet(viewsets.ModelViewSet):
         teacher = self.get_object()
         if request.user.role == "teacher" and teacher.user != request.user:
             return Response({"detail": "Not allowed."}, status=403)
-        qs = teacher.student_set.all()
+        qs = teacher.student_set.select_related("user", "assigned_teacher__user")
         page = self.paginate_queryset(qs)
         ser = StudentSerializer(page or qs, many=True)
         return self.get_paginated_response(ser.data) if page else Response(ser.data)
@@ -142,14 +160,39 @@ class StudentViewSet(viewsets.ModelViewSet):
     # ----- queryset filtering -----
     def get_queryset(self):
         u = self.request.user
+        qs = Student.objects.select_related("user", "assigned_teacher__user")
         if u.role == "admin":
-            return Student.objects.all()
+            return qs
         if u.role == "teacher":
-            return Student.objects.filter(assigned_teacher__user=u)
+            return qs.filter(assigned_teacher__user=u)
         if u.role == "student":
-            return Student.objects.filter(user=u)
+            return qs.filter(user=u)
         return Student.objects.none()
-    
+
+    # ----- list filters & search -----
+    def filter_queryset(self, queryset):
+        params = self.request.query_params
+        for name in ("student_class", "status"):
+            if params.get(name):
+                queryset = queryset.filter(**{name: params[name]})
+        teacher_id = params.get("assigned_teacher")
+        if teacher_id:
+            if not teacher_id.isdigit():
+                raise ValidationError({"assigned_teacher": "Must be a teacher id."})
+            queryset = queryset.filter(assigned_teacher_id=int(teacher_id))
+        for name, lookup in (("admitted_from", "admission_date__gte"), ("admitted_to", "admission_date__lte")):
+            if params.get(name):
+                try:
+                    day = parse_date(params[name])
+                except ValueError:          # well formed but not a real date
+                    day = None
+                if day is None:
+                    raise ValidationError({name: "Use YYYY-MM-DD."})
+                queryset = queryset.filter(**{lookup: day})
+        if params.get("search"):
+            queryset = queryset.filter(search_filter(params["search"]))
+        return queryset
+
     def get_serializer_context(self):
         return {"request": self.request}
 
@@ -221,6 +264,25 @@ class StudentViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Not allowed."}, status=403)
         stu = Student.objects.filter(user=request.user).first()
         return Response(self.get_serializer(stu).data) if stu else Response({"detail": "Student profile not found."}, status=404)
+    @action(detail=False, methods=["get"], url_path="search")
+    def typeahead(self, request):
+        """Admin typeahead straight from the in-process index, no row queries."""
+        if request.user.role != "admin":
+            return Response({"detail": "Not allowed."}, status=403)
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response({"detail": "limit must be a positive number."}, status=400)
+        limit = min(limit, 50)
+        index = student_index()
+        ids = index.search(request.query_params.get("q", ""), limit=limit)
+        return Response([
+            {"id": pk, "username": username, "name": name, "roll_number": roll}
+            for pk, username, name, roll in index.entries(ids)
+        ])
+
     @action(detail=False, methods=["get"], url_path="results")
     def my_results(self, request):
         if request.user.role != "student":
@@ -252,7 +314,19 @@ class StudentViewSet(viewsets.ModelViewSet):
         if not file:
             return Response({"detail": "CSV file is required."}, status=400)
 
+        if request.query_params.get("mode") == "job":
+            job = create_job(file, request.user)
+            start_job(job)
+            return Response(job.progress(), status=202)
+
         reader = csv.DictReader(TextIOWrapper(file, encoding="utf-8"))
+        if request.query_params.get("mode") == "bulk":
+            importer = StudentImporter()
+            stats = importer.run(enumerate(reader, start=2))
+            return Response({"created": StudentSerializer(importer.created, many=True).data,
+                             "errors": importer.errors, "stats": stats},
+                            status=201 if importer.created else 400)
+
         created, errors = [], []
         for idx, row in enumerate(reader, start=2):
             try:
@@ -282,6 +356,19 @@ class StudentViewSet(viewsets.ModelViewSet):
         return Response({"created": StudentSerializer(created, many=True).data, "errors": errors},
                         status=201 if created else 400)
 
+    @action(detail=False, methods=["get"], url_path=rf"import/(?P<job_id>{UUID_PATTERN})")
+    def import_status(self, request, job_id=None):
+        if request.user.role != "admin":
+            return Response({"detail": "Not allowed."}, status=403)
+        job = ImportJob.objects.filter(pk=job_id).first()
+        if not job:
+            return Response({"detail": "Not found."}, status=404)
+        data = job.progress()
+        data["errors"] = job.errors
+        if job.detail:
+            data["detail"] = job.detail
+        return Response(data)
+
 #  AUTH VIEW(S)
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -301,7 +388,7 @@ class LogoutView(TokenObtainPairView):
 
 
 # ─────────────────────────────────────────────
-#  EXPORT VIEWSETS (CSV)
+#  EXPORT VIEWSETS (CSV, csv.gz, ndjson, columnar)
 # ─────────────────────────────────────────────
 class TeacherExportView(CSVExportMixin, TeacherViewSet):
     csv_filename = "teachers.csv"
@@ -329,6 +416,19 @@ class StudentExportView(CSVExportMixin, StudentViewSet):
     ]
 
 
+class ResultExportView(CSVExportMixin, viewsets.GenericViewSet):
+    queryset = StudentExam.objects.order_by("id")
+    csv_filename = "results.csv"
+    csv_fields = [
+        "id", "exam_id", "exam__title", "student__roll_number", "student__user__username",
+        "score", "status", "started_at", "finished_at"
+    ]
+    csv_headers = [
+        "ID", "Exam ID", "Exam", "Roll Number", "Username",
+        "Score", "Status", "Started At", "Finished At"
+    ]
+
+
 # ─────────────────────────────────────────────
 #  SINGLE, FEATURE‑COMPLETE EXAM VIEWSET
 # ─────────────────────────────────────────────
@@ -339,9 +439,17 @@ class ExamViewSet(viewsets.ModelViewSet):
     Student    →sees exams created by their assigned_teacher  and admin 
     """
     permission_classes = [IsAuthenticated]
+    pagination_class = ExamPagination
 
     # ----- queryset per role -----
     def get_queryset(self):
+        qs = self.get_role_queryset()
+        if self.action not in ("list", "retrieve"):
+            return qs   # other actions only need get_object(), not the question tree
+        eager = getattr(self.get_serializer_class(), "setup_eager_loading", None)
+        return eager(qs) if eager else qs
+
+    def get_role_queryset(self):
         u = self.request.user
 
         if u.role == "admin":
@@ -350,22 +458,62 @@ class ExamViewSet(viewsets.ModelViewSet):
         elif u.role == "teacher" and hasattr(u, "teacher"):
             return Exam.objects.filter(teacher=u.teacher)
 
-        elif u.role == "student" and hasattr(u, "student"):
-            assigned_teacher = u.student.assigned_teacher
-            student_class = self.request.user.student.student_class
-            base_class = ''.join(filter(str.isdigit, student_class))  # "10A" → "10"
+        elif u.role == "student":
+            # exams for the student's grade, or for their section: one indexed join through SchoolClass
+            return Exam.objects.filter(Q(section__isnull=True) | Q(section=F("school_class__students__section")),
+                                       school_class__students__user=u)
 
-        return Exam.objects.filter(target_class=base_class)
+        return Exam.objects.none()
 
 
+    # ----- list -----
+    def list(self, request, *args, **kwargs):
+        """?when=upcoming|live|past narrows the list to one time window."""
+        when = request.query_params.get("when")
+        if when is not None and when not in EXAM_WINDOWS:
+            return Response({"detail": f"when must be one of {', '.join(EXAM_WINDOWS)}."}, status=400)
+        if request.user.role != "student":
+            return super().list(request, *args, **kwargs)
+        # students poll this: page through the cached rows, summaries come from the cache too
+        paginator = ExamRowPagination()
+        rows = paginator.paginate_rows(student_exam_rows(request.user, when=when), request)
+        return paginator.get_paginated_response(exam_summaries([row[0] for row in rows]))
+
+    # ----- retrieve -----
+    def retrieve(self, request, *args, **kwargs):
+        """The pre-encoded delivery payload (core/delivery.py), with ETag/304."""
+        if request.user.role == "student":
+            pk = kwargs["pk"]
+            if not pk.isdigit() or int(pk) not in visible_exam_ids(request.user):
+                return Response({"detail": "No Exam matches the given query."}, status=404)
+            exam_id, student_id = int(pk), student_id_for(request.user)
+        else:
+            exam_id, student_id = self.get_object().pk, None
+
+        payload = get_payload(exam_id)
+        if payload is None:
+            return Response({"detail": "No Exam matches the given query."}, status=404)
+        body, etag = payload.for_student(student_id)
+        response = HttpResponseNotModified() if not_modified(request, etag) else \
+            HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def filter_queryset(self, queryset):
+        when = self.request.query_params.get("when")
+        return queryset.window(when) if self.action == "list" and when else queryset
+
     # ----- serializer choice -----
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
             return ExamCreateSerializer
         if self.action == "results":
             return StudentExamSerializer
-        if self.action == "submit":
+        if self.action in ["submit", "autosave"]:
             return SubmitExamSerializer
+        if self.action == "list":
+            return ExamSummarySerializer
         return ExamReadSerializer
 
     # ----- create -----
@@ -384,9 +532,9 @@ class ExamViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated(), (IsAdmin() if self.request.user.role == "admin" else IsTeacherOwner())]
         if self.action == "create":
             return [IsAuthenticated(), (IsAdmin() if self.request.user.role == "admin" else IsTeacher())]
-        if self.action == "results":
+        if self.action in ["results", "analysis"]:
             return [IsAuthenticated(), (IsAdmin() if self.request.user.role == "admin" else IsTeacherOwner())]
-        if self.action == "submit":
+        if self.action in ["submit", "autosave"]:
             return [IsAuthenticated(), IsStudentOfTeacher()]
         return [IsAuthenticated()]
     
@@ -397,13 +545,8 @@ class ExamViewSet(viewsets.ModelViewSet):
         if request.user.role != "student":
             return Response({"detail": "Not allowed."}, status=403)
 
-        student = request.user.student
-        now = timezone.now()
-
-        # Exams where student has NOT attempted and exam is over
-        exams = Exam.objects.filter(end_time__lt=now).exclude(attempts__student=student)
-        ser = ExamReadSerializer(exams, many=True)
-        return Response(ser.data)
+        # Exams the student has NOT attempted and that are over, from the dashboard cache
+        return Response(student_exams(request.user, when="past", unattempted=True))
 
     # ----- student POST /exams/<id>/submit/ -----
     @action(detail=True, methods=["POST"], serializer_class=SubmitExamSerializer)
@@ -411,6 +554,12 @@ class ExamViewSet(viewsets.ModelViewSet):
         exam = self.get_object()
         ser = self.get_serializer(data=request.data)
         ser.is_valid(raise_exception=True)
+        if exam.end_time <= timezone.now():
+            # the scheduler closes open attempts at end_time; nothing is accepted after it
+            return Response({"detail": "The exam is over."}, status=400)
+
+        if queue_setting("ENABLED"):
+            return self._enqueue_submission(request, exam, ser.validated_data["answers"])
 
         attempt, _ = StudentExam.objects.get_or_create(
             student=request.user.student,
@@ -420,35 +569,92 @@ class ExamViewSet(viewsets.ModelViewSet):
         if attempt.finished_at:
             return Response({"detail": "You already submitted."}, status=400)
 
-        total, correct = 0, 0
-        for ans in ser.validated_data["answers"]:
-            total += 1
-            try:
-                q = Question.objects.get(pk=ans["question_id"], exam=exam)
-                opt = Option.objects.get(pk=ans["option_id"], question=q)
-            except (Question.DoesNotExist, Option.DoesNotExist):
-                continue
-            Answer.objects.update_or_create(attempt=attempt, question=q, defaults={"chosen": opt})
-            if opt.is_correct:
-                correct += 1
-
-        attempt.finished_at = timezone.now()
-        attempt.score = (correct / total) * 100 if total else 0
-        attempt.status = "attempted" 
-        attempt.save()
+        if grade_attempt(attempt, collect_answers(attempt.pk, ser.validated_data["answers"])) is None:
+            return Response({"detail": "You already submitted."}, status=400)   # lost a race
         return Response({"score": attempt.score})
 
+    def _enqueue_submission(self, request, exam, answers):
+        student = request.user.student
+        attempt = StudentExam.objects.filter(student=student, exam=exam).first()
+        if attempt and attempt.finished_at:
+            return Response({"detail": "You already submitted."}, status=400)
+        if attempt:
+            # leave the autosaved answers buffered until the submission is actually queued
+            answers = collect_answers(attempt.pk, answers, take=False)
+        try:
+            sub = enqueue(exam, student, answers)
+        except AlreadyQueued as exc:
+            return Response({"detail": "Your submission is already being graded.",
+                             "receipt": exc.submission and exc.submission.receipt}, status=409)
+        except QueueFull:
+            return Response({"detail": "Too many submissions in progress, retry shortly."},
+                            status=429, headers={"Retry-After": str(queue_setting("RETRY_AFTER"))})
+        if attempt:
+            answer_buffer.take(attempt.pk)
+        ensure_workers()
+        return Response({"receipt": sub.receipt, "status": sub.status}, status=202)
+
+    # ----- student POST /exams/<id>/autosave/ -----
+    @action(detail=True, methods=["POST"], serializer_class=SubmitExamSerializer)
+    def autosave(self, request, pk=None):
+        """Buffer in-progress answers; they reach the database within FLUSH_INTERVAL."""
+        if request.user.role != "student":
+            return Response({"detail": "Not allowed."}, status=403)
+        exam = self.get_object()
+        ser = self.get_serializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        if exam.end_time <= timezone.now():
+            return Response({"detail": "The exam is over."}, status=400)
+
+        key = get_answer_key(exam.pk)
+        answers = [(a["question_id"], a["option_id"]) for a in ser.validated_data["answers"]]
+        invalid = [{"question_id": q, "option_id": o} for q, o in answers if key.option_question.get(o) != q]
+        if invalid:
+            return Response({"detail": "Options do not belong to these questions.", "answers": invalid},
+                            status=400)
+
+        attempt, _ = StudentExam.objects.get_or_create(student=request.user.student, exam=exam)
+        if attempt.finished_at:
+            return Response({"detail": "You already submitted."}, status=400)
+        answer_buffer.put(attempt.pk, answers)
+        ensure_flusher()
+        return Response({"attempt": attempt.pk, "buffered": len(answers)}, status=202)
+
+    # ----- student GET /exams/<id>/submissions/<receipt>/ -----
+    @action(detail=True, methods=["GET"], url_path=rf"submissions/(?P<receipt>{UUID_PATTERN})")
+    def submission_status(self, request, pk=None, receipt=None):
+        sub = QueuedSubmission.objects.filter(
+            receipt=receipt, exam_id=pk, student__user=request.user
+        ).first()
+        if not sub:
+            return Response({"detail": "Not found."}, status=404)
+        data = {"receipt": sub.receipt, "status": sub.status, "score": sub.score}
+        if sub.detail:
+            data["detail"] = sub.detail
+        return Response(data)
+
     # ----- teacher/admin GET /exams/<id>/results/ -----
+    # stats come from the materialised ExamStats row; pass ?include=attempts
+    # to also list every attempt
     @action(detail=True, methods=["GET"])
     def results(self, request, pk=None):
         exam = self.get_object()
-        attempts = exam.attempts.select_related("student__user")
-        avg = attempts.aggregate(avg=Avg("score"))["avg"]
-        return Response({
+        stats = ExamStats.objects.filter(exam=exam).first() or ExamStats(exam=exam)
+        data = {
             "exam": exam.title,
-            "average_score": avg,
-            "attempts": StudentExamSerializer(attempts, many=True).data
-        })
+            "average_score": stats.average,
+            "stats": stats.as_dict(),
+        }
+        if request.query_params.get("include") == "attempts":
+            attempts = exam.attempts.select_related("student__user")
+            data["attempts"] = StudentExamSerializer(attempts, many=True).data
+        return Response(data)
+
+    # ----- teacher/admin GET /exams/<id>/analysis/ -----
+    @action(detail=True, methods=["GET"])
+    def analysis(self, request, pk=None):
+        exam = self.get_object()
+        return Response({"exam": exam.title, **exam_analysis(exam.pk)})
 # ─────────────────────────────────────────────
 #  PASSWORD‑RESET VIEWS  (add near bottom)
 # ─────────────────────────────────────────────
@@ -490,23 +696,98 @@ class PasswordResetConfirmView(generics.GenericAPIView):
         ser.save()
         return Response({"detail": "Password has been reset."}, status=status.HTTP_200_OK)
 class ClassResultsView(APIView):
+    """
+    All attempts at exams targeting a class, read with one joined query.
+
+    ?limit=N&cursor=<id>  → one page: {"results": [...], "next_cursor": id|null}
+    ?stream=ndjson|json   → the whole result set (from ``cursor`` on) streamed
+                            row by row, so memory stays flat for large classes
+    ?summary=sections     → per-section averages, grouped on the section key
+
+    ``class_id`` is the grade number (SchoolClass.grade).
+    """
     permission_classes = [IsAuthenticated]
+    max_limit = 1000
+    stream_chunk_size = 2000
+
+    def get_rows(self, class_id, cursor=None):
+        qs = StudentExam.objects.filter(exam__school_class__grade=class_id)
+        if cursor is not None:
+            qs = qs.filter(pk__gt=cursor)
+        return qs.order_by("pk").values_list(
+            "pk", "exam__title", "student__user__first_name", "student__user__last_name",
+            "score", "started_at", "finished_at",
+        )
+
+    @staticmethod
+    def section_summary(class_id):
+        rows = (StudentExam.objects
+                .filter(exam__school_class__grade=class_id, score__isnull=False)
+                .values("student__section_id", "student__section__name")
+                .annotate(attempts=Count("id"), average_score=Avg("score"))
+                .order_by("student__section__name"))
+        return [
+            {"section_id": r["student__section_id"], "section": r["student__section__name"],
+             "attempts": r["attempts"], "average_score": round(r["average_score"], 2)}
+            for r in rows
+        ]
+
+    @staticmethod
+    def to_item(row):
+        _, title, first_name, last_name, score, started_at, finished_at = row
+        return {
+            "exam_title": title,
+            "student_name": f"{first_name} {last_name}".strip(),
+            "score": score,
+            "started_at": started_at,
+            "finished_at": finished_at,
+        }
 
     def get(self, request, class_id):
-        exams = Exam.objects.filter(target_class=class_id)
-        data = []
-
-        for exam in exams:
-            student_exams = StudentExam.objects.filter(exam=exam).select_related("student__user")
-            for se in student_exams:
-                data.append({
-                    "exam_title": exam.title,
-                    "student_name": se.student.user.get_full_name(),
-                    "score": se.score,
-                    "started_at": se.started_at,
-                    "finished_at": se.finished_at,
-                })
-        return Response(data)
+        try:
+            cursor = int(request.query_params["cursor"]) if "cursor" in request.query_params else None
+            limit = int(request.query_params["limit"]) if "limit" in request.query_params else None
+        except ValueError:
+            return Response({"detail": "cursor and limit must be integers."}, status=400)
+        if request.query_params.get("summary") == "sections":
+            return Response(self.section_summary(class_id))
+        rows = self.get_rows(class_id, cursor)
+
+        mode = request.query_params.get("stream")
+        if mode in ("ndjson", "json"):
+            return self.stream(rows.iterator(chunk_size=self.stream_chunk_size), mode)
+        if mode:
+            return Response({"detail": "stream must be 'ndjson' or 'json'."}, status=400)
+
+        if limit is None:
+            return Response([self.to_item(row) for row in rows.iterator(chunk_size=self.stream_chunk_size)])
+
+        limit = max(1, min(limit, self.max_limit))
+        page = list(rows[:limit + 1])
+        has_more = len(page) > limit
+        if has_more:
+            page.pop()
+        return Response({
+            "results": [self.to_item(row) for row in page],
+            "next_cursor": page[-1][0] if has_more else None,
+        })
+
+    def stream(self, rows, mode):
+        encoder = JSONEncoder()
+
+        def ndjson():
+            for row in rows:
+                yield encoder.encode(self.to_item(row)) + "\n"
+
+        def json_array():
+            yield "["
+            for i, row in enumerate(rows):
+                yield ("," if i else "") + encoder.encode(self.to_item(row))
+            yield "]"
+
+        if mode == "ndjson":
+            return ChunkedStreamingHttpResponse(ndjson(), content_type="application/x-ndjson")
+        return ChunkedStreamingHttpResponse(json_array(), content_type="application/json")
 
 # ─────────────────────────────────────────────
 #  CHAT VIEWS 
@@ -518,14 +799,41 @@ class ChatViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Return only chats where the current user is a participant"""
-        return Chat.objects.filter(participants=self.request.user)
+        qs = Chat.objects.filter(participants=self.request.user)
+        if self.action == "list":
+            qs = qs.select_related("created_by").prefetch_related("participants").with_last_message()
+        return qs
 
     @action(detail=True, methods=["get"])
     def messages(self, request, pk=None):
-        """Get all messages in this chat"""
+        """Get the messages in this chat, newest first, one history window at a time"""
+        chat = self.get_object()
+        msgs = chat.messages.select_related("sender")
+        paginator = MessagePagination()
+        page = paginator.paginate_queryset(msgs, request, view=self)
+        return paginator.get_paginated_response(MessageSerializer(page, many=True).data)
+
+    @action(detail=False, methods=["get"])
+    def inbox(self, request):
+        """The user's chats with unread counts, most recently active first"""
+        paginator = InboxPagination()
+        page = paginator.paginate_queryset(ChatInbox.objects.filter(user=request.user), request, view=self)
+        return paginator.get_paginated_response(ChatInboxSerializer(page, many=True).data)
+
+    @action(detail=True, methods=["post"], url_path="read")
+    def mark_read(self, request, pk=None):
+        """Mark messages read up to ``up_to_id`` (default: all of them)"""
         chat = self.get_object()
-        msgs = chat.messages.select_related("sender").order_by("timestamp")
-        return Response(MessageSerializer(msgs, many=True).data)
+        up_to_id = request.data.get("up_to_id")
+        if up_to_id is not None:
+            try:
+                up_to_id = int(up_to_id)
+            except (TypeError, ValueError):
+                return Response({"detail": "up_to_id must be a message id."}, status=400)
+        inbox = mark_read(chat.pk, request.user, up_to_id)
+        if inbox is None:
+            return Response({"detail": "Not found."}, status=404)
+        return Response(ChatInboxSerializer(inbox).data)
 
     def create(self, request, *args, **kwargs):
         user = request.user
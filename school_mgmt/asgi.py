@@ -9,3 +9,8 @@ application = ProtocolTypeRouter({
         URLRouter(websocket_urlpatterns)
     ),
 })
+
+from core.scheduler import ExamSchedulerMiddleware, scheduler_setting  # needs the app registry
+
+if scheduler_setting("IN_PROCESS"):
+    application = ExamSchedulerMiddleware(application)
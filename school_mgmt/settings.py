@@ -72,7 +72,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
     'PAGE_SIZE': 10,
 }
 from datetime import timedelta
@@ -110,11 +110,69 @@ TEMPLATES = [
 WSGI_APPLICATION = 'school_mgmt.wsgi.application'
 ASGI_APPLICATION = 'school_mgmt.asgi.application'
 # Channels configuration
+# The in-memory layer only reaches sockets held by the same process. To run
+# several ASGI workers on one host, point them all at a shared
+# core.channel_layers.SQLiteChannelLayer file:
+#     "BACKEND": "core.channel_layers.SQLiteChannelLayer",
+#     "CONFIG": {"path": BASE_DIR / "channels.sqlite3"},
 CHANNEL_LAYERS = {
     'default': {
         "BACKEND": "channels.layers.InMemoryChannelLayer",
     },
 }
+# Cache
+# Answer keys and other derived data are cached here behind a small
+# process-local LRU; point this at a shared backend (Redis, Memcached,
+# DatabaseCache) when running more than one worker process.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        # the exam dashboard keeps ~4 entries per student (student-of, student-state and
+        # their version tokens) plus per-class and per-exam entries; LocMem's default of
+        # 300 culls them at a few dozen students. Size this to about 5 × the student count,
+        # or use a shared backend (Redis) when running several processes.
+        "OPTIONS": {"MAX_ENTRIES": 50_000},
+    },
+}
+ANSWER_KEY_LRU_SIZE = 256
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60
+
+# Asynchronous exam submissions (see core/submissions.py for all options)
+EXAM_SUBMISSION_QUEUE = {
+    "ENABLED": False,
+    "MAX_DEPTH": 5000,
+    "BATCH_SIZE": 100,
+    "WORKERS": 2,
+}
+
+# Student-facing exam payloads are pre-encoded per exam version (core/delivery.py)
+EXAM_DELIVERY = {
+    "SHUFFLE_QUESTIONS": False,
+    "SHUFFLE_OPTIONS": False,
+}
+
+# Autosaved answers are buffered in memory and written every FLUSH_INTERVAL seconds
+AUTOSAVE = {
+    "FLUSH_INTERVAL": 2.0,
+}
+
+# Exam deadline scheduler (core/scheduler.py); otherwise run `manage.py run_exam_scheduler`
+EXAM_SCHEDULER = {
+    "IN_PROCESS": False,
+    "RELOAD_INTERVAL": 60,
+}
+
+# Bulk student CSV import (POST /api/students/import/?mode=bulk)
+STUDENT_IMPORT = {
+    "BATCH_SIZE": 500,
+    "HASH_WORKERS": 1,          # ?mode=bulk hashes inline in the web worker
+    "JOB_HASH_WORKERS": None,   # ?mode=job: one shared pool, None = one process per CPU
+    "JOB_WORKERS": 2,           # background jobs (?mode=job); 0 = run inline
+    "CLAIM_TIMEOUT": 300,       # seconds without progress before resume_import_jobs takes a job over
+}
+IMPORT_SPOOL_DIR = BASE_DIR / "import_spool"
+
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 